@@ -0,0 +1,106 @@
+"""
+Benchmark do endpoint GET /api/admin/mesas
+
+Cria bancos SQLite temporários com 10 a 500 mesas (todas ocupadas, cada uma
+com um pedido ativo de vários itens) e mede, para cada tamanho, o número de
+consultas SQL e a latência da requisição.
+
+Uso:
+    python benchmarks/bench_admin_mesas.py
+    python benchmarks/bench_admin_mesas.py --mesas 10 100 500 --repeticoes 20
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from sqlalchemy import event
+
+from src.models.restaurante import db, Mesa, ItemCardapio, Pedido, ItemPedido, StatusMesa
+from src.routes.admin import admin_bp
+
+
+def criar_app(caminho_db):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{caminho_db}"
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    app.register_blueprint(admin_bp, url_prefix='/api')
+    return app
+
+
+def popular(quantidade_mesas, itens_por_pedido=8):
+    cardapio = [
+        ItemCardapio(nome=f"Item {i}", descricao="Descrição do item " * 4,
+                     preco=10.0 + i, categoria="prato_principal")
+        for i in range(15)
+    ]
+    db.session.add_all(cardapio)
+    db.session.flush()
+
+    for numero in range(1, quantidade_mesas + 1):
+        mesa = Mesa(numero=numero, status=StatusMesa.ABERTA.value, cliente_nome=f"Cliente {numero}")
+        db.session.add(mesa)
+        db.session.flush()
+
+        pedido = Pedido(mesa_id=mesa.id, cliente_nome=mesa.cliente_nome, status='aberto')
+        db.session.add(pedido)
+        db.session.flush()
+
+        for j in range(itens_por_pedido):
+            item = cardapio[(numero + j) % len(cardapio)]
+            item_pedido = ItemPedido(pedido_id=pedido.id, item_cardapio_id=item.id,
+                                     quantidade=1, preco_unitario=item.preco)
+            item_pedido.calcular_subtotal()
+            db.session.add(item_pedido)
+
+    db.session.commit()
+
+
+def medir(quantidade_mesas, repeticoes):
+    with tempfile.TemporaryDirectory() as diretorio:
+        app = criar_app(os.path.join(diretorio, 'bench.db'))
+        with app.app_context():
+            db.create_all()
+            popular(quantidade_mesas)
+
+            consultas = []
+            event.listen(db.engine, 'before_cursor_execute',
+                         lambda *args: consultas.append(args[2]))
+
+            cliente = app.test_client()
+            cliente.get('/api/admin/mesas')  # aquecimento
+
+            tempos = []
+            for _ in range(repeticoes):
+                consultas.clear()
+                inicio = time.perf_counter()
+                resposta = cliente.get('/api/admin/mesas')
+                tempos.append((time.perf_counter() - inicio) * 1000)
+                assert resposta.status_code == 200, resposta.data
+
+            db.engine.dispose()
+
+    return len(consultas), statistics.median(tempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--mesas', type=int, nargs='+', default=[10, 50, 100, 250, 500])
+    parser.add_argument('--repeticoes', type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{'mesas':>6} {'consultas':>10} {'mediana (ms)':>13} {'ms/mesa':>8}")
+    for quantidade in args.mesas:
+        consultas, mediana = medir(quantidade, args.repeticoes)
+        print(f"{quantidade:>6} {consultas:>10} {mediana:>13.2f} {mediana / quantidade:>8.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+"""
+Teste de carga concorrente no SQLite
+
+Dispara várias threads fazendo uma mistura de leituras (painel admin,
+cardápio) e escritas (abrir mesa, criar pedido, resetar mesa) contra um
+banco SQLite temporário em arquivo e conta quantas requisições falharam,
+em especial com "database is locked".
+
+Uso:
+    python benchmarks/bench_concorrencia_sqlite.py
+    python benchmarks/bench_concorrencia_sqlite.py --threads 32 --operacoes 200
+    python benchmarks/bench_concorrencia_sqlite.py --sem-ajustes   # SQLite padrão
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+
+from src.models.restaurante import db, Mesa, ItemCardapio, StatusMesa
+from src.routes.user import user_bp
+from src.routes.restaurante import restaurante_bp
+from src.routes.admin import admin_bp
+from src.utils.banco import configurar_sqlite, registrar_pragmas
+
+
+def criar_app(caminho_db, ajustes=True):
+    app = Flask(__name__)
+    if not ajustes:
+        app.config['SQLITE_PRAGMAS'] = {}
+        app.config['SQLITE_JOURNAL_MODE'] = None
+        app.config['SQLITE_LEITURA_SEPARADA'] = False
+    configurar_sqlite(app, caminho_db)
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    registrar_pragmas(app, db)
+    for blueprint in (user_bp, restaurante_bp, admin_bp):
+        app.register_blueprint(blueprint, url_prefix='/api')
+    return app
+
+
+def popular(quantidade_mesas):
+    db.session.add_all(Mesa(numero=i, status=StatusMesa.LIVRE.value) for i in range(1, quantidade_mesas + 1))
+    db.session.add_all(
+        ItemCardapio(nome=f"Item {i}", preco=10.0 + i, categoria="prato_principal") for i in range(15)
+    )
+    db.session.commit()
+
+
+def operacao(cliente, quantidade_mesas):
+    """Executa uma operação aleatória e retorna (nome, resposta)"""
+    mesa_id = random.randint(1, quantidade_mesas)
+    sorteio = random.random()
+
+    if sorteio < 0.35:
+        return 'GET /admin/mesas', cliente.get('/api/admin/mesas')
+    if sorteio < 0.55:
+        return 'GET /admin/estatisticas', cliente.get('/api/admin/estatisticas')
+    if sorteio < 0.65:
+        return 'POST /mesas/iniciar', cliente.post(f'/api/mesas/{mesa_id}/iniciar', json={'cliente_nome': 'Carga'})
+    if sorteio < 0.90:
+        itens = [{'item_cardapio_id': random.randint(1, 15), 'quantidade': 1} for _ in range(5)]
+        return 'POST /pedidos', cliente.post('/api/pedidos', json={
+            'mesa_id': mesa_id, 'cliente_nome': 'Carga', 'itens': itens
+        })
+    return 'POST /mesas/resetar', cliente.post(f'/api/mesas/{mesa_id}/resetar')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--operacoes', type=int, default=100, help='operações por thread')
+    parser.add_argument('--mesas', type=int, default=50)
+    parser.add_argument('--sem-ajustes', action='store_true', help='desliga WAL/PRAGMAs/engine de leitura')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        app = criar_app(os.path.join(diretorio, 'carga.db'), ajustes=not args.sem_ajustes)
+        with app.app_context():
+            db.create_all()
+            popular(args.mesas)
+
+        contagem = Counter()
+        erros = Counter()
+        lock = threading.Lock()
+
+        def trabalhador():
+            cliente = app.test_client()
+            for _ in range(args.operacoes):
+                nome, resposta = operacao(cliente, args.mesas)
+                with lock:
+                    contagem[nome] += 1
+                    if resposta.status_code >= 500:
+                        dados = resposta.get_json(silent=True) or {}
+                        erros[dados.get('error', resposta.status_code)] += 1
+
+        threads = [threading.Thread(target=trabalhador) for _ in range(args.threads)]
+        inicio = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        duracao = time.perf_counter() - inicio
+
+        with app.app_context():
+            for engine in db.engines.values():
+                engine.dispose()
+
+    total = sum(contagem.values())
+    print(f"{total} requisições em {duracao:.2f}s ({total / duracao:.0f} req/s), {args.threads} threads")
+    for nome, quantidade in sorted(contagem.items()):
+        print(f"  {nome:<26} {quantidade:>6}")
+
+    if erros:
+        print(f"{sum(erros.values())} erros:")
+        for mensagem, quantidade in erros.most_common():
+            print(f"  {quantidade:>6}  {str(mensagem)[:100]}")
+        sys.exit(1)
+
+    print("Nenhum erro (nenhum 'database is locked')")
+
+
+if __name__ == '__main__':
+    main()
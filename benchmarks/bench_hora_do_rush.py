@@ -0,0 +1,350 @@
+"""
+Simulação de carga da hora do rush (jantar)
+
+Roda a aplicação completa (create_app) com o cliente de testes do Flask
+contra um banco SQLite temporário, populado com o tamanho escolhido
+(mesas, itens do cardápio e pedidos antigos já pagos).
+
+Cada uma das N mesas simultâneas é uma thread que repete, a cada rodada,
+o fluxo real do cliente (script.js) com M clientes na mesa:
+1. cada cliente escaneia o QR code (GET /cardapio?mesa=N)
+2. o primeiro inicia a sessão (POST /api/mesas/<id>/iniciar)
+3. cada cliente carrega o cardápio (GET /api/cardapio)
+4. cada cliente envia o seu carrinho (POST /api/pedidos/<id>/itens)
+5. a conta é pedida (POST /api/pedidos/<id>/fechar)
+6. o atendente confirma o pagamento e libera a mesa
+   (POST /api/admin/mesas/<id>/confirmar-pagamento)
+
+Ao mesmo tempo, painéis administrativos consultam /api/admin/mesas e
+/api/admin/estatisticas periodicamente, como o admin-script.js.
+
+Ao final, mostra a vazão e as latências p50/p95/p99 por endpoint e
+compara o resultado com os limites salvos em limites_hora_do_rush.json:
+qualquer limite ultrapassado encerra com código 1. Os limites valem para
+o cenário (parâmetros) com que foram gravados e para a máquina em que
+foram medidos; para outro cenário, grave outro arquivo com
+--gravar-limites --limites <arquivo>.
+
+Uso:
+    python benchmarks/bench_hora_do_rush.py
+    python benchmarks/bench_hora_do_rush.py --mesas 20 --clientes 4 --rodadas 5 --mesas-banco 200 --historico 50000
+    python benchmarks/bench_hora_do_rush.py --json resultado.json
+    python benchmarks/bench_hora_do_rush.py --gravar-limites    # grava novos limites a partir desta execução
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert
+
+from src.main import create_app
+from src.models.restaurante import db, Mesa, ItemCardapio, Pedido, ItemPedido, StatusMesa
+from src.utils.inicializacao import migrar_banco
+
+LIMITES_PADRAO = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'limites_hora_do_rush.json')
+
+CATEGORIAS = ('entrada', 'prato_principal', 'bebida', 'sobremesa')
+
+# Folga aplicada ao gravar limites a partir de uma execução
+FOLGA_LATENCIA = 3.0
+FOLGA_VAZAO = 0.5
+# Endpoints rápidos (cardápio em cache) às vezes esperam dezenas de ms pelo
+# GIL ou pelo banco atrás de uma escrita; abaixo disso o limite seria instável
+LIMITE_MINIMO_MS = 100.0
+
+
+def popular(mesas, itens_cardapio, historico):
+    """Popula o banco com mesas livres, cardápio e pedidos antigos já pagos"""
+    db.session.execute(insert(Mesa), [
+        {'numero': numero, 'status': StatusMesa.LIVRE.value} for numero in range(1, mesas + 1)
+    ])
+    db.session.execute(insert(ItemCardapio), [
+        {
+            'nome': f"Item {i}", 'descricao': "Descrição do item " * 4, 'preco': 5.0 + i % 50,
+            'categoria': CATEGORIAS[i % len(CATEGORIAS)], 'disponivel': True
+        }
+        for i in range(itens_cardapio)
+    ])
+
+    # Pedidos pagos dos últimos 30 dias, com 3 itens cada
+    agora = datetime.utcnow()
+    for inicio in range(0, historico, 5000):
+        lote = range(inicio, min(inicio + 5000, historico))
+        pedidos = db.session.execute(insert(Pedido).returning(Pedido.id), [
+            {
+                'mesa_id': 1 + i % mesas, 'cliente_nome': f"Cliente {i}", 'status': 'pago',
+                'total': 30.0, 'created_at': agora - timedelta(minutes=i % (30 * 24 * 60))
+            }
+            for i in lote
+        ]).scalars().all()
+        db.session.execute(insert(ItemPedido), [
+            {
+                'pedido_id': pedido_id, 'item_cardapio_id': 1 + (pedido_id + j) % itens_cardapio,
+                'quantidade': 1, 'preco_unitario': 10.0, 'subtotal': 10.0
+            }
+            for pedido_id in pedidos for j in range(3)
+        ])
+    db.session.commit()
+
+
+class Registro:
+    """Latências e erros por endpoint, compartilhados entre as threads"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencias = defaultdict(list)
+        self.erros = Counter()
+
+    def medir(self, nome, requisicao, esperados=(200,)):
+        inicio = time.perf_counter()
+        resposta = requisicao()
+        duracao = time.perf_counter() - inicio
+        with self._lock:
+            self.latencias[nome].append(duracao)
+            if resposta.status_code not in esperados:
+                self.erros[nome] += 1
+        return resposta
+
+
+def percentil(valores_ordenados, fracao):
+    """Percentil pelo método do posto mais próximo"""
+    if not valores_ordenados:
+        return 0.0
+    posicao = max(math.ceil(fracao * len(valores_ordenados)) - 1, 0)
+    return valores_ordenados[posicao]
+
+
+def rodada_da_mesa(cliente, registro, mesa_id, clientes, itens_cardapio, pausa):
+    """Executa uma rodada completa (sentar, pedir, pagar) em uma mesa"""
+    def pensar():
+        if pausa:
+            time.sleep(random.uniform(0, pausa))
+
+    for _ in range(clientes):
+        registro.medir('GET /cardapio?mesa=<n>', lambda: cliente.get(f'/cardapio?mesa={mesa_id}'))
+
+    resposta = registro.medir(
+        'POST /api/mesas/<id>/iniciar',
+        lambda: cliente.post(f'/api/mesas/{mesa_id}/iniciar', json={'cliente_nome': f"Mesa {mesa_id}"})
+    )
+    dados = resposta.get_json(silent=True) or {}
+    if not dados.get('success'):
+        return
+    pedido_id = dados['pedido']['id']
+
+    for _ in range(clientes):
+        registro.medir('GET /api/cardapio', lambda: cliente.get('/api/cardapio'))
+        pensar()
+
+    for _ in range(clientes):
+        carrinho = [
+            {'item_cardapio_id': random.randint(1, itens_cardapio), 'quantidade': random.randint(1, 2)}
+            for _ in range(random.randint(1, 4))
+        ]
+        registro.medir(
+            'POST /api/pedidos/<id>/itens',
+            lambda: cliente.post(f'/api/pedidos/{pedido_id}/itens', json={'itens': carrinho}),
+            esperados=(200, 201)
+        )
+        pensar()
+
+    registro.medir('POST /api/pedidos/<id>/fechar', lambda: cliente.post(f'/api/pedidos/{pedido_id}/fechar'))
+    pensar()
+    registro.medir(
+        'POST /api/admin/mesas/<id>/confirmar-pagamento',
+        lambda: cliente.post(f'/api/admin/mesas/{mesa_id}/confirmar-pagamento')
+    )
+
+
+def simular(app, args):
+    """Roda as mesas e os painéis ao mesmo tempo e retorna (registro, duração)"""
+    registro = Registro()
+    clientes_terminaram = threading.Event()
+
+    def mesa(mesa_id):
+        cliente = app.test_client()
+        for _ in range(args.rodadas):
+            rodada_da_mesa(cliente, registro, mesa_id, args.clientes, args.cardapio, args.pausa)
+
+    def painel():
+        cliente = app.test_client()
+        while not clientes_terminaram.is_set():
+            registro.medir('GET /api/admin/mesas', lambda: cliente.get('/api/admin/mesas?compacto=1'))
+            registro.medir('GET /api/admin/estatisticas', lambda: cliente.get('/api/admin/estatisticas'))
+            clientes_terminaram.wait(args.intervalo_admin)
+
+    mesas = [threading.Thread(target=mesa, args=(mesa_id,)) for mesa_id in range(1, args.mesas + 1)]
+    paineis = [threading.Thread(target=painel) for _ in range(args.admins)]
+
+    inicio = time.perf_counter()
+    for thread in paineis + mesas:
+        thread.start()
+    for thread in mesas:
+        thread.join()
+    clientes_terminaram.set()
+    for thread in paineis:
+        thread.join()
+
+    return registro, time.perf_counter() - inicio
+
+
+def resumir(registro, duracao):
+    """Retorna o resultado por endpoint e o total"""
+    endpoints = {}
+    for nome, latencias in sorted(registro.latencias.items()):
+        latencias = sorted(latencias)
+        endpoints[nome] = {
+            'requisicoes': len(latencias),
+            'req_s': round(len(latencias) / duracao, 2),
+            'p50_ms': round(percentil(latencias, 0.50) * 1000, 2),
+            'p95_ms': round(percentil(latencias, 0.95) * 1000, 2),
+            'p99_ms': round(percentil(latencias, 0.99) * 1000, 2),
+            'erros': registro.erros[nome],
+        }
+
+    total = sum(resultado['requisicoes'] for resultado in endpoints.values())
+    erros = sum(resultado['erros'] for resultado in endpoints.values())
+    return {
+        'duracao_s': round(duracao, 3),
+        'requisicoes': total,
+        'req_s': round(total / duracao, 2),
+        'taxa_erros': round(erros / total, 4) if total else 0.0,
+        'endpoints': endpoints,
+    }
+
+
+def verificar_limites(resultado, limites):
+    """Retorna a lista de limites ultrapassados"""
+    falhas = []
+    if resultado['req_s'] < limites.get('req_s_minimo', 0):
+        falhas.append(f"vazão {resultado['req_s']} req/s < mínimo {limites['req_s_minimo']}")
+    if resultado['taxa_erros'] > limites.get('taxa_erros_maxima', 0):
+        falhas.append(f"taxa de erros {resultado['taxa_erros']} > máximo {limites.get('taxa_erros_maxima', 0)}")
+
+    for nome, limites_endpoint in limites.get('endpoints', {}).items():
+        medido = resultado['endpoints'].get(nome)
+        if medido is None:
+            falhas.append(f"{nome}: nenhuma requisição medida")
+            continue
+        for chave in ('p50_ms', 'p95_ms', 'p99_ms'):
+            if chave in limites_endpoint and medido[chave] > limites_endpoint[chave]:
+                falhas.append(f"{nome}: {chave} {medido[chave]} > limite {limites_endpoint[chave]}")
+    return falhas
+
+
+def limites_a_partir_de(resultado):
+    """Limites com folga sobre o resultado medido"""
+    return {
+        # Os limites só valem para o mesmo cenário
+        'parametros': resultado['parametros'],
+        'req_s_minimo': round(resultado['req_s'] * FOLGA_VAZAO, 1),
+        'taxa_erros_maxima': 0.0,
+        'endpoints': {
+            # p99 varia muito em execuções curtas; só o p95 é gravado
+            nome: {'p95_ms': round(max(medido['p95_ms'] * FOLGA_LATENCIA, LIMITE_MINIMO_MS), 1)}
+            for nome, medido in resultado['endpoints'].items()
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--mesas', type=int, default=10, help='mesas simultâneas (N)')
+    parser.add_argument('--clientes', type=int, default=4, help='clientes por mesa (M)')
+    parser.add_argument('--rodadas', type=int, default=3, help='rodadas (sentar, pedir, pagar) por mesa')
+    parser.add_argument('--admins', type=int, default=2, help='painéis administrativos consultando')
+    parser.add_argument('--intervalo-admin', type=float, default=0.5, help='segundos entre consultas do painel')
+    parser.add_argument('--pausa', type=float, default=0.0, help='pausa máxima (s) entre ações de um cliente')
+    parser.add_argument('--mesas-banco', type=int, default=50, help='mesas no banco')
+    parser.add_argument('--cardapio', type=int, default=15, help='itens no cardápio')
+    parser.add_argument('--historico', type=int, default=5000, help='pedidos antigos já pagos no banco')
+    parser.add_argument('--semente', type=int, default=42)
+    parser.add_argument('--limites', default=LIMITES_PADRAO, help='arquivo JSON com os limites')
+    parser.add_argument('--sem-limites', action='store_true', help='não compara com os limites')
+    parser.add_argument('--gravar-limites', action='store_true', help='grava os limites a partir desta execução')
+    parser.add_argument('--json', help='grava o resultado neste arquivo')
+    args = parser.parse_args()
+
+    if args.mesas > args.mesas_banco:
+        parser.error('--mesas não pode ser maior que --mesas-banco')
+    random.seed(args.semente)
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        app = create_app({
+            'CAMINHO_DB': os.path.join(diretorio, 'rush.db'),
+            'ARQUIVAMENTO_INTERVALO': 0,
+        })
+        with app.app_context():
+            migrar_banco()
+            popular(args.mesas_banco, args.cardapio, args.historico)
+
+        registro, duracao = simular(app, args)
+
+        with app.app_context():
+            for engine in db.engines.values():
+                engine.dispose()
+
+    resultado = resumir(registro, duracao)
+    resultado['parametros'] = {
+        chave: getattr(args, chave)
+        for chave in ('mesas', 'clientes', 'rodadas', 'admins', 'intervalo_admin', 'pausa',
+                      'mesas_banco', 'cardapio', 'historico', 'semente')
+    }
+
+    print(
+        f"{resultado['requisicoes']} requisições em {duracao:.2f}s ({resultado['req_s']:.0f} req/s), "
+        f"{args.mesas} mesas x {args.clientes} clientes x {args.rodadas} rodadas, {args.admins} painéis"
+    )
+    print(f"{'endpoint':<48} {'req':>6} {'req/s':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'erros':>6}")
+    for nome, medido in resultado['endpoints'].items():
+        print(
+            f"{nome:<48} {medido['requisicoes']:>6} {medido['req_s']:>7.1f} {medido['p50_ms']:>8.2f} "
+            f"{medido['p95_ms']:>8.2f} {medido['p99_ms']:>8.2f} {medido['erros']:>6}"
+        )
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(resultado, f, indent=2, ensure_ascii=False)
+
+    if args.gravar_limites:
+        with open(args.limites, 'w', encoding='utf-8') as f:
+            json.dump(limites_a_partir_de(resultado), f, indent=2, ensure_ascii=False)
+            f.write('\n')
+        print(f"Limites gravados em {args.limites}")
+        return
+
+    if args.sem_limites:
+        return
+
+    with open(args.limites, encoding='utf-8') as f:
+        limites = json.load(f)
+    if limites.get('parametros', resultado['parametros']) != resultado['parametros']:
+        print(
+            f"\nOs limites de {args.limites} foram gravados para outro cenário "
+            f"({limites['parametros']}); use --limites com um arquivo gravado para este cenário "
+            f"(--gravar-limites)"
+        )
+        return
+
+    falhas = verificar_limites(resultado, limites)
+    if falhas:
+        print(f"\n{len(falhas)} limite(s) ultrapassado(s):")
+        for falha in falhas:
+            print(f"  {falha}")
+        sys.exit(1)
+    print("\nDentro dos limites")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,251 @@
+"""
+Micro-benchmarks dos laços internos
+
+Mede, isoladamente:
+- Mesa/Pedido/ItemPedido.to_dict em pedidos com 10, 100 e 1000 itens
+  (completo e compacto)
+- o agrupamento do cardápio por categoria usado em GET /api/cardapio,
+  sozinho e com a consulta e o JSON (_serializar_cardapio)
+- QRCodeGenerator.gerar_qr_mesa com e sem gravação do arquivo
+- QRCodeGenerator.gerar_html_qr_codes para 10, 100 e 1000 mesas
+
+Cada benchmark tem duas medições separadas: o tempo por chamada
+(timeit, várias amostras) e o pico de memória alocada em uma chamada
+(tracemalloc, que deixa o código mais lento e por isso não é usado junto
+com o tempo). O resultado pode ser gravado em JSON e comparado com o de
+outro commit.
+
+Uso:
+    python benchmarks/bench_micro.py
+    python benchmarks/bench_micro.py --json antes.json
+    python benchmarks/bench_micro.py --json depois.json --comparar antes.json
+    python benchmarks/bench_micro.py --filtro qr_html --repeticoes 3
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import timeit
+import tracemalloc
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from sqlalchemy import insert
+from sqlalchemy.orm import selectinload
+
+from src.models.restaurante import db, Mesa, ItemCardapio, Pedido, ItemPedido, StatusMesa
+from src.routes.restaurante import _agrupar_por_categoria, _serializar_cardapio
+from src.utils.qr_generator import QRCodeGenerator
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CATEGORIAS = ('entrada', 'prato_principal', 'bebida', 'sobremesa')
+TAMANHOS_PEDIDO = (10, 100, 1000)
+TAMANHOS_CARDAPIO = (15, 150, 1500)
+TAMANHOS_HTML = (10, 100, 1000)
+
+
+def criar_app(caminho_db):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{caminho_db}"
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    return app
+
+
+def popular():
+    """Cria o maior cardápio, uma mesa por tamanho de pedido e os pedidos"""
+    db.session.execute(insert(ItemCardapio), [
+        {
+            'nome': f"Item {i}", 'descricao': "Descrição do item " * 4, 'preco': 5.0 + i % 50,
+            'categoria': CATEGORIAS[i % len(CATEGORIAS)], 'disponivel': True
+        }
+        for i in range(max(TAMANHOS_CARDAPIO))
+    ])
+    for numero, linhas in enumerate(TAMANHOS_PEDIDO, start=1):
+        mesa = Mesa(numero=numero, status=StatusMesa.ABERTA.value, cliente_nome=f"Cliente {numero}")
+        pedido = Pedido(mesa=mesa, cliente_nome=mesa.cliente_nome, status='aberto')
+        db.session.add_all([mesa, pedido])
+        db.session.flush()
+        db.session.execute(insert(ItemPedido), [
+            {
+                'pedido_id': pedido.id, 'item_cardapio_id': 1 + j % 15,
+                'quantidade': 1, 'preco_unitario': 10.0, 'subtotal': 10.0
+            }
+            for j in range(linhas)
+        ])
+    db.session.commit()
+
+
+def casos_serializacao():
+    """to_dict dos modelos, com tudo já carregado (nenhuma consulta durante a medição)"""
+    pedidos = (
+        Pedido.query
+        .options(selectinload(Pedido.itens).joinedload(ItemPedido.item_cardapio))
+        .all()
+    )
+    mesas = Mesa.query.all()
+
+    casos = {'mesa.to_dict': lambda: mesas[0].to_dict()}
+    for pedido in sorted(pedidos, key=lambda p: len(p.itens)):
+        linhas = len(pedido.itens)
+        casos[f'pedido.to_dict[itens={linhas}]'] = pedido.to_dict
+        casos[f'pedido.to_dict_compacto[itens={linhas}]'] = lambda pedido=pedido: pedido.to_dict(compacto=True)
+    casos['item_pedido.to_dict'] = pedidos[0].itens[0].to_dict
+    return casos
+
+
+def casos_cardapio():
+    """Agrupamento por categoria (itens em memória) e o caminho completo com consulta e JSON"""
+    todos = ItemCardapio.query.order_by(ItemCardapio.id).all()
+    casos = {}
+    for tamanho in TAMANHOS_CARDAPIO:
+        itens = todos[:tamanho]
+        casos[f'cardapio_agrupar[itens={tamanho}]'] = lambda itens=itens: _agrupar_por_categoria(itens)
+    # Todos os itens estão disponíveis: a consulta retorna o maior cardápio
+    casos[f'cardapio_serializar[itens={len(todos)}]'] = _serializar_cardapio
+    return casos
+
+
+def casos_qr(diretorio):
+    generator = QRCodeGenerator(base_url="http://192.168.1.11:5001")
+    diretorio_qr = os.path.join(diretorio, 'qr_codes')
+    os.makedirs(diretorio_qr, exist_ok=True)
+
+    casos = {
+        'qr_mesa[sem_arquivo]': lambda: generator.gerar_qr_mesa(7, salvar_arquivo=False),
+        'qr_mesa[com_arquivo]': lambda: generator.gerar_qr_mesa(7, diretorio_saida=diretorio_qr),
+    }
+
+    _, base64_exemplo = generator.gerar_qr_mesa(1, diretorio_saida=diretorio_qr)
+    for quantidade in TAMANHOS_HTML:
+        # Mesmo formato retornado por gerar_qr_todas_mesas (caminho do arquivo, base64 e URL)
+        dados = {
+            numero: {
+                'arquivo': os.path.join(diretorio_qr, f"mesa_{numero:02d}.png"),
+                'base64': base64_exemplo,
+                'url': generator.url_mesa(numero),
+            }
+            for numero in range(1, quantidade + 1)
+        }
+        arquivo = os.path.join(diretorio_qr, f'impressao_{quantidade}.html')
+
+        def gerar_html(dados=dados, arquivo=arquivo):
+            # Silenciar o print da função para não medir a escrita no terminal
+            with contextlib.redirect_stdout(io.StringIO()):
+                generator.gerar_html_qr_codes(dados, arquivo)
+
+        casos[f'qr_html[mesas={quantidade}]'] = gerar_html
+    return casos
+
+
+def medir_tempo(funcao, repeticoes):
+    """Tempo por chamada em microssegundos (cada amostra com ~0,2s de chamadas)"""
+    timer = timeit.Timer(funcao)
+    chamadas, _ = timer.autorange()
+    amostras = [total / chamadas * 1e6 for total in timer.repeat(repeat=repeticoes, number=chamadas)]
+    return {
+        'chamadas_por_amostra': chamadas,
+        'min_us': round(min(amostras), 3),
+        'mediana_us': round(statistics.median(amostras), 3),
+        'desvio_us': round(statistics.stdev(amostras), 3) if len(amostras) > 1 else 0.0,
+    }
+
+
+def medir_memoria(funcao):
+    """Pico de memória alocada (bytes) durante uma chamada, medido com tracemalloc"""
+    funcao()  # aquecimento: imports e caches não entram na medição
+    tracemalloc.start()
+    try:
+        antes, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        funcao()
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return pico - antes
+
+
+def commit_atual():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=RAIZ, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def comparar(resultados, anterior):
+    print(f"\nComparação com {anterior.get('commit') or 'execução anterior'} (atual / anterior):")
+    print(f"{'benchmark':<42} {'tempo':>8} {'memória':>8}")
+    for nome, atual in resultados.items():
+        antigo = anterior['resultados'].get(nome)
+        if antigo is None:
+            print(f"{nome:<42} {'novo':>8}")
+            continue
+        tempo = atual['tempo']['mediana_us'] / antigo['tempo']['mediana_us']
+        memoria = (
+            f"{atual['pico_memoria_bytes'] / antigo['pico_memoria_bytes']:>7.2f}x"
+            if antigo.get('pico_memoria_bytes') else f"{'-':>8}"
+        )
+        print(f"{nome:<42} {tempo:>7.2f}x {memoria}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeticoes', type=int, default=5, help='amostras de tempo por benchmark')
+    parser.add_argument('--filtro', nargs='+', help='roda apenas os benchmarks que contêm um destes textos')
+    parser.add_argument('--json', help='grava o resultado neste arquivo')
+    parser.add_argument('--comparar', help='resultado JSON de outra execução para comparar')
+    args = parser.parse_args()
+
+    resultados = {}
+    with tempfile.TemporaryDirectory() as diretorio:
+        app = criar_app(os.path.join(diretorio, 'micro.db'))
+        with app.app_context():
+            db.create_all()
+            popular()
+
+            casos = {**casos_serializacao(), **casos_cardapio(), **casos_qr(diretorio)}
+            if args.filtro:
+                casos = {nome: funcao for nome, funcao in casos.items() if any(f in nome for f in args.filtro)}
+
+            print(f"{'benchmark':<42} {'mediana':>12} {'mínimo':>12} {'pico memória':>14}")
+            for nome, funcao in casos.items():
+                tempo = medir_tempo(funcao, args.repeticoes)
+                pico = medir_memoria(funcao)
+                resultados[nome] = {'tempo': tempo, 'pico_memoria_bytes': pico}
+                print(
+                    f"{nome:<42} {tempo['mediana_us']:>10.1f}µs {tempo['min_us']:>10.1f}µs "
+                    f"{pico / 1024:>11.1f} KB"
+                )
+
+            db.engine.dispose()
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({
+                'commit': commit_atual(),
+                'data': datetime.now().isoformat(timespec='seconds'),
+                'python': platform.python_version(),
+                'plataforma': platform.platform(),
+                'repeticoes': args.repeticoes,
+                'resultados': resultados,
+            }, f, indent=2, ensure_ascii=False)
+
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as f:
+            comparar(resultados, json.load(f))
+
+
+if __name__ == '__main__':
+    main()
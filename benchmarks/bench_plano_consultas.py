@@ -0,0 +1,119 @@
+"""
+Verificação dos planos de execução (EXPLAIN QUERY PLAN) das consultas quentes
+
+Cada consulta usada nos caminhos mais frequentes da aplicação está descrita
+em _consultas_quentes. A verificação roda EXPLAIN QUERY PLAN em cada uma e
+encerra com código 1 se alguma delas fizer uma varredura completa de tabela
+(SCAN sem índice), o que indica que um índice foi removido ou deixou de ser
+usado. Um banco sem as tabelas atuais (não migrado) encerra com código 2.
+
+Uso:
+    python benchmarks/bench_plano_consultas.py              # esquema dos modelos em memória
+    python benchmarks/bench_plano_consultas.py --db src/database/app.db
+"""
+
+import argparse
+import os
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.exc import OperationalError
+
+from src.models.restaurante import db, Mesa, ItemCardapio, Pedido, ItemPedido, PedidoRemovido, StatusMesa
+from src.utils.plano_consultas import explicar, varreduras_completas
+
+
+def _consultas_quentes():
+    """Retorna {nome: select} com as consultas dos caminhos quentes"""
+    agora = datetime.utcnow()
+    inicio_dia = agora.replace(hour=0, minute=0, second=0, microsecond=0)
+    ativos = ['aberto', 'fechado']
+
+    return {
+        # GET /api/cardapio
+        'cardapio_disponivel': select(ItemCardapio).where(ItemCardapio.disponivel == True),  # noqa: E712
+        # GET /api/admin/mesas: pedidos ativos das mesas
+        'pedidos_ativos_por_mesa': (
+            select(Pedido)
+            .where(Pedido.mesa_id.in_([1, 2, 3]), Pedido.status.in_(ativos))
+            .order_by(Pedido.created_at.desc())
+        ),
+        # selectinload(Pedido.itens).joinedload(ItemPedido.item_cardapio)
+        'itens_dos_pedidos': (
+            select(ItemPedido, ItemCardapio)
+            .outerjoin(ItemCardapio, ItemPedido.item_cardapio_id == ItemCardapio.id)
+            .where(ItemPedido.pedido_id.in_([1, 2, 3]))
+        ),
+        # POST /api/admin/mesas/<id>/confirmar-pagamento
+        'pedido_fechado_da_mesa': select(Pedido).where(Pedido.mesa_id == 1, Pedido.status == 'fechado'),
+        # GET /api/pedidos/mesa/<id> e resetar_mesa
+        'pedidos_da_mesa': select(Pedido).where(Pedido.mesa_id == 1),
+        # GET /api/admin/estatisticas
+        'mesas_por_status': select(Mesa.id).where(Mesa.status == StatusMesa.LIVRE.value),
+        'pedidos_hoje': select(Pedido.id).where(
+            Pedido.created_at >= inicio_dia,
+            Pedido.created_at < inicio_dia + timedelta(days=1)
+        ),
+        # Sincronização incremental (?since=)
+        'mesas_alteradas': select(Mesa.id).where(Mesa.updated_at > agora),
+        'pedidos_alterados': select(Pedido.mesa_id).where(Pedido.updated_at > agora),
+        'pedidos_removidos': select(PedidoRemovido).where(PedidoRemovido.removido_em > agora),
+    }
+
+
+def verificar_planos(engine):
+    """
+    Verifica o plano de todas as consultas quentes
+
+    Args:
+        engine: Engine SQLAlchemy de um banco SQLite com o esquema criado
+
+    Returns:
+        dict: {nome: (plano, varreduras completas)}
+    """
+    resultados = {}
+    with engine.connect() as conexao:
+        for nome, consulta in _consultas_quentes().items():
+            sql = str(consulta.compile(dialect=engine.dialect, compile_kwargs={'literal_binds': True}))
+            plano = explicar(conexao, sql)
+            resultados[nome] = (plano, varreduras_completas(plano))
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--db', help='arquivo SQLite a verificar (padrão: esquema dos modelos em memória)')
+    args = parser.parse_args()
+
+    if args.db:
+        engine = create_engine(f"sqlite:///{args.db}")
+    else:
+        engine = create_engine("sqlite://")
+        db.metadata.create_all(engine)
+
+    try:
+        resultados = verificar_planos(engine)
+    except OperationalError as e:
+        # Banco sem as tabelas ou índices atuais (ex: ainda não migrado)
+        print(f"Não foi possível verificar {args.db}: {e.orig}")
+        print("Crie/migre o banco antes: flask --app src.main init-db")
+        sys.exit(2)
+
+    falhas = 0
+    for nome, (plano, varreduras) in resultados.items():
+        situacao = 'FALHA' if varreduras else 'ok'
+        falhas += bool(varreduras)
+        print(f"[{situacao:>5}] {nome}")
+        for detalhe in plano:
+            print(f"          {detalhe}")
+
+    if falhas:
+        print(f"\n{falhas} consulta(s) com varredura completa de tabela")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
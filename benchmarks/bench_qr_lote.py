@@ -0,0 +1,58 @@
+"""
+Benchmark da geração em lote de QR codes
+
+Compara a geração sequencial (processos=1) com o pool de processos de
+QRCodeGenerator.gerar_qr_todas_mesas para 10, 100 e 1000 mesas, gravando
+os arquivos em um diretório temporário.
+
+Uso:
+    python benchmarks/bench_qr_lote.py
+    python benchmarks/bench_qr_lote.py --mesas 10 100 1000 --processos 4
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils.qr_generator import QRCodeGenerator
+
+
+def medir(quantidade, processos):
+    """Retorna o tempo (s) para gerar e salvar os QR codes de `quantidade` mesas"""
+    generator = QRCodeGenerator(base_url="http://192.168.1.11:5001")
+    with tempfile.TemporaryDirectory() as diretorio:
+        inicio = time.perf_counter()
+        # Silenciar o print por mesa para não medir a escrita no terminal
+        with contextlib.redirect_stdout(io.StringIO()):
+            qr_codes = generator.gerar_qr_todas_mesas(
+                quantidade_mesas=quantidade, diretorio_saida=diretorio, processos=processos
+            )
+        duracao = time.perf_counter() - inicio
+    assert len(qr_codes) == quantidade
+    return duracao
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--mesas', type=int, nargs='+', default=[10, 100, 1000])
+    parser.add_argument('--processos', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    print(f"{'mesas':>6}  {'sequencial':>12}  {f'pool ({args.processos} proc.)':>16}  {'ganho':>6}")
+    for quantidade in args.mesas:
+        sequencial = medir(quantidade, processos=1)
+        paralelo = medir(quantidade, processos=args.processos)
+        print(
+            f"{quantidade:>6}  {sequencial * 1000:>10.0f}ms  {paralelo * 1000:>14.0f}ms  "
+            f"{sequencial / paralelo:>5.1f}x"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,162 @@
+"""
+Comparação de vazão entre o servidor de desenvolvimento e o servidor WSGI
+
+Inicializa um banco SQLite temporário (flask init-db), sobe o servidor
+escolhido em um subprocesso e dispara clientes HTTP concorrentes com uma
+mistura de leituras (cardápio, painel admin) e escritas (pedidos) durante
+um tempo fixo. Informa requisições por segundo, latências p50/p95 e erros.
+
+Uso (Linux/Mac):
+    python benchmarks/bench_servidor_http.py --servidor dev
+    python benchmarks/bench_servidor_http.py --servidor gunicorn --workers 4 --threads 8
+    python benchmarks/bench_servidor_http.py --servidor waitress --threads 16
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def comando_servidor(args):
+    if args.servidor == 'dev':
+        return [sys.executable, os.path.join('src', 'main.py')]
+    if args.servidor == 'gunicorn':
+        return [
+            sys.executable, '-m', 'gunicorn', '-w', str(args.workers), '--threads', str(args.threads),
+            '-b', f'127.0.0.1:{args.porta}', '--log-level', 'warning', 'src.wsgi:app'
+        ]
+    return [
+        sys.executable, '-m', 'waitress', f'--threads={args.threads}', f'--port={args.porta}',
+        '--host=127.0.0.1', 'src.wsgi:app'
+    ]
+
+
+def aguardar_servidor(porta, limite=30):
+    fim = time.time() + limite
+    while time.time() < fim:
+        try:
+            conexao = http.client.HTTPConnection('127.0.0.1', porta, timeout=2)
+            conexao.request('GET', '/api/mesas')
+            if conexao.getresponse().status == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Servidor não respondeu na porta {porta}")
+
+
+def requisicao_aleatoria():
+    """Retorna (nome, método, caminho, corpo)"""
+    sorteio = random.random()
+    mesa_id = random.randint(1, 10)
+    if sorteio < 0.30:
+        return 'GET /api/cardapio', 'GET', '/api/cardapio', None
+    if sorteio < 0.50:
+        return 'GET /api/admin/mesas', 'GET', '/api/admin/mesas', None
+    if sorteio < 0.70:
+        return 'GET /api/admin/estatisticas', 'GET', '/api/admin/estatisticas', None
+    if sorteio < 0.80:
+        return 'GET /api/mesas', 'GET', '/api/mesas', None
+    itens = [{'item_cardapio_id': random.randint(1, 16), 'quantidade': 1} for _ in range(3)]
+    corpo = {'mesa_id': mesa_id, 'cliente_nome': 'Carga', 'itens': itens}
+    return 'POST /api/pedidos', 'POST', '/api/pedidos', corpo
+
+
+def gerar_carga(porta, clientes, duracao):
+    latencias = []
+    erros = Counter()
+    lock = threading.Lock()
+    fim = time.perf_counter() + duracao
+
+    def cliente():
+        conexao = http.client.HTTPConnection('127.0.0.1', porta, timeout=30)
+        minhas = []
+        while time.perf_counter() < fim:
+            nome, metodo, caminho, corpo = requisicao_aleatoria()
+            dados = json.dumps(corpo) if corpo is not None else None
+            cabecalhos = {'Content-Type': 'application/json'} if corpo is not None else {}
+            inicio = time.perf_counter()
+            try:
+                conexao.request(metodo, caminho, body=dados, headers=cabecalhos)
+                resposta = conexao.getresponse()
+                resposta.read()
+                status = resposta.status
+            except (OSError, http.client.HTTPException) as e:
+                conexao.close()
+                conexao = http.client.HTTPConnection('127.0.0.1', porta, timeout=30)
+                status = type(e).__name__
+            minhas.append(time.perf_counter() - inicio)
+            if status not in (200, 201):
+                with lock:
+                    erros[f"{nome} -> {status}"] += 1
+        with lock:
+            latencias.extend(minhas)
+
+    threads = [threading.Thread(target=cliente) for _ in range(clientes)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencias, erros
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--servidor', choices=['dev', 'gunicorn', 'waitress'], default='dev')
+    parser.add_argument('--workers', type=int, default=4, help='processos (gunicorn)')
+    parser.add_argument('--threads', type=int, default=8, help='threads por processo (gunicorn/waitress)')
+    parser.add_argument('--clientes', type=int, default=32, help='clientes HTTP concorrentes')
+    parser.add_argument('--duracao', type=float, default=10, help='segundos de carga')
+    parser.add_argument('--porta', type=int, default=5055)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        env = dict(
+            os.environ,
+            CAMINHO_DB=os.path.join(diretorio, 'bench.db'),
+            PORT=str(args.porta),
+            ARQUIVAMENTO_INTERVALO='0',
+        )
+        subprocess.run(
+            [sys.executable, '-m', 'flask', '--app', 'src.main', 'init-db'],
+            cwd=RAIZ, env=env, check=True, stdout=subprocess.DEVNULL
+        )
+
+        servidor = subprocess.Popen(
+            comando_servidor(args), cwd=RAIZ, env=env, start_new_session=True,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            aguardar_servidor(args.porta)
+            latencias, erros = gerar_carga(args.porta, args.clientes, args.duracao)
+        finally:
+            # Encerrar o grupo inteiro (o reloader do modo debug cria um processo filho)
+            os.killpg(servidor.pid, signal.SIGTERM)
+            servidor.wait()
+
+    latencias.sort()
+    total = len(latencias)
+    p95 = latencias[int(total * 0.95) - 1] if total else 0
+    print(
+        f"{args.servidor}: {total / args.duracao:.0f} req/s, "
+        f"p50 {statistics.median(latencias) * 1000:.1f}ms, p95 {p95 * 1000:.1f}ms, "
+        f"{sum(erros.values())} erros em {total} requisições ({args.clientes} clientes)"
+    )
+    for mensagem, quantidade in erros.most_common(5):
+        print(f"  {quantidade:>6}  {mensagem}")
+
+
+if __name__ == '__main__':
+    main()
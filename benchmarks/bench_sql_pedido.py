@@ -0,0 +1,112 @@
+"""
+Verificação do número de comandos SQL na criação de um pedido
+
+Envia POST /api/pedidos com um pedido de N linhas (padrão 50) para a
+aplicação completa (create_app), contra um banco SQLite temporário, e conta
+os comandos SQL executados durante a requisição (evento
+before_cursor_execute de todos os engines). Encerra com código 1 se a
+resposta não for 201 ou se a contagem passar do limite.
+
+O número de comandos não deve depender do número de linhas: uma consulta
+IN para os preços, o INSERT do pedido, um INSERT em lote das linhas e
+duas consultas para montar a resposta.
+
+Uso:
+    python benchmarks/bench_sql_pedido.py
+    python benchmarks/bench_sql_pedido.py --linhas 200 --limite 5 --mostrar-sql
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event, insert
+
+from src.main import create_app
+from src.models.restaurante import db, Mesa, ItemCardapio, StatusMesa
+from src.utils.inicializacao import migrar_banco
+
+LIMITE_PADRAO = 5
+
+
+def popular(itens_cardapio):
+    db.session.add(Mesa(numero=1, status=StatusMesa.LIVRE.value))
+    db.session.execute(insert(ItemCardapio), [
+        {'nome': f"Item {i}", 'preco': 10.0 + i, 'categoria': 'prato_principal', 'disponivel': True}
+        for i in range(itens_cardapio)
+    ])
+    db.session.commit()
+
+
+def contar_comandos(app, corpo):
+    """Envia o pedido e retorna (resposta, comandos SQL executados durante a requisição)"""
+    comandos = []
+
+    def antes_do_comando(conn, cursor, statement, parameters, context, executemany):
+        comandos.append(statement)
+
+    with app.app_context():
+        engines = list(db.engines.values())
+    for engine in engines:
+        event.listen(engine, 'before_cursor_execute', antes_do_comando)
+    try:
+        resposta = app.test_client().post('/api/pedidos', json=corpo)
+    finally:
+        for engine in engines:
+            event.remove(engine, 'before_cursor_execute', antes_do_comando)
+    return resposta, comandos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--linhas', type=int, default=50, help='linhas (itens distintos) no pedido')
+    parser.add_argument('--limite', type=int, default=LIMITE_PADRAO, help='máximo de comandos SQL aceitos')
+    parser.add_argument('--mostrar-sql', action='store_true', help='imprime os comandos executados')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        app = create_app({
+            'CAMINHO_DB': os.path.join(diretorio, 'sql_pedido.db'),
+            'ARQUIVAMENTO_INTERVALO': 0,
+        })
+        with app.app_context():
+            migrar_banco()
+            popular(args.linhas)
+
+        corpo = {
+            'mesa_id': 1,
+            'cliente_nome': 'Cliente',
+            'itens': [{'item_cardapio_id': i, 'quantidade': 2} for i in range(1, args.linhas + 1)],
+        }
+        # Primeira requisição só para aquecer caches (compilação de SQL, rotas)
+        app.test_client().post('/api/pedidos', json=corpo)
+        resposta, comandos = contar_comandos(app, corpo)
+
+        with app.app_context():
+            for engine in db.engines.values():
+                engine.dispose()
+
+    if args.mostrar_sql:
+        for numero, comando in enumerate(comandos, start=1):
+            print(f"{numero:>3}. {' '.join(comando.split())}")
+
+    print(f"POST /api/pedidos com {args.linhas} linhas: {len(comandos)} comandos SQL (limite {args.limite})")
+
+    if resposta.status_code != 201:
+        print(f"Resposta inesperada: {resposta.status_code} {resposta.get_data(as_text=True)[:200]}")
+        sys.exit(1)
+    pedido = resposta.get_json()
+    if len(pedido['itens']) != args.linhas:
+        print(f"O pedido foi criado com {len(pedido['itens'])} linhas, esperado {args.linhas}")
+        sys.exit(1)
+    if len(comandos) > args.limite:
+        print("Acima do limite: a criação do pedido voltou a executar comandos por linha?")
+        sys.exit(1)
+    print("Dentro do limite")
+
+
+if __name__ == '__main__':
+    main()
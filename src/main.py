@@ -1,290 +1,163 @@
 import os
 import sys
+from datetime import timedelta
 # DON'T CHANGE THIS !!!
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from flask import Flask, send_from_directory
+from flask import Flask
 from flask_cors import CORS
 from src.models.restaurante import db
 from src.routes.user import user_bp
 from src.routes.restaurante import restaurante_bp
 from src.routes.qr_codes import qr_bp
 from src.routes.admin import admin_bp
+from src.routes.frontend import frontend_bp
+from src.utils.banco import configurar_sqlite, registrar_pragmas
+from src.utils.metricas import registrar_metricas
+from src.utils.consultas_lentas import registrar_consultas_lentas, LIMIAR_MS_PADRAO, CAPACIDADE_PADRAO
+from src.utils.perfil import registrar_perfil, PERFIS_GUARDADOS_PADRAO, TOP_N_PADRAO, INTERVALO_AMOSTRAGEM_PADRAO
+from src.utils.assets import PipelineAssets
+from src.utils.cache_qr import cache_qr_codes, LIMITE_BYTES_PADRAO
+from src.utils.cache_cardapio import cache_cardapio, INTERVALO_VERIFICACAO_PADRAO
+from src.utils.arquivamento import IDADE_MINIMA_PADRAO, iniciar_varredura_periodica, varrer_pedidos_pagos
+from src.utils.inicializacao import inicializar
+from src.utils.tempo_inicializacao import relatorio_inicializacao
 
-app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
-app.config['SECRET_KEY'] = 'asdf#FGSgvasgf$5$WGT'
 
-# Configurar CORS para permitir requisições do frontend
-CORS(app)
-
-app.register_blueprint(user_bp, url_prefix='/api')
-app.register_blueprint(restaurante_bp, url_prefix='/api')
-app.register_blueprint(qr_bp, url_prefix='/api')
-app.register_blueprint(admin_bp, url_prefix='/api')
-
-# Configuração do banco de dados SQLite
-app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}"
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-db.init_app(app)
-
-# Criar tabelas e dados iniciais
-with app.app_context():
-    db.create_all()
+def create_app(config=None):
+    """
+    Cria e configura a aplicação
     
-    # Importar aqui para evitar import circular
-    from src.models.restaurante import Mesa, ItemCardapio, StatusMesa
+    Não cria tabelas, não popula o banco e não gera QR codes: isso é feito
+    uma única vez pelo comando `flask --app src.main init-db` (ou ao rodar
+    este arquivo diretamente, em desenvolvimento). Assim, vários workers
+    podem chamar create_app ao mesmo tempo com segurança.
     
-    # Criar mesas se não existirem
-    if Mesa.query.count() == 0:
-        for i in range(1, 11):  # Criar 10 mesas
-            mesa = Mesa(numero=i, status=StatusMesa.LIVRE.value)
-            db.session.add(mesa)
+    Args:
+        config (dict): Valores que sobrescrevem a configuração padrão
         
-        # Criar itens do cardápio se não existirem
-        itens_cardapio = [
-            # Entradas
-            ItemCardapio(nome="Bruschetta", descricao="Pão italiano com tomate, manjericão e azeite", preco=15.90, categoria="entrada"),
-            ItemCardapio(nome="Bolinho de Bacalhau", descricao="Tradicional bolinho português (4 unidades)", preco=18.50, categoria="entrada"),
-            ItemCardapio(nome="Carpaccio de Salmão", descricao="Fatias finas de salmão com alcaparras", preco=22.90, categoria="entrada"),
-            
-            # Pratos Principais
-            ItemCardapio(nome="Risotto de Camarão", descricao="Risotto cremoso com camarões frescos", preco=45.90, categoria="prato_principal"),
-            ItemCardapio(nome="Filé Mignon Grelhado", descricao="Filé mignon com batatas rústicas e legumes", preco=52.90, categoria="prato_principal"),
-            ItemCardapio(nome="Salmão Grelhado", descricao="Salmão grelhado com quinoa e aspargos", preco=48.90, categoria="prato_principal"),
-            ItemCardapio(nome="Massa à Carbonara", descricao="Espaguete com bacon, ovos e queijo parmesão", preco=35.90, categoria="prato_principal"),
-            
-            # Bebidas
-            ItemCardapio(nome="Água Mineral", descricao="Água mineral sem gás 500ml", preco=4.50, categoria="bebida"),
-            ItemCardapio(nome="Refrigerante", descricao="Coca-Cola, Guaraná ou Fanta 350ml", preco=6.90, categoria="bebida"),
-            ItemCardapio(nome="Suco Natural", descricao="Laranja, limão ou maracujá", preco=8.90, categoria="bebida"),
-            ItemCardapio(nome="Vinho Tinto", descricao="Taça de vinho tinto da casa", preco=15.90, categoria="bebida"),
-            ItemCardapio(nome="Cerveja", descricao="Cerveja gelada long neck", preco=7.90, categoria="bebida"),
-            
-            # Sobremesas
-            ItemCardapio(nome="Tiramisu", descricao="Clássica sobremesa italiana", preco=16.90, categoria="sobremesa"),
-            ItemCardapio(nome="Petit Gateau", descricao="Bolinho de chocolate com sorvete", preco=18.90, categoria="sobremesa"),
-            ItemCardapio(nome="Cheesecake", descricao="Cheesecake de frutas vermelhas", preco=14.90, categoria="sobremesa"),
-        ]
-        
-        for item in itens_cardapio:
-            db.session.add(item)
-        
-        db.session.commit()
-        print("Dados iniciais criados: 10 mesas e cardápio completo")
+    Returns:
+        Flask: Aplicação configurada
+    """
+    with relatorio_inicializacao.fase('create_app: configuração'):
+        app = _criar_app_configurado(config)
     
-    # Gerar QR codes automaticamente
-    try:
-        from src.utils.qr_generator import QRCodeGenerator
-        import os
-        
-        # Verificar se o diretório de QR codes existe
-        qr_dir = os.path.join(os.path.dirname(__file__), 'static', 'qr_codes')
-        
-        # Verificar se já existem QR codes (para não regenerar sempre)
-        qr_files_exist = False
-        if os.path.exists(qr_dir):
-            qr_files = [f for f in os.listdir(qr_dir) if f.startswith('mesa_') and f.endswith('.png')]
-            qr_files_exist = len(qr_files) >= 10  # Se tem pelo menos 10 QR codes
-        
-        if not qr_files_exist:
-            print("Gerando QR codes FIXOS para todas as mesas...")
-            print("IMPORTANTE: Estes QR codes ficarão FIXOS nas mesas!")
-            
-            # Usar IP da rede local em vez de localhost
-            base_url = "http://192.168.1.11:5001"
-            
-            generator = QRCodeGenerator(base_url=base_url)
-            
-            # Gerar QR codes para todas as 10 mesas
-            qr_codes = generator.gerar_qr_todas_mesas(quantidade_mesas=10)
-            
-            # Gerar arquivo HTML para impressão
-            html_file = generator.gerar_html_qr_codes(qr_codes)
-            
-            print(f"✅ QR codes FIXOS gerados com sucesso! Total: {len(qr_codes)}")
-            print(f"📄 Arquivo de impressão: {html_file}")
-            print("🖨️  Acesse para imprimir: http://192.168.1.11:5001/api/qr-codes/impressao")
-            print("⚠️  IMPORTANTE: QR codes apontam para http://192.168.1.11:5001")
-            print("🔒 Estes QR codes são PERMANENTES e não serão regenerados!")
-        else:
-            print("✅ QR codes já existem e são FIXOS nas mesas")
-            print("🖨️  Para imprimir: http://192.168.1.11:5001/api/qr-codes/impressao")
-            
-    except Exception as e:
-        print(f"Erro ao gerar QR codes: {e}")
-        print("Você pode gerar os QR codes manualmente acessando: http://192.168.1.11:5001/api/qr-codes/regenerar")
-
-@app.route('/admin')
-def admin_panel():
-    """Rota para o painel administrativo"""
-    static_folder_path = app.static_folder
-    if static_folder_path is None:
-        return "Static folder not configured", 404
+    # Configuração do banco de dados SQLite (WAL, PRAGMAs e engine de leitura separado)
+    with relatorio_inicializacao.fase('create_app: banco'):
+        configurar_sqlite(app, app.config['CAMINHO_DB'])
+        db.init_app(app)
+        registrar_pragmas(app, db)
+    
+    # Latência, comandos SQL e erros por endpoint (GET /api/admin/metrics)
+    if app.config['METRICAS_HABILITADAS']:
+        registrar_metricas(app, db)
+    
+    # Comandos SQL acima do limiar, com o plano de execução (GET /api/admin/slow-queries)
+    if app.config['CONSULTAS_LENTAS_LIMIAR_MS'] > 0:
+        registrar_consultas_lentas(app, db)
+    
+    # cProfile por requisição, sob demanda (token) ou por amostragem (GET /api/admin/perfis)
+    registrar_perfil(app, db)
     
-    admin_path = os.path.join(static_folder_path, 'admin.html')
-    if os.path.exists(admin_path):
-        return send_from_directory(static_folder_path, 'admin.html')
-    else:
-        return "admin.html not found", 404
+    cache_qr_codes.configurar(app.config['QR_CACHE_LIMITE_BYTES'])
+    cache_cardapio.configurar(app.config['CARDAPIO_VERIFICACAO_SEGUNDOS'])
+    
+    # Assets do frontend com fingerprint e variantes gzip/brotli, gerados em
+    # segundo plano (ou no primeiro uso), sem atrasar a inicialização
+    app.extensions['assets_estaticos'] = PipelineAssets(app.static_folder)
+    app.extensions['assets_estaticos'].iniciar_em_segundo_plano()
+    
+    with relatorio_inicializacao.fase('create_app: blueprints'):
+        app.register_blueprint(user_bp, url_prefix='/api')
+        app.register_blueprint(restaurante_bp, url_prefix='/api')
+        app.register_blueprint(qr_bp, url_prefix='/api')
+        app.register_blueprint(admin_bp, url_prefix='/api')
+        app.register_blueprint(frontend_bp)
+    
+    registrar_comandos(app)
+    
+    return app
 
-@app.route('/reset')
-def reset_panel():
-    """Rota para o painel de reset de mesas"""
-    return """
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <title>Reset de Mesas - Restaurante QR</title>
-        <style>
-            body { 
-                font-family: Arial, sans-serif; 
-                margin: 20px; 
-                background-color: #f5f5f5;
-            }
-            .header {
-                display: flex;
-                justify-content: space-between;
-                align-items: center;
-                margin-bottom: 30px;
-                padding-bottom: 20px;
-                border-bottom: 2px solid #ddd;
-            }
-            .btn-voltar {
-                background: #3498db;
-                color: white;
-                padding: 10px 20px;
-                border: none;
-                border-radius: 5px;
-                cursor: pointer;
-                text-decoration: none;
-                display: inline-flex;
-                align-items: center;
-                gap: 8px;
-                font-size: 14px;
-            }
-            .btn-voltar:hover {
-                background: #2980b9;
-            }
-            .mesa { 
-                margin: 10px; 
-                padding: 15px; 
-                border: 1px solid #ccc; 
-                border-radius: 8px;
-                background: white;
-                box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-            }
-            .livre { 
-                background-color: #d4edda; 
-                border-color: #c3e6cb;
-            }
-            .ocupada { 
-                background-color: #f8d7da; 
-                border-color: #f5c6cb;
-            }
-            .btn-reset {
-                background: #e74c3c;
-                color: white;
-                padding: 8px 16px;
-                border: none;
-                border-radius: 4px;
-                cursor: pointer;
-                margin: 5px;
-            }
-            .btn-reset:hover {
-                background: #c0392b;
-            }
-            .mesa-info {
-                margin-bottom: 10px;
-            }
-            .mesa-status {
-                font-weight: bold;
-                margin-left: 10px;
-            }
-            .status-livre {
-                color: #27ae60;
-            }
-            .status-ocupada {
-                color: #e74c3c;
-            }
-        </style>
-    </head>
-    <body>
-        <div class="header">
-            <h1>Reset de Mesas - Restaurante QR</h1>
-            <a href="/admin" class="btn-voltar">
-                <i class="fas fa-arrow-left"></i>
-                Voltar ao Painel Admin
-            </a>
-        </div>
-        <div id="mesas"></div>
-        <script src="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/js/all.min.js"></script>
-        <script>
-            async function carregarMesas() {
-                const response = await fetch('/api/mesas');
-                const mesas = await response.json();
-                const container = document.getElementById('mesas');
-                
-                container.innerHTML = mesas.map(mesa => `
-                    <div class="mesa ${mesa.status === 'livre' ? 'livre' : 'ocupada'}">
-                        <div class="mesa-info">
-                            <strong>Mesa ${mesa.numero}</strong>
-                            <span class="mesa-status ${mesa.status === 'livre' ? 'status-livre' : 'status-ocupada'}">
-                                - Status: ${mesa.status}
-                            </span>
-                            ${mesa.cliente_nome ? `<br>Cliente: ${mesa.cliente_nome}` : ''}
-                        </div>
-                        ${mesa.status !== 'livre' ? 
-                            `<button class="btn-reset" onclick="resetarMesa(${mesa.id})">
-                                <i class="fas fa-redo"></i> Resetar Mesa
-                            </button>` : 
-                            '<span style="color: #27ae60; font-weight: bold;">✓ Livre</span>'
-                        }
-                    </div>
-                `).join('');
-            }
-            
-            async function resetarMesa(mesaId) {
-                if (confirm('Tem certeza que deseja resetar esta mesa?')) {
-                    try {
-                        const response = await fetch(`/api/mesas/${mesaId}/resetar`, {
-                            method: 'POST'
-                        });
-                        const data = await response.json();
-                        
-                        if (data.success) {
-                            alert('Mesa resetada com sucesso!');
-                            carregarMesas();
-                        } else {
-                            alert('Erro ao resetar mesa: ' + data.error);
-                        }
-                    } catch (error) {
-                        alert('Erro ao resetar mesa: ' + error);
-                    }
-                }
-            }
-            
-            carregarMesas();
-        </script>
-    </body>
-    </html>
-    """
 
-@app.route('/', defaults={'path': ''})
-@app.route('/<path:path>')
-def serve(path):
-    static_folder_path = app.static_folder
-    if static_folder_path is None:
-            return "Static folder not configured", 404
+def _criar_app_configurado(config):
+    """Cria o objeto Flask com a configuração lida do ambiente"""
+    app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
+    app.config['SECRET_KEY'] = 'asdf#FGSgvasgf$5$WGT'
+    
+    # Configurar CORS para permitir requisições do frontend
+    CORS(app)
+    
+    # Arquivo do banco SQLite
+    app.config['CAMINHO_DB'] = os.environ.get(
+        'CAMINHO_DB', os.path.join(os.path.dirname(__file__), 'database', 'app.db')
+    )
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    # Contadores de estatísticas em memória (usar apenas com um único processo)
+    app.config['ESTATISTICAS_EM_MEMORIA'] = os.environ.get('ESTATISTICAS_EM_MEMORIA', '0') == '1'
+    # Métricas por endpoint no formato do Prometheus
+    app.config['METRICAS_HABILITADAS'] = os.environ.get('METRICAS_HABILITADAS', '1') == '1'
+    # Log de consultas lentas (limiar em ms; 0 desliga) e tamanho do buffer
+    app.config['CONSULTAS_LENTAS_LIMIAR_MS'] = float(os.environ.get('CONSULTAS_LENTAS_LIMIAR_MS', LIMIAR_MS_PADRAO))
+    app.config['CONSULTAS_LENTAS_CAPACIDADE'] = int(os.environ.get('CONSULTAS_LENTAS_CAPACIDADE', CAPACIDADE_PADRAO))
+    # Perfil de requisições: token de administrador (cabeçalho X-Perfil; vazio
+    # desliga o modo sob demanda), perfis guardados, funções no relatório e
+    # amostragem (a cada N requisições dos endpoints listados, separados por vírgula)
+    app.config['PERFIL_TOKEN'] = os.environ.get('PERFIL_TOKEN') or None
+    app.config['PERFIL_CAPACIDADE'] = int(os.environ.get('PERFIL_CAPACIDADE', PERFIS_GUARDADOS_PADRAO))
+    app.config['PERFIL_TOP_N'] = int(os.environ.get('PERFIL_TOP_N', TOP_N_PADRAO))
+    app.config['PERFIL_AMOSTRAGEM_ENDPOINTS'] = os.environ.get('PERFIL_AMOSTRAGEM_ENDPOINTS', '')
+    app.config['PERFIL_AMOSTRAGEM_INTERVALO'] = int(
+        os.environ.get('PERFIL_AMOSTRAGEM_INTERVALO', INTERVALO_AMOSTRAGEM_PADRAO)
+    )
+    # Arquivamento de pedidos pagos (intervalo em segundos; 0 desliga a varredura)
+    app.config['ARQUIVAMENTO_INTERVALO'] = int(os.environ.get('ARQUIVAMENTO_INTERVALO', '600'))
+    app.config['ARQUIVAMENTO_IDADE_MINIMA'] = timedelta(
+        seconds=int(os.environ.get('ARQUIVAMENTO_IDADE_MINIMA', int(IDADE_MINIMA_PADRAO.total_seconds())))
+    )
+    # Limite de memória do cache LRU de QR codes dinâmicos
+    app.config['QR_CACHE_LIMITE_BYTES'] = int(os.environ.get('QR_CACHE_LIMITE_BYTES', LIMITE_BYTES_PADRAO))
+    # Intervalo máximo (s) para um worker notar alterações do cardápio feitas por outro
+    app.config['CARDAPIO_VERIFICACAO_SEGUNDOS'] = float(
+        os.environ.get('CARDAPIO_VERIFICACAO_SEGUNDOS', INTERVALO_VERIFICACAO_PADRAO)
+    )
+    # URL para a qual os QR codes fixos das mesas apontam (IP da rede local)
+    app.config['QR_BASE_URL'] = os.environ.get('QR_BASE_URL', 'http://192.168.1.11:5001')
+    # Maior número de mesa aceito pelas rotas de QR codes
+    app.config['QR_MAX_MESAS'] = int(os.environ.get('QR_MAX_MESAS', '50'))
+    
+    if config:
+        app.config.update(config)
+    
+    return app
+
 
-    if path != "" and os.path.exists(os.path.join(static_folder_path, path)):
-        return send_from_directory(static_folder_path, path)
-    else:
-        index_path = os.path.join(static_folder_path, 'index.html')
-        if os.path.exists(index_path):
-            return send_from_directory(static_folder_path, 'index.html')
-        else:
-            return "index.html not found", 404
+def registrar_comandos(app):
+    """Registra os comandos de linha de comando (flask --app src.main <comando>)"""
+    
+    @app.cli.command('init-db')
+    def init_db_comando():
+        """Cria/migra as tabelas, popula os dados iniciais e gera os QR codes fixos"""
+        inicializar(app)
+    
+    @app.cli.command('arquivar-pedidos')
+    def arquivar_pedidos_comando():
+        """Move para o histórico os pedidos pagos há mais que a idade mínima"""
+        total = varrer_pedidos_pagos(app.config['ARQUIVAMENTO_IDADE_MINIMA'])
+        print(f"{total} pedido(s) arquivado(s)")
 
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5001, debug=True)
+    # Servidor de desenvolvimento: inicializa o banco e os QR codes a cada execução.
+    # Em produção, use `flask --app src.main init-db` uma vez e sirva src/wsgi.py.
+    app = create_app()
+    with app.app_context():
+        # Os QR codes são verificados/gerados em segundo plano; o servidor não espera por eles
+        inicializar(app, qr_em_segundo_plano=True)
+    
+    if os.environ.get('RELATORIO_INICIALIZACAO') == '1':
+        print(relatorio_inicializacao.como_texto())
+    
+    # Com o reloader do modo debug, só o processo filho (que atende as requisições) varre
+    if app.config['ARQUIVAMENTO_INTERVALO'] > 0 and os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        iniciar_varredura_periodica(app, app.config['ARQUIVAMENTO_INTERVALO'], app.config['ARQUIVAMENTO_IDADE_MINIMA'])
+    app.run(host='0.0.0.0', port=int(os.environ.get('PORT', '5001')), debug=True)
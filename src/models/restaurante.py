@@ -13,10 +13,56 @@ Para uso em produção, considere:
 """
 
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
 from datetime import datetime
 from enum import Enum
+from src.utils.banco import SessaoRoteada
 
-db = SQLAlchemy()
+# Requisições GET/HEAD usam o engine somente leitura (ver src/utils/banco.py)
+db = SQLAlchemy(session_options={'class_': SessaoRoteada})
+
+def normalizar_campos(fields):
+    """
+    Normaliza a projeção de campos aceita pelos métodos to_dict
+    
+    Args:
+        fields: None (todos os campos), string "id,status,itens.quantidade",
+            lista de nomes (com ponto para campos aninhados) ou dicionário
+            já normalizado
+            
+    Returns:
+        dict: {campo: subcampos ou None} ou None para todos os campos
+    """
+    if fields is None or isinstance(fields, dict):
+        return fields
+    if isinstance(fields, str):
+        fields = fields.split(',')
+    
+    campos = {}
+    for caminho in fields:
+        caminho = caminho.strip()
+        if not caminho:
+            continue
+        nome, _, resto = caminho.partition('.')
+        if resto:
+            subcampos = campos.get(nome)
+            if nome in campos and subcampos is None:
+                continue  # campo já incluído por inteiro
+            campos[nome] = subcampos or {}
+            campos[nome].update(normalizar_campos([resto]))
+        else:
+            campos[nome] = None
+    return campos or None
+
+def _incluir(campos, nome):
+    """Indica se o campo faz parte da projeção"""
+    return campos is None or nome in campos
+
+def _projetar(dados, campos):
+    """Aplica a projeção ao dicionário serializado"""
+    if campos is None:
+        return dados
+    return {chave: valor for chave, valor in dados.items() if chave in campos}
 
 class StatusMesa(Enum):
     """Status possíveis para uma mesa"""
@@ -32,33 +78,41 @@ class Mesa(db.Model):
     Modelo para representar uma mesa do restaurante
     """
     __tablename__ = 'mesas'
+    __table_args__ = (
+        # Estatísticas e filtros por status
+        db.Index('ix_mesas_status', 'status'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     numero = db.Column(db.Integer, unique=True, nullable=False)
     status = db.Column(db.String(20), default=StatusMesa.LIVRE.value, nullable=False)
     cliente_nome = db.Column(db.String(100), nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
     
     # Relacionamento com pedidos
     pedidos = db.relationship('Pedido', backref='mesa', lazy=True, cascade='all, delete-orphan')
     
-    def to_dict(self):
-        """Converte o objeto Mesa para dicionário"""
-        return {
+    def to_dict(self, fields=None):
+        """Converte o objeto Mesa para dicionário (opcionalmente só os campos em fields)"""
+        return _projetar({
             'id': self.id,
             'numero': self.numero,
             'status': self.status,
             'cliente_nome': self.cliente_nome,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
-        }
+        }, normalizar_campos(fields))
 
 class ItemCardapio(db.Model):
     """
     Modelo para representar itens do cardápio
     """
     __tablename__ = 'itens_cardapio'
+    __table_args__ = (
+        # Cardápio disponível agrupado por categoria
+        db.Index('ix_itens_cardapio_disponivel_categoria', 'disponivel', 'categoria'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     nome = db.Column(db.String(100), nullable=False)
@@ -69,9 +123,9 @@ class ItemCardapio(db.Model):
     imagem_url = db.Column(db.String(200), nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
-    def to_dict(self):
-        """Converte o objeto ItemCardapio para dicionário"""
-        return {
+    def to_dict(self, fields=None):
+        """Converte o objeto ItemCardapio para dicionário (opcionalmente só os campos em fields)"""
+        return _projetar({
             'id': self.id,
             'nome': self.nome,
             'descricao': self.descricao,
@@ -80,13 +134,19 @@ class ItemCardapio(db.Model):
             'disponivel': self.disponivel,
             'imagem_url': self.imagem_url,
             'created_at': self.created_at.isoformat() if self.created_at else None
-        }
+        }, normalizar_campos(fields))
 
 class Pedido(db.Model):
     """
     Modelo para representar um pedido
     """
     __tablename__ = 'pedidos'
+    __table_args__ = (
+        # Pedido ativo mais recente de cada mesa (painel admin, confirmar pagamento)
+        db.Index('ix_pedidos_mesa_status_created', 'mesa_id', 'status', 'created_at'),
+        # Ids não são reaproveitados depois do arquivamento (tabelas novas)
+        {'sqlite_autoincrement': True},
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     mesa_id = db.Column(db.Integer, db.ForeignKey('mesas.id'), nullable=False)
@@ -94,8 +154,8 @@ class Pedido(db.Model):
     status = db.Column(db.String(50), default='aberto', nullable=False)  # "aberto", "fechado", "pago"
     total = db.Column(db.Float, default=0.0, nullable=False)
     observacoes = db.Column(db.Text, nullable=True)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
     
     # Relacionamento com itens do pedido
     itens = db.relationship('ItemPedido', backref='pedido', lazy=True, cascade='all, delete-orphan')
@@ -106,9 +166,17 @@ class Pedido(db.Model):
         self.total = total
         return total
     
-    def to_dict(self):
-        """Converte o objeto Pedido para dicionário"""
-        return {
+    def to_dict(self, fields=None, compacto=False):
+        """
+        Converte o objeto Pedido para dicionário
+        
+        Args:
+            fields: Projeção de campos (ver normalizar_campos)
+            compacto (bool): Se True, os itens referenciam apenas item_cardapio_id
+                em vez de incluir o item do cardápio completo
+        """
+        campos = normalizar_campos(fields)
+        dados = {
             'id': self.id,
             'mesa_id': self.mesa_id,
             'cliente_nome': self.cliente_nome,
@@ -116,15 +184,26 @@ class Pedido(db.Model):
             'total': self.total,
             'observacoes': self.observacoes,
             'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
-            'itens': [item.to_dict() for item in self.itens]
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
+        
+        # Só carregar os itens se eles fizerem parte da projeção
+        if _incluir(campos, 'itens'):
+            subcampos = campos.get('itens') if campos else None
+            dados['itens'] = [item.to_dict(fields=subcampos, compacto=compacto) for item in self.itens]
+        
+        return _projetar(dados, campos)
 
 class ItemPedido(db.Model):
     """
     Modelo para representar itens individuais dentro de um pedido
     """
     __tablename__ = 'itens_pedido'
+    __table_args__ = (
+        # Itens de um pedido (carregamento via selectinload)
+        db.Index('ix_itens_pedido_pedido_id', 'pedido_id'),
+        {'sqlite_autoincrement': True},
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     pedido_id = db.Column(db.Integer, db.ForeignKey('pedidos.id'), nullable=False)
@@ -142,16 +221,157 @@ class ItemPedido(db.Model):
         self.subtotal = self.quantidade * self.preco_unitario
         return self.subtotal
     
-    def to_dict(self):
-        """Converte o objeto ItemPedido para dicionário"""
-        return {
+    def to_dict(self, fields=None, compacto=False):
+        """
+        Converte o objeto ItemPedido para dicionário
+        
+        Args:
+            fields: Projeção de campos (ver normalizar_campos)
+            compacto (bool): Se True, omite o item do cardápio (fica só o item_cardapio_id)
+        """
+        campos = normalizar_campos(fields)
+        dados = {
             'id': self.id,
             'pedido_id': self.pedido_id,
             'item_cardapio_id': self.item_cardapio_id,
             'quantidade': self.quantidade,
             'preco_unitario': self.preco_unitario,
             'subtotal': self.subtotal,
+            'observacoes': self.observacoes
+        }
+        
+        if not compacto and _incluir(campos, 'item_cardapio'):
+            subcampos = campos.get('item_cardapio') if campos else None
+            dados['item_cardapio'] = self.item_cardapio.to_dict(fields=subcampos) if self.item_cardapio else None
+        
+        return _projetar(dados, campos)
+
+def itens_cardapio_referenciados(pedidos, fields=None):
+    """
+    Serializa uma única vez cada item do cardápio referenciado pelos pedidos,
+    para acompanhar pedidos serializados com compacto=True
+    
+    Args:
+        pedidos (list): Pedidos com itens (idealmente já carregados)
+        fields: Projeção de campos dos itens do cardápio
+        
+    Returns:
+        dict: {item_cardapio_id: item do cardápio serializado}
+    """
+    referenciados = {}
+    for pedido in pedidos:
+        for item in pedido.itens:
+            if item.item_cardapio_id not in referenciados and item.item_cardapio:
+                referenciados[item.item_cardapio_id] = item.item_cardapio.to_dict(fields=fields)
+    return referenciados
+
+class PedidoRemovido(db.Model):
+    """
+    Registro (tombstone) de um pedido removido, usado na sincronização
+    incremental para que os clientes saibam quais pedidos descartar
+    """
+    __tablename__ = 'pedidos_removidos'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    pedido_id = db.Column(db.Integer, nullable=False)
+    mesa_id = db.Column(db.Integer, nullable=False)
+    removido_em = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
+    
+    def to_dict(self):
+        """Converte o objeto PedidoRemovido para dicionário"""
+        return {
+            'id': self.pedido_id,
+            'mesa_id': self.mesa_id,
+            'removido_em': self.removido_em.isoformat() if self.removido_em else None
+        }
+
+class VersaoCache(db.Model):
+    """
+    Contador de versão de dados mantidos em cache nos processos (ex: cardápio)
+    
+    Incrementado na mesma transação que altera os dados; cada worker compara
+    a versão do banco com a do seu snapshot antes de servi-lo.
+    """
+    __tablename__ = 'versoes_cache'
+    
+    nome = db.Column(db.String(50), primary_key=True)
+    versao = db.Column(db.Integer, default=0, nullable=False)
+
+@event.listens_for(Pedido, 'after_delete')
+def registrar_pedido_removido(mapper, connection, target):
+    """Grava o tombstone na mesma transação em que o pedido é removido"""
+    connection.execute(
+        PedidoRemovido.__table__.insert().values(
+            pedido_id=target.id,
+            mesa_id=target.mesa_id,
+            removido_em=datetime.utcnow()
+        )
+    )
+
+class PedidoHistorico(db.Model):
+    """
+    Pedido arquivado (pago ou de uma mesa resetada)
+    
+    Guarda as colunas de Pedido (o id original fica em pedido_id) e a data
+    de arquivamento. Fica fora da tabela quente de pedidos e serve apenas
+    para relatórios.
+    """
+    __tablename__ = 'pedidos_historico'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    pedido_id = db.Column(db.Integer, nullable=False, index=True)
+    mesa_id = db.Column(db.Integer, nullable=False, index=True)
+    cliente_nome = db.Column(db.String(100), nullable=False)
+    status = db.Column(db.String(50), nullable=False)
+    total = db.Column(db.Float, default=0.0, nullable=False)
+    observacoes = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, index=True)
+    updated_at = db.Column(db.DateTime)
+    arquivado_em = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
+    
+    itens = db.relationship('ItemPedidoHistorico', lazy=True)
+    
+    def to_dict(self, fields=None):
+        """Converte o objeto PedidoHistorico para dicionário (opcionalmente só os campos em fields)"""
+        campos = normalizar_campos(fields)
+        dados = {
+            'id': self.pedido_id,
+            'mesa_id': self.mesa_id,
+            'cliente_nome': self.cliente_nome,
+            'status': self.status,
+            'total': self.total,
             'observacoes': self.observacoes,
-            'item_cardapio': self.item_cardapio.to_dict() if self.item_cardapio else None
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'arquivado_em': self.arquivado_em.isoformat() if self.arquivado_em else None
         }
+        
+        if _incluir(campos, 'itens'):
+            subcampos = campos.get('itens') if campos else None
+            dados['itens'] = [item.to_dict(fields=subcampos) for item in self.itens]
+        
+        return _projetar(dados, campos)
 
+class ItemPedidoHistorico(db.Model):
+    """
+    Item de um pedido arquivado (mesmas colunas de ItemPedido)
+    """
+    __tablename__ = 'itens_pedido_historico'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    pedido_historico_id = db.Column(db.Integer, db.ForeignKey('pedidos_historico.id'), nullable=False, index=True)
+    item_cardapio_id = db.Column(db.Integer, nullable=False)
+    quantidade = db.Column(db.Integer, nullable=False)
+    preco_unitario = db.Column(db.Float, nullable=False)
+    subtotal = db.Column(db.Float, nullable=False)
+    observacoes = db.Column(db.Text, nullable=True)
+    
+    def to_dict(self, fields=None):
+        """Converte o objeto ItemPedidoHistorico para dicionário (opcionalmente só os campos em fields)"""
+        return _projetar({
+            'item_cardapio_id': self.item_cardapio_id,
+            'quantidade': self.quantidade,
+            'preco_unitario': self.preco_unitario,
+            'subtotal': self.subtotal,
+            'observacoes': self.observacoes
+        }, normalizar_campos(fields))
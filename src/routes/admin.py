@@ -1,9 +1,17 @@
 """
 Rotas para o painel administrativo
 """
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, current_app
 from datetime import datetime, timedelta
-from src.models.restaurante import db, Mesa, Pedido, StatusMesa
+from sqlalchemy.orm import selectinload
+from src.models.restaurante import db, Mesa, Pedido, ItemPedido, StatusMesa, itens_cardapio_referenciados
+from src.utils.consultas_lentas import log_consultas_lentas
+from src.utils.eventos import broker_eventos
+from src.utils.metricas import metricas_requisicoes, registrar_erro, TIPO_CONTEUDO
+from src.utils.perfil import perfis_requisicoes, CABECALHO_TOKEN
+from src.utils.serializacao import ler_opcoes_serializacao
+from src.utils.sincronizacao import ler_watermark, novo_watermark, pedidos_removidos_desde
+from src.utils.estatisticas import contadores_estatisticas, consultar_contagens, montar_estatisticas
 
 admin_bp = Blueprint('admin', __name__)
 
@@ -11,61 +19,124 @@ admin_bp = Blueprint('admin', __name__)
 def obter_estatisticas():
     """Retorna estatísticas do sistema"""
     try:
-        # Estatísticas das mesas
-        total_mesas = Mesa.query.count()
-        mesas_livres = Mesa.query.filter_by(status=StatusMesa.LIVRE.value).count()
-        mesas_ocupadas = Mesa.query.filter_by(status=StatusMesa.ABERTA.value).count()
-        mesas_aguardando = Mesa.query.filter_by(status=StatusMesa.AGUARDANDO_PAGAMENTO.value).count()
-        
-        # Contar pedidos de hoje
-        hoje = datetime.now().date()
-        pedidos_hoje = Pedido.query.filter(
-            db.func.date(Pedido.created_at) == hoje
-        ).count()
+        if current_app.config.get('ESTATISTICAS_EM_MEMORIA'):
+            # Contadores mantidos incrementalmente, sem consultar o banco
+            estatisticas = contadores_estatisticas.obter()
+        else:
+            # Uma agregação GROUP BY status e uma contagem por intervalo de data
+            hoje = datetime.now().date()
+            estatisticas = montar_estatisticas(*consultar_contagens(hoje))
         
         return jsonify({
             'success': True,
-            'estatisticas': {
-                'total_mesas': total_mesas,
-                'mesas_livres': mesas_livres,
-                'mesas_ocupadas': mesas_ocupadas,
-                'mesas_aguardando_pagamento': mesas_aguardando,
-                'pedidos_hoje': pedidos_hoje
-            }
+            'estatisticas': estatisticas
         }), 200
     except Exception as e:
+        registrar_erro(e)
         return jsonify({
             'success': False,
             'error': str(e)
         }), 500
 
-@admin_bp.route('/admin/mesas', methods=['GET'])
-def obter_mesas_admin():
-    """Retorna todas as mesas com informações detalhadas"""
-    try:
-        mesas = Mesa.query.all()
-        mesas_data = []
-        
-        for mesa in mesas:
-            # Buscar pedido relevante da mesa
-            pedido_ativo = Pedido.query.filter(
-                Pedido.mesa_id == mesa.id,
-                Pedido.status.in_(['aberto', 'fechado'])
-            ).order_by(Pedido.created_at.desc()).first()
+def _montar_mesas_admin(mesas, campos=None, compacto=False):
+    """
+    Monta as mesas com o pedido ativo de cada uma em um número fixo de consultas
+    
+    Args:
+        mesas (list): Mesas a serializar
+        campos (dict): Projeção de campos das mesas (ver normalizar_campos)
+        compacto (bool): Se True, os itens dos pedidos referenciam o cardápio
+            por id e os itens do cardápio vão uma única vez em 'itens_cardapio'
             
-            mesa_dict = mesa.to_dict()
+    Returns:
+        dict: {'mesas': [...]} e, no modo compacto, {'itens_cardapio': {...}}
+    """
+    incluir_pedido = campos is None or 'pedido_ativo' in campos
+    campos_pedido = campos.get('pedido_ativo') if campos else None
+    mesa_ids = [mesa.id for mesa in mesas]
+    
+    # Buscar os pedidos ativos das mesas de uma vez, já com itens
+    # e itens do cardápio (número fixo de consultas, independente de mesas)
+    pedidos_ativos = (
+        Pedido.query
+        .options(selectinload(Pedido.itens).joinedload(ItemPedido.item_cardapio))
+        .filter(
+            Pedido.mesa_id.in_(mesa_ids),
+            Pedido.status.in_(['aberto', 'fechado'])
+        )
+        .order_by(Pedido.created_at.desc())
+        .all()
+    ) if mesa_ids and incluir_pedido else []
+    
+    # Manter apenas o pedido mais recente de cada mesa
+    pedido_por_mesa = {}
+    for pedido in pedidos_ativos:
+        pedido_por_mesa.setdefault(pedido.mesa_id, pedido)
+    
+    mesas_data = []
+    for mesa in mesas:
+        mesa_dict = mesa.to_dict(fields=campos)
+        
+        if incluir_pedido:
+            pedido_ativo = pedido_por_mesa.get(mesa.id)
             if pedido_ativo:
-                mesa_dict['pedido_ativo'] = pedido_ativo.to_dict()
+                mesa_dict['pedido_ativo'] = pedido_ativo.to_dict(fields=campos_pedido, compacto=compacto)
             else:
                 mesa_dict['pedido_ativo'] = None
-                
-            mesas_data.append(mesa_dict)
+            
+        mesas_data.append(mesa_dict)
+    
+    resultado = {'mesas': mesas_data}
+    if compacto:
+        resultado['itens_cardapio'] = itens_cardapio_referenciados(pedido_por_mesa.values())
+    return resultado
+
+@admin_bp.route('/admin/mesas', methods=['GET'])
+def obter_mesas_admin():
+    """
+    Retorna todas as mesas com informações detalhadas
+    
+    Com ?since=<watermark> retorna apenas as mesas alteradas (ou cujo pedido
+    foi alterado ou removido) desde o watermark. Aceita também ?fields= e
+    ?compacto=1 (ver src/utils/serializacao.py).
+    """
+    try:
+        since = ler_watermark(request.args.get('since'))
+    except ValueError:
+        return jsonify({
+            'success': False,
+            'error': 'Parâmetro since inválido (use o watermark retornado pela API)'
+        }), 400
+    
+    try:
+        campos, compacto = ler_opcoes_serializacao()
+        watermark = novo_watermark()
+        
+        if since is None:
+            return jsonify({
+                'success': True,
+                **_montar_mesas_admin(Mesa.query.all(), campos, compacto),
+                'watermark': watermark
+            }), 200
+        
+        removidos = pedidos_removidos_desde(since)
+        
+        # Mesas alteradas, com pedidos alterados ou com pedidos removidos
+        mesas_alteradas = db.session.query(Mesa.id).filter(Mesa.updated_at > since)
+        mesas_com_pedidos = db.session.query(Pedido.mesa_id).filter(Pedido.updated_at > since)
+        mesa_ids = {mesa_id for (mesa_id,) in mesas_alteradas.union(mesas_com_pedidos)}
+        mesa_ids.update(removido['mesa_id'] for removido in removidos)
+        
+        mesas = Mesa.query.filter(Mesa.id.in_(mesa_ids)).all() if mesa_ids else []
         
         return jsonify({
             'success': True,
-            'mesas': mesas_data
+            **_montar_mesas_admin(mesas, campos, compacto),
+            'pedidos_removidos': removidos,
+            'watermark': watermark
         }), 200
     except Exception as e:
+        registrar_erro(e)
         return jsonify({
             'success': False,
             'error': str(e)
@@ -76,18 +147,32 @@ def obter_detalhes_mesa(mesa_id):
     """Retorna detalhes completos de uma mesa"""
     try:
         mesa = Mesa.query.get_or_404(mesa_id)
+        campos, compacto = ler_opcoes_serializacao()
         
         # Buscar todos os pedidos da mesa
-        pedidos = Pedido.query.filter_by(mesa_id=mesa_id).order_by(Pedido.created_at.desc()).all()
+        pedidos = (
+            Pedido.query
+            .options(selectinload(Pedido.itens).joinedload(ItemPedido.item_cardapio))
+            .filter_by(mesa_id=mesa_id)
+            .order_by(Pedido.created_at.desc())
+            .all()
+        )
         
-        mesa_dict = mesa.to_dict()
-        mesa_dict['pedidos'] = [pedido.to_dict() for pedido in pedidos]
+        mesa_dict = mesa.to_dict(fields=campos)
+        if campos is None or 'pedidos' in campos:
+            campos_pedidos = campos.get('pedidos') if campos else None
+            mesa_dict['pedidos'] = [pedido.to_dict(fields=campos_pedidos, compacto=compacto) for pedido in pedidos]
         
-        return jsonify({
+        resposta = {
             'success': True,
             'mesa': mesa_dict
-        }), 200
+        }
+        if compacto:
+            resposta['itens_cardapio'] = itens_cardapio_referenciados(pedidos)
+        
+        return jsonify(resposta), 200
     except Exception as e:
+        registrar_erro(e)
         return jsonify({
             'success': False,
             'error': str(e)
@@ -120,14 +205,152 @@ def confirmar_pagamento_mesa(mesa_id):
         
         db.session.commit()
         
+        mesa_dict = mesa.to_dict()
+        broker_eventos.publicar('pedido', pedido.to_dict())
+        broker_eventos.publicar('mesa', mesa_dict)
+        
         return jsonify({
             'success': True,
             'message': f'Pagamento confirmado para Mesa {mesa.numero}',
-            'mesa': mesa.to_dict()
+            'mesa': mesa_dict
         }), 200
     except Exception as e:
+        registrar_erro(e)
         db.session.rollback()
         return jsonify({
             'success': False,
             'error': str(e)
-        }), 500 
\ No newline at end of file
+        }), 500 
+
+@admin_bp.route('/admin/eventos', methods=['GET'])
+def eventos_admin():
+    """Stream SSE com as mudanças de mesas e pedidos para o painel"""
+    return Response(
+        broker_eventos.escutar(),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        }
+    )
+
+@admin_bp.route('/admin/metrics', methods=['GET'])
+def exportar_metricas():
+    """Latência, comandos SQL e erros por endpoint, no formato texto do Prometheus"""
+    try:
+        return Response(metricas_requisicoes.exportar(), content_type=TIPO_CONTEUDO)
+    except Exception as e:
+        registrar_erro(e)
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@admin_bp.route('/admin/slow-queries', methods=['GET'])
+def obter_consultas_lentas():
+    """
+    Consultas SQL acima do limiar, da mais recente para a mais antiga
+    
+    Cada entrada traz o SQL, os parâmetros, a rota que o executou e o
+    EXPLAIN QUERY PLAN. Aceita ?limite= para retornar apenas as N mais recentes.
+    """
+    try:
+        consultas = log_consultas_lentas.consultas()
+        limite = request.args.get('limite', type=int)
+        if limite is not None:
+            consultas = consultas[:max(limite, 0)]
+        
+        return jsonify({
+            'success': True,
+            **log_consultas_lentas.resumo(),
+            'consultas': consultas
+        }), 200
+    except Exception as e:
+        registrar_erro(e)
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@admin_bp.route('/admin/slow-queries', methods=['DELETE'])
+def limpar_consultas_lentas():
+    """Esvazia o buffer de consultas lentas"""
+    try:
+        log_consultas_lentas.limpar()
+        return jsonify({'success': True}), 200
+    except Exception as e:
+        registrar_erro(e)
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+def _perfil_autorizado():
+    """Com PERFIL_TOKEN configurado, os perfis só podem ser lidos com o token"""
+    if perfis_requisicoes.token is None:
+        return True
+    return perfis_requisicoes.token_valido(request.headers.get(CABECALHO_TOKEN))
+
+@admin_bp.route('/admin/perfis', methods=['GET'])
+def listar_perfis():
+    """Lista os perfis de requisições guardados (do mais recente para o mais antigo)"""
+    try:
+        if not _perfil_autorizado():
+            return jsonify({'success': False, 'error': 'Token de perfil inválido'}), 403
+        
+        return jsonify({
+            'success': True,
+            'amostragem': {
+                'endpoints': sorted(perfis_requisicoes.endpoints_amostrados),
+                'intervalo': perfis_requisicoes.intervalo_amostragem
+            },
+            'perfis': perfis_requisicoes.listar()
+        }), 200
+    except Exception as e:
+        registrar_erro(e)
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@admin_bp.route('/admin/perfis/<int:perfil_id>', methods=['GET'])
+def obter_perfil(perfil_id):
+    """Retorna um perfil: comandos SQL e funções com maior tempo acumulado"""
+    try:
+        if not _perfil_autorizado():
+            return jsonify({'success': False, 'error': 'Token de perfil inválido'}), 403
+        
+        perfil = perfis_requisicoes.obter(perfil_id)
+        if perfil is None:
+            return jsonify({'success': False, 'error': 'Perfil não encontrado'}), 404
+        
+        return jsonify({'success': True, 'perfil': perfil[0]}), 200
+    except Exception as e:
+        registrar_erro(e)
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@admin_bp.route('/admin/perfis/<int:perfil_id>.pstats', methods=['GET'])
+def baixar_perfil(perfil_id):
+    """Dump do pstats de um perfil (abrir com `python -m pstats arquivo.pstats`)"""
+    try:
+        if not _perfil_autorizado():
+            return jsonify({'success': False, 'error': 'Token de perfil inválido'}), 403
+        
+        perfil = perfis_requisicoes.obter(perfil_id)
+        if perfil is None:
+            return jsonify({'success': False, 'error': 'Perfil não encontrado'}), 404
+        
+        return Response(
+            perfil[1],
+            mimetype='application/octet-stream',
+            headers={'Content-Disposition': f'attachment; filename=perfil_{perfil_id}.pstats'}
+        )
+    except Exception as e:
+        registrar_erro(e)
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
\ No newline at end of file
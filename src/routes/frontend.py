@@ -0,0 +1,191 @@
+"""
+Rotas do frontend: página do cliente (SPA), painel admin e painel de reset
+"""
+
+import os
+
+from flask import Blueprint, current_app, send_from_directory
+
+frontend_bp = Blueprint('frontend', __name__)
+
+
+def _assets():
+    """Pipeline de assets criado em create_app (ver src/utils/assets.py)"""
+    return current_app.extensions['assets_estaticos']
+
+@frontend_bp.route('/admin')
+def admin_panel():
+    """Rota para o painel administrativo"""
+    static_folder_path = current_app.static_folder
+    if static_folder_path is None:
+        return "Static folder not configured", 404
+    
+    resposta = _assets().servir('admin.html')
+    if resposta is not None:
+        return resposta
+    else:
+        return "admin.html not found", 404
+
+@frontend_bp.route('/reset')
+def reset_panel():
+    """Rota para o painel de reset de mesas"""
+    return """
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <title>Reset de Mesas - Restaurante QR</title>
+        <style>
+            body { 
+                font-family: Arial, sans-serif; 
+                margin: 20px; 
+                background-color: #f5f5f5;
+            }
+            .header {
+                display: flex;
+                justify-content: space-between;
+                align-items: center;
+                margin-bottom: 30px;
+                padding-bottom: 20px;
+                border-bottom: 2px solid #ddd;
+            }
+            .btn-voltar {
+                background: #3498db;
+                color: white;
+                padding: 10px 20px;
+                border: none;
+                border-radius: 5px;
+                cursor: pointer;
+                text-decoration: none;
+                display: inline-flex;
+                align-items: center;
+                gap: 8px;
+                font-size: 14px;
+            }
+            .btn-voltar:hover {
+                background: #2980b9;
+            }
+            .mesa { 
+                margin: 10px; 
+                padding: 15px; 
+                border: 1px solid #ccc; 
+                border-radius: 8px;
+                background: white;
+                box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+            }
+            .livre { 
+                background-color: #d4edda; 
+                border-color: #c3e6cb;
+            }
+            .ocupada { 
+                background-color: #f8d7da; 
+                border-color: #f5c6cb;
+            }
+            .btn-reset {
+                background: #e74c3c;
+                color: white;
+                padding: 8px 16px;
+                border: none;
+                border-radius: 4px;
+                cursor: pointer;
+                margin: 5px;
+            }
+            .btn-reset:hover {
+                background: #c0392b;
+            }
+            .mesa-info {
+                margin-bottom: 10px;
+            }
+            .mesa-status {
+                font-weight: bold;
+                margin-left: 10px;
+            }
+            .status-livre {
+                color: #27ae60;
+            }
+            .status-ocupada {
+                color: #e74c3c;
+            }
+        </style>
+    </head>
+    <body>
+        <div class="header">
+            <h1>Reset de Mesas - Restaurante QR</h1>
+            <a href="/admin" class="btn-voltar">
+                <i class="fas fa-arrow-left"></i>
+                Voltar ao Painel Admin
+            </a>
+        </div>
+        <div id="mesas"></div>
+        <script src="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/js/all.min.js"></script>
+        <script>
+            async function carregarMesas() {
+                const response = await fetch('/api/mesas');
+                const mesas = await response.json();
+                const container = document.getElementById('mesas');
+                
+                container.innerHTML = mesas.map(mesa => `
+                    <div class="mesa ${mesa.status === 'livre' ? 'livre' : 'ocupada'}">
+                        <div class="mesa-info">
+                            <strong>Mesa ${mesa.numero}</strong>
+                            <span class="mesa-status ${mesa.status === 'livre' ? 'status-livre' : 'status-ocupada'}">
+                                - Status: ${mesa.status}
+                            </span>
+                            ${mesa.cliente_nome ? `<br>Cliente: ${mesa.cliente_nome}` : ''}
+                        </div>
+                        ${mesa.status !== 'livre' ? 
+                            `<button class="btn-reset" onclick="resetarMesa(${mesa.id})">
+                                <i class="fas fa-redo"></i> Resetar Mesa
+                            </button>` : 
+                            '<span style="color: #27ae60; font-weight: bold;">✓ Livre</span>'
+                        }
+                    </div>
+                `).join('');
+            }
+            
+            async function resetarMesa(mesaId) {
+                if (confirm('Tem certeza que deseja resetar esta mesa?')) {
+                    try {
+                        const response = await fetch(`/api/mesas/${mesaId}/resetar`, {
+                            method: 'POST'
+                        });
+                        const data = await response.json();
+                        
+                        if (data.success) {
+                            alert('Mesa resetada com sucesso!');
+                            carregarMesas();
+                        } else {
+                            alert('Erro ao resetar mesa: ' + data.error);
+                        }
+                    } catch (error) {
+                        alert('Erro ao resetar mesa: ' + error);
+                    }
+                }
+            }
+            
+            carregarMesas();
+        </script>
+    </body>
+    </html>
+    """
+
+@frontend_bp.route('/', defaults={'path': ''})
+@frontend_bp.route('/<path:path>')
+def serve(path):
+    static_folder_path = current_app.static_folder
+    if static_folder_path is None:
+            return "Static folder not configured", 404
+
+    # Assets do frontend: em memória, pré-comprimidos e com fingerprint
+    resposta = _assets().servir(path or 'index.html')
+    if resposta is not None:
+        return resposta
+
+    # Rotas do SPA (ex: /cardapio?mesa=1) não têm extensão: vão direto para o index
+    if '.' in os.path.basename(path) and os.path.exists(os.path.join(static_folder_path, path)):
+        return send_from_directory(static_folder_path, path)
+    else:
+        resposta = _assets().servir('index.html')
+        if resposta is not None:
+            return resposta
+        else:
+            return "index.html not found", 404
\ No newline at end of file
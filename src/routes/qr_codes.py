@@ -6,15 +6,65 @@ Para uso em produção, considere:
 - Autenticação para rotas de geração de QR codes
 - Rate limiting para prevenir abuso
 - Validação de entrada mais rigorosa
-- Cache de QR codes gerados
+
+Os QR codes gerados dinamicamente ficam em um cache LRU em memória
+(ver src/utils/cache_qr.py).
 """
 
-from flask import Blueprint, request, jsonify, send_from_directory, Response
+from flask import Blueprint, request, jsonify, send_from_directory, Response, current_app, url_for
 import os
-from src.utils.qr_generator import QRCodeGenerator
+from src.utils.qr_generator import QRCodeGenerator, iterar_html_qr_codes
+from src.models.restaurante import db, Mesa
+from src.utils.cache_qr import cache_qr_codes, FORMATOS
+from src.utils.manifesto_qr import obter_manifesto, nome_com_fingerprint
+from src.utils.zip_stream import zip_em_stream
+from src.utils.eventos import broker_eventos
+from src.utils.metricas import registrar_erro
 
 qr_bp = Blueprint('qr_codes', __name__)
 
+# Quantidade máxima de mesas aceita pelas rotas (config QR_MAX_MESAS)
+MAX_MESAS_PADRAO = 50
+
+# Validade do cache das URLs com fingerprint (1 ano)
+CACHE_IMUTAVEL_SEGUNDOS = 365 * 24 * 60 * 60
+
+# Cartões por página na página de impressão paginada (?pagina=)
+POR_PAGINA_IMPRESSAO = 24
+
+def _base_url():
+    """
+    URL base dos QR codes (config QR_BASE_URL; sem ela, a URL da requisição)
+    
+    Usada tanto na geração das imagens quanto na URL impressa nos cartões,
+    para que o QR code e o texto do cartão apontem sempre para o mesmo lugar.
+    """
+    return current_app.config.get('QR_BASE_URL') or request.url_root.rstrip('/')
+
+def _max_mesas():
+    return current_app.config.get('QR_MAX_MESAS', MAX_MESAS_PADRAO)
+
+def _ler_formato(padrao='png'):
+    """Lê ?formato= (png ou svg); retorna None se inválido"""
+    formato = request.args.get('formato', padrao).lower()
+    return formato if formato in FORMATOS else None
+
+def _links_paginacao(pagina, total_paginas, por_pagina):
+    """Links de página anterior/próxima da página de impressão"""
+    links = []
+    if pagina > 1:
+        links.append(f'<a href="?pagina={pagina - 1}&amp;por_pagina={por_pagina}">&laquo; Anterior</a>')
+    links.append(f'Página {pagina} de {total_paginas}')
+    if pagina < total_paginas:
+        links.append(f'<a href="?pagina={pagina + 1}&amp;por_pagina={por_pagina}">Próxima &raquo;</a>')
+    return '\n        '.join(links)
+
+def _erro_formato():
+    return jsonify({
+        'success': False,
+        'error': f"Formato deve ser um de: {', '.join(FORMATOS)}"
+    }), 400
+
 @qr_bp.route('/qr-codes')
 def listar_qr_codes():
     """
@@ -29,23 +79,19 @@ def listar_qr_codes():
                 'error': 'Diretório de QR codes não encontrado'
             }), 404
         
-        # Listar arquivos PNG no diretório
-        qr_files = []
-        for filename in os.listdir(qr_dir):
-            if filename.endswith('.png') and filename.startswith('mesa_'):
-                # Extrair número da mesa do nome do arquivo
-                try:
-                    numero_mesa = int(filename.replace('mesa_', '').replace('.png', ''))
-                    qr_files.append({
-                        'mesa': numero_mesa,
-                        'arquivo': filename,
-                        'url': f'/qr-codes/{filename}'
-                    })
-                except ValueError:
-                    continue
-        
-        # Ordenar por número da mesa
-        qr_files.sort(key=lambda x: x['mesa'])
+        # Listar arquivos PNG a partir do manifesto (já ordenado por número da mesa)
+        qr_files = [
+            {
+                'mesa': entrada['mesa'],
+                'arquivo': entrada['arquivo'],
+                'url': f"/qr-codes/{entrada['arquivo']}",
+                'url_imutavel': f"/qr-codes/{nome_com_fingerprint(entrada)}",
+                'tamanho': entrada['tamanho'],
+                'sha256': entrada['sha256']
+            }
+            for entrada in obter_manifesto(qr_dir).qr_codes()
+            if entrada['arquivo'].endswith('.png')
+        ]
         
         return jsonify({
             'success': True,
@@ -53,6 +99,7 @@ def listar_qr_codes():
         })
         
     except Exception as e:
+        registrar_erro(e)
         return jsonify({
             'success': False,
             'error': str(e)
@@ -62,20 +109,33 @@ def listar_qr_codes():
 def servir_qr_code(filename):
     """
     Serve um arquivo de QR code específico
+    
+    Aceita também o nome com fingerprint (mesa_01.<hash>.png), servido com
+    cache imutável de 1 ano. O nome simples é revalidado a cada uso pelo
+    ETag, que é o hash do conteúdo.
     """
     try:
         qr_dir = os.path.join(os.path.dirname(__file__), '..', 'static', 'qr_codes')
         
-        if not os.path.exists(qr_dir):
-            return "Diretório de QR codes não encontrado", 404
-        
-        file_path = os.path.join(qr_dir, filename)
-        if not os.path.exists(file_path):
+        # Apenas arquivos presentes no manifesto (sem consultar o disco)
+        entrada, com_fingerprint = obter_manifesto(qr_dir).resolver(filename)
+        if entrada is None:
             return "QR code não encontrado", 404
         
-        return send_from_directory(qr_dir, filename)
+        response = send_from_directory(
+            qr_dir, entrada['arquivo'],
+            etag=entrada['sha256'],
+            max_age=CACHE_IMUTAVEL_SEGUNDOS if com_fingerprint else None
+        )
+        if com_fingerprint:
+            response.cache_control.public = True
+            response.cache_control.immutable = True
+        else:
+            response.cache_control.no_cache = True
+        return response
         
     except Exception as e:
+        registrar_erro(e)
         return str(e), 500
 
 @qr_bp.route('/qr-codes/gerar/<int:numero_mesa>')
@@ -84,28 +144,35 @@ def gerar_qr_code_mesa(numero_mesa):
     Gera um QR code para uma mesa específica dinamicamente
     """
     try:
-        if numero_mesa < 1 or numero_mesa > 50:  # Limite razoável
+        max_mesas = _max_mesas()
+        if numero_mesa < 1 or numero_mesa > max_mesas:  # Limite configurável
             return jsonify({
                 'success': False,
-                'error': 'Número da mesa deve estar entre 1 e 50'
+                'error': f'Número da mesa deve estar entre 1 e {max_mesas}'
             }), 400
         
-        # Obter URL base da requisição
-        base_url = request.url_root.rstrip('/')
+        formato = _ler_formato()
+        if formato is None:
+            return _erro_formato()
+        
+        base_url = _base_url()
         
         generator = QRCodeGenerator(base_url=base_url)
         
-        # Gerar QR code (apenas base64, sem salvar arquivo)
-        qr_base64 = generator.gerar_qr_mesa(numero_mesa, salvar_arquivo=False)
+        # Obter QR code do cache (gera apenas na primeira vez, sem salvar arquivo)
+        qr = cache_qr_codes.obter(generator, numero_mesa, formato)
         
         return jsonify({
             'success': True,
             'mesa': numero_mesa,
-            'qr_code_base64': qr_base64,
+            'formato': formato,
+            'mimetype': qr.mimetype,
+            'qr_code_base64': qr.base64,
             'url': f"{base_url}/cardapio?mesa={numero_mesa}"
         })
         
     except Exception as e:
+        registrar_erro(e)
         return jsonify({
             'success': False,
             'error': str(e)
@@ -119,32 +186,95 @@ def gerar_todos_qr_codes():
     try:
         quantidade = request.args.get('quantidade', 10, type=int)
         
-        if quantidade < 1 or quantidade > 50:
+        max_mesas = _max_mesas()
+        if quantidade < 1 or quantidade > max_mesas:
             return jsonify({
                 'success': False,
-                'error': 'Quantidade deve estar entre 1 e 50'
+                'error': f'Quantidade deve estar entre 1 e {max_mesas}'
             }), 400
         
-        # Obter URL base da requisição
-        base_url = request.url_root.rstrip('/')
+        formato = _ler_formato()
+        if formato is None:
+            return _erro_formato()
+        
+        base_url = _base_url()
         
         generator = QRCodeGenerator(base_url=base_url)
         
         qr_codes = {}
         for numero_mesa in range(1, quantidade + 1):
-            qr_base64 = generator.gerar_qr_mesa(numero_mesa, salvar_arquivo=False)
+            qr = cache_qr_codes.obter(generator, numero_mesa, formato)
             qr_codes[numero_mesa] = {
-                'qr_code_base64': qr_base64,
+                'qr_code_base64': qr.base64,
                 'url': f"{base_url}/cardapio?mesa={numero_mesa}"
             }
         
         return jsonify({
             'success': True,
+            'formato': formato,
             'qr_codes': qr_codes,
             'total': len(qr_codes)
         })
         
     except Exception as e:
+        registrar_erro(e)
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@qr_bp.route('/qr-codes/bundle.zip')
+def baixar_pacote_qr_codes():
+    """
+    Baixa os QR codes de todas as mesas cadastradas em um arquivo ZIP
+    
+    O ZIP é enviado em streaming: cada QR code é gerado (ou lido do cache)
+    apenas no momento em que sua entrada é escrita.
+    Parâmetro opcional: ?formato=svg (padrão) ou png
+    """
+    try:
+        formato = _ler_formato(padrao='svg')
+        if formato is None:
+            return _erro_formato()
+        
+        base_url = _base_url()
+        generator = QRCodeGenerator(base_url=base_url)
+        
+        # Ler os números das mesas antes de iniciar o streaming (fora do contexto da requisição)
+        numeros_mesas = [numero for (numero,) in db.session.query(Mesa.numero).order_by(Mesa.numero)]
+        
+        def entradas():
+            for numero_mesa in numeros_mesas:
+                qr = cache_qr_codes.obter(generator, numero_mesa, formato)
+                # SVG é texto e comprime bem; PNG já é comprimido
+                yield f"mesa_{numero_mesa:02d}.{formato}", qr.conteudo, formato == 'svg'
+        
+        return Response(
+            zip_em_stream(entradas()),
+            mimetype='application/zip',
+            headers={'Content-Disposition': f'attachment; filename=qr_codes_mesas_{formato}.zip'}
+        )
+        
+    except Exception as e:
+        registrar_erro(e)
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@qr_bp.route('/qr-codes/cache')
+def estatisticas_cache_qr_codes():
+    """
+    Retorna o uso do cache de QR codes e os contadores de acertos/faltas
+    """
+    try:
+        return jsonify({
+            'success': True,
+            'cache': cache_qr_codes.estatisticas()
+        })
+        
+    except Exception as e:
+        registrar_erro(e)
         return jsonify({
             'success': False,
             'error': str(e)
@@ -154,17 +284,51 @@ def gerar_todos_qr_codes():
 def pagina_impressao_qr_codes():
     """
     Serve a página HTML para impressão dos QR codes
+    
+    A página é enviada em streaming, um cartão por vez, e cada cartão
+    referencia a imagem em /api/qr-codes/<arquivo> em vez de embuti-la.
+    Parâmetros opcionais: ?pagina=N&por_pagina=M (padrão: todas as mesas)
     """
     try:
         qr_dir = os.path.join(os.path.dirname(__file__), '..', 'static', 'qr_codes')
-        html_file = os.path.join(qr_dir, 'qr_codes_impressao.html')
         
-        if not os.path.exists(html_file):
+        entradas = [
+            entrada for entrada in obter_manifesto(qr_dir).qr_codes()
+            if entrada['arquivo'].endswith('.png')
+        ]
+        if not entradas:
             return "Página de impressão não encontrada. Execute o gerador de QR codes primeiro.", 404
         
-        return send_from_directory(qr_dir, 'qr_codes_impressao.html')
+        navegacao = None
+        pagina = request.args.get('pagina', type=int)
+        if pagina is not None:
+            por_pagina = request.args.get('por_pagina', POR_PAGINA_IMPRESSAO, type=int)
+            if pagina < 1 or por_pagina < 1:
+                return "Parâmetros de paginação inválidos", 400
+            
+            total_paginas = (len(entradas) + por_pagina - 1) // por_pagina
+            entradas = entradas[(pagina - 1) * por_pagina:pagina * por_pagina]
+            navegacao = _links_paginacao(pagina, total_paginas, por_pagina)
+        
+        # URL impressa no cartão: a mesma codificada nos arquivos (registrada no
+        # manifesto ao gerá-los); para arquivos sem registro, a URL base atual
+        generator = QRCodeGenerator(base_url=obter_manifesto(qr_dir).base_url or _base_url())
+        
+        # Montar as URLs ainda no contexto da requisição; o streaming roda depois.
+        # As imagens usam a URL com fingerprint, que o navegador guarda em cache.
+        cartoes = [
+            (
+                entrada['mesa'],
+                url_for('qr_codes.servir_qr_code', filename=nome_com_fingerprint(entrada)),
+                generator.url_mesa(entrada['mesa'])
+            )
+            for entrada in entradas
+        ]
+        
+        return Response(iterar_html_qr_codes(cartoes, navegacao), mimetype='text/html')
         
     except Exception as e:
+        registrar_erro(e)
         return str(e), 500
 
 @qr_bp.route('/qr-codes/regenerar')
@@ -175,19 +339,23 @@ def regenerar_qr_codes():
     try:
         quantidade = request.args.get('quantidade', 10, type=int)
         
-        if quantidade < 1 or quantidade > 50:
+        max_mesas = _max_mesas()
+        if quantidade < 1 or quantidade > max_mesas:
             return jsonify({
                 'success': False,
-                'error': 'Quantidade deve estar entre 1 e 50'
+                'error': f'Quantidade deve estar entre 1 e {max_mesas}'
             }), 400
         
-        # Obter URL base da requisição
-        base_url = request.url_root.rstrip('/')
+        base_url = _base_url()
         
         generator = QRCodeGenerator(base_url=base_url)
         
-        # Gerar QR codes para todas as mesas
-        qr_codes = generator.gerar_qr_todas_mesas(quantidade_mesas=quantidade)
+        # Progresso publicado para o painel (evento SSE 'qr_progresso')
+        def progresso(concluidas, total):
+            broker_eventos.publicar('qr_progresso', {'concluidas': concluidas, 'total': total})
+        
+        # Gerar QR codes para todas as mesas (em paralelo para muitas mesas)
+        qr_codes = generator.gerar_qr_todas_mesas(quantidade_mesas=quantidade, progresso=progresso)
         
         # Gerar arquivo HTML para impressão
         html_file = generator.gerar_html_qr_codes(qr_codes)
@@ -200,6 +368,7 @@ def regenerar_qr_codes():
         })
         
     except Exception as e:
+        registrar_erro(e)
         return jsonify({
             'success': False,
             'error': str(e)
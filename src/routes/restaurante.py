@@ -1,30 +1,52 @@
 """
 Rotas para gerenciamento do restaurante (cardápio, pedidos, etc.)
 """
-from flask import Blueprint, request, jsonify
-from src.models.restaurante import db, ItemCardapio, Pedido, ItemPedido, Mesa
+from flask import Blueprint, request, jsonify, current_app
+from sqlalchemy import func, insert
+from sqlalchemy.orm import selectinload
+from src.models.restaurante import db, ItemCardapio, Pedido, ItemPedido, Mesa, itens_cardapio_referenciados
+from src.utils.cache_cardapio import cache_cardapio, ler_versao_banco
+from src.utils.eventos import broker_eventos
+from src.utils.metricas import registrar_erro
+from src.utils.serializacao import ler_opcoes_serializacao
+from src.utils.sincronizacao import ler_watermark, novo_watermark, pedidos_removidos_desde
 
 restaurante_bp = Blueprint('restaurante', __name__)
 
+def _agrupar_por_categoria(itens):
+    """Organiza os itens do cardápio em {categoria: [item, ...]}"""
+    cardapio_por_categoria = {}
+    for item in itens:
+        categoria = item.categoria
+        if categoria not in cardapio_por_categoria:
+            cardapio_por_categoria[categoria] = []
+        cardapio_por_categoria[categoria].append(item.to_dict())
+    return cardapio_por_categoria
+
+def _serializar_cardapio():
+    """Consulta o cardápio disponível e retorna o JSON da resposta em bytes"""
+    itens = ItemCardapio.query.filter_by(disponivel=True).all()
+    
+    return current_app.json.dumps({
+        'success': True,
+        'cardapio': _agrupar_por_categoria(itens)
+    }, separators=(',', ':')).encode('utf-8')
+
 @restaurante_bp.route('/cardapio', methods=['GET'])
 def obter_cardapio():
-    """Retorna todos os itens do cardápio"""
+    """Retorna todos os itens do cardápio (a partir do snapshot em memória)"""
     try:
-        itens = ItemCardapio.query.filter_by(disponivel=True).all()
+        # A versão do banco detecta alterações feitas por outros processos
+        snapshot = cache_cardapio.obter_snapshot(_serializar_cardapio, ler_versao_banco)
         
-        # Organizar itens por categoria
-        cardapio_por_categoria = {}
-        for item in itens:
-            categoria = item.categoria
-            if categoria not in cardapio_por_categoria:
-                cardapio_por_categoria[categoria] = []
-            cardapio_por_categoria[categoria].append(item.to_dict())
+        response = current_app.response_class(snapshot.conteudo, mimetype='application/json')
+        response.set_etag(snapshot.etag)
+        response.headers['Cache-Control'] = 'no-cache'
         
-        return jsonify({
-            'success': True,
-            'cardapio': cardapio_por_categoria
-        }), 200
+        # Responde 304 Not Modified se o cliente já tem esta versão
+        return response.make_conditional(request)
     except Exception as e:
+        registrar_erro(e)
         return jsonify({
             'success': False,
             'error': str(e)
@@ -37,8 +59,61 @@ def obter_item_cardapio(item_id):
         item = ItemCardapio.query.get_or_404(item_id)
         return jsonify(item.to_dict()), 200
     except Exception as e:
+        registrar_erro(e)
         return jsonify({'error': str(e)}), 500
 
+def _buscar_precos(ids):
+    """Retorna {item_cardapio_id: preco} para os ids informados em uma única consulta"""
+    ids = {i for i in ids if i is not None}
+    if not ids:
+        return {}
+    return dict(
+        db.session.query(ItemCardapio.id, ItemCardapio.preco)
+        .filter(ItemCardapio.id.in_(ids))
+        .all()
+    )
+
+def _montar_linhas(itens, precos):
+    """Monta as linhas de ItemPedido para inserção em lote, ignorando itens sem preço"""
+    linhas = []
+    for item_data in itens:
+        item_cardapio_id = item_data.get('item_cardapio_id')
+        if item_cardapio_id not in precos:
+            continue
+        
+        quantidade = item_data.get('quantidade', 1)
+        linhas.append({
+            'item_cardapio_id': item_cardapio_id,
+            'quantidade': quantidade,
+            'preco_unitario': precos[item_cardapio_id],
+            'subtotal': quantidade * precos[item_cardapio_id],
+            'observacoes': item_data.get('observacoes', '')
+        })
+    return linhas
+
+def _validar_itens(itens):
+    """Retorna a mensagem de erro da primeira linha do carrinho inválida, ou None"""
+    for posicao, item_data in enumerate(itens, start=1):
+        if not isinstance(item_data, dict):
+            return f'Item {posicao}: formato inválido'
+        item_cardapio_id = item_data.get('item_cardapio_id')
+        if not isinstance(item_cardapio_id, int) or isinstance(item_cardapio_id, bool):
+            return f'Item {posicao}: item_cardapio_id deve ser um número inteiro'
+        quantidade = item_data.get('quantidade', 1)
+        if not isinstance(quantidade, int) or isinstance(quantidade, bool) or quantidade < 1:
+            return f'Item {posicao}: quantidade deve ser um número inteiro positivo'
+    return None
+
+def _carregar_pedido_completo(pedido_id):
+    """Carrega o pedido com itens e itens do cardápio em um número fixo de consultas"""
+    return (
+        Pedido.query
+        .options(selectinload(Pedido.itens).joinedload(ItemPedido.item_cardapio))
+        .filter_by(id=pedido_id)
+        .populate_existing()
+        .one()
+    )
+
 @restaurante_bp.route('/pedidos', methods=['POST'])
 def criar_pedido():
     """Cria um novo pedido"""
@@ -49,52 +124,51 @@ def criar_pedido():
         itens = data.get('itens', [])
         observacoes = data.get('observacoes', '')
         
-        # Criar o pedido
+        # Buscar os preços de todos os itens com uma única consulta
+        precos = _buscar_precos(item_data.get('item_cardapio_id') for item_data in itens)
+        
+        # Montar as linhas do pedido (itens inexistentes são ignorados)
+        linhas = _montar_linhas(itens, precos)
+        
+        # Criar o pedido já com o total calculado
         pedido = Pedido(
             mesa_id=mesa_id,
             cliente_nome=cliente_nome,
-            observacoes=observacoes
+            observacoes=observacoes,
+            total=sum(linha['subtotal'] for linha in linhas)
         )
         db.session.add(pedido)
         db.session.flush()  # Para obter o ID do pedido
+        pedido_id = pedido.id
         
-        # Adicionar itens ao pedido
-        for item_data in itens:
-            item_cardapio_id = item_data.get('item_cardapio_id')
-            quantidade = item_data.get('quantidade', 1)
-            observacoes_item = item_data.get('observacoes', '')
-            
-            # Buscar o item do cardápio
-            item_cardapio = ItemCardapio.query.get(item_cardapio_id)
-            if not item_cardapio:
-                continue
-                
-            item_pedido = ItemPedido(
-                pedido_id=pedido.id,
-                item_cardapio_id=item_cardapio_id,
-                quantidade=quantidade,
-                preco_unitario=item_cardapio.preco,
-                observacoes=observacoes_item
-            )
-            item_pedido.calcular_subtotal()
-            db.session.add(item_pedido)
-        
-        # Calcular total do pedido
-        pedido.calcular_total()
+        # Inserir todos os itens em um único INSERT em lote
+        if linhas:
+            for linha in linhas:
+                linha['pedido_id'] = pedido_id
+            db.session.execute(insert(ItemPedido), linhas)
+        
+        # Montar a resposta ainda na transação: depois do commit, outra
+        # requisição (ex: resetar a mesa) pode arquivar o pedido
+        pedido_dict = _carregar_pedido_completo(pedido_id).to_dict()
         db.session.commit()
         
-        return jsonify(pedido.to_dict()), 201
+        broker_eventos.publicar('pedido', pedido_dict)
+        
+        return jsonify(pedido_dict), 201
     except Exception as e:
+        registrar_erro(e)
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
 @restaurante_bp.route('/pedidos/<int:pedido_id>', methods=['GET'])
 def obter_pedido(pedido_id):
-    """Retorna um pedido específico"""
+    """Retorna um pedido específico (aceita ?fields= para projeção de campos)"""
     try:
         pedido = Pedido.query.get_or_404(pedido_id)
-        return jsonify(pedido.to_dict()), 200
+        campos, _ = ler_opcoes_serializacao()
+        return jsonify(pedido.to_dict(fields=campos)), 200
     except Exception as e:
+        registrar_erro(e)
         return jsonify({'error': str(e)}), 500
 
 @restaurante_bp.route('/pedidos/<int:pedido_id>', methods=['PUT'])
@@ -111,17 +185,55 @@ def atualizar_pedido(pedido_id):
             pedido.observacoes = data['observacoes']
         
         db.session.commit()
-        return jsonify(pedido.to_dict()), 200
+        
+        pedido_dict = pedido.to_dict()
+        broker_eventos.publicar('pedido', pedido_dict)
+        
+        return jsonify(pedido_dict), 200
     except Exception as e:
+        registrar_erro(e)
         return jsonify({'error': str(e)}), 500
 
 @restaurante_bp.route('/pedidos/mesa/<int:mesa_id>', methods=['GET'])
 def obter_pedidos_mesa(mesa_id):
-    """Retorna todos os pedidos de uma mesa"""
+    """
+    Retorna todos os pedidos de uma mesa
+    
+    Com ?since=<watermark> retorna apenas os pedidos alterados e os ids dos
+    pedidos removidos desde o watermark. O watermark para a próxima consulta
+    vem no cabeçalho X-Watermark. Aceita também ?fields= e ?compacto=1; no
+    modo compacto a resposta é um objeto com 'pedidos' e 'itens_cardapio'.
+    """
+    try:
+        since = ler_watermark(request.args.get('since'))
+    except ValueError:
+        return jsonify({'error': 'Parâmetro since inválido (use o watermark retornado pela API)'}), 400
+    
     try:
-        pedidos = Pedido.query.filter_by(mesa_id=mesa_id).all()
-        return jsonify([pedido.to_dict() for pedido in pedidos]), 200
+        campos, compacto = ler_opcoes_serializacao()
+        watermark = novo_watermark()
+        query = Pedido.query.options(
+            selectinload(Pedido.itens).joinedload(ItemPedido.item_cardapio)
+        ).filter_by(mesa_id=mesa_id)
+        
+        if since is not None:
+            query = query.filter(Pedido.updated_at > since)
+        pedidos = query.all()
+        pedidos_data = [pedido.to_dict(fields=campos, compacto=compacto) for pedido in pedidos]
+        
+        if since is None and not compacto:
+            return jsonify(pedidos_data), 200, {'X-Watermark': watermark}
+        
+        resposta = {'pedidos': pedidos_data}
+        if compacto:
+            resposta['itens_cardapio'] = itens_cardapio_referenciados(pedidos)
+        if since is not None:
+            resposta['removidos'] = pedidos_removidos_desde(since, mesa_id=mesa_id)
+            resposta['watermark'] = watermark
+        
+        return jsonify(resposta), 200, {'X-Watermark': watermark}
     except Exception as e:
+        registrar_erro(e)
         return jsonify({'error': str(e)}), 500
 
 @restaurante_bp.route('/pedidos/<int:pedido_id>/pagar', methods=['POST'])
@@ -137,8 +249,15 @@ def pagar_pedido(pedido_id):
             mesa.status = 'aguardando_pagamento'
         
         db.session.commit()
-        return jsonify(pedido.to_dict()), 200
+        
+        pedido_dict = pedido.to_dict()
+        broker_eventos.publicar('pedido', pedido_dict)
+        if mesa:
+            broker_eventos.publicar('mesa', mesa.to_dict())
+        
+        return jsonify(pedido_dict), 200
     except Exception as e:
+        registrar_erro(e)
         return jsonify({'error': str(e)}), 500
 
 @restaurante_bp.route('/pedidos/<int:pedido_id>/adicionar-item', methods=['POST'])
@@ -170,11 +289,76 @@ def adicionar_item_pedido(pedido_id):
         pedido.calcular_total()
         db.session.commit()
         
+        pedido_dict = pedido.to_dict()
+        broker_eventos.publicar('pedido', pedido_dict)
+        
+        return jsonify({
+            'success': True,
+            'pedido': pedido_dict
+        }), 200
+    except Exception as e:
+        registrar_erro(e)
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@restaurante_bp.route('/pedidos/<int:pedido_id>/itens', methods=['POST'])
+def adicionar_itens_pedido(pedido_id):
+    """Adiciona todos os itens do carrinho ao pedido em uma única transação"""
+    try:
+        pedido = Pedido.query.get_or_404(pedido_id)
+        data = request.get_json()
+        itens = data.get('itens', [])
+        
+        if not itens:
+            return jsonify({
+                'success': False,
+                'error': 'Nenhum item informado'
+            }), 400
+        
+        erro = _validar_itens(itens)
+        if erro:
+            return jsonify({
+                'success': False,
+                'error': erro
+            }), 400
+        
+        # Buscar os preços de todos os itens com uma única consulta IN
+        ids = {item_data.get('item_cardapio_id') for item_data in itens}
+        precos = _buscar_precos(ids)
+        
+        nao_encontrados = sorted(i for i in ids if i not in precos)
+        if nao_encontrados:
+            return jsonify({
+                'success': False,
+                'error': f'Itens do cardápio não encontrados: {nao_encontrados}'
+            }), 400
+        
+        # Inserir todos os itens em um único INSERT em lote
+        linhas = _montar_linhas(itens, precos)
+        for linha in linhas:
+            linha['pedido_id'] = pedido_id
+        db.session.execute(insert(ItemPedido), linhas)
+        
+        # Atualizar total do pedido uma única vez, somando no próprio UPDATE
+        # (SET total = total + ?) para não perder carrinhos enviados ao mesmo tempo
+        soma = sum(linha['subtotal'] for linha in linhas)
+        pedido.total = func.coalesce(Pedido.total, 0.0) + soma
+        
+        # Montar a resposta ainda na transação (o pedido pode ser arquivado logo após o commit)
+        pedido_dict = _carregar_pedido_completo(pedido_id).to_dict()
+        db.session.commit()
+        
+        broker_eventos.publicar('pedido', pedido_dict)
+        
         return jsonify({
             'success': True,
-            'pedido': pedido.to_dict()
+            'pedido': pedido_dict
         }), 200
     except Exception as e:
+        registrar_erro(e)
         db.session.rollback()
         return jsonify({
             'success': False,
@@ -195,12 +379,19 @@ def fechar_pedido(pedido_id):
         
         db.session.commit()
         
+        pedido_dict = pedido.to_dict()
+        mesa_dict = mesa.to_dict() if mesa else None
+        broker_eventos.publicar('pedido', pedido_dict)
+        if mesa_dict:
+            broker_eventos.publicar('mesa', mesa_dict)
+        
         return jsonify({
             'success': True,
-            'pedido': pedido.to_dict(),
-            'mesa': mesa.to_dict() if mesa else None
+            'pedido': pedido_dict,
+            'mesa': mesa_dict
         }), 200
     except Exception as e:
+        registrar_erro(e)
         return jsonify({
             'success': False,
             'error': str(e)
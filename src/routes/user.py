@@ -3,16 +3,43 @@ Rotas para gerenciamento de usuários
 """
 from flask import Blueprint, request, jsonify
 from src.models.restaurante import db, Mesa, Pedido, StatusMesa
+from src.utils.arquivamento import arquivar_pedidos
+from src.utils.eventos import broker_eventos
+from src.utils.metricas import registrar_erro
+from src.utils.serializacao import ler_opcoes_serializacao
+from src.utils.sincronizacao import ler_watermark, novo_watermark
 
 user_bp = Blueprint('user', __name__)
 
 @user_bp.route('/mesas', methods=['GET'])
 def listar_mesas():
-    """Lista todas as mesas"""
+    """
+    Lista todas as mesas
+    
+    Com ?since=<watermark> retorna apenas as mesas alteradas desde o watermark.
+    O watermark para a próxima consulta vem no cabeçalho X-Watermark.
+    Aceita também ?fields= para projeção de campos.
+    """
     try:
-        mesas = Mesa.query.all()
-        return jsonify([mesa.to_dict() for mesa in mesas]), 200
+        since = ler_watermark(request.args.get('since'))
+    except ValueError:
+        return jsonify({'error': 'Parâmetro since inválido (use o watermark retornado pela API)'}), 400
+    
+    try:
+        campos, _ = ler_opcoes_serializacao()
+        watermark = novo_watermark()
+        
+        if since is None:
+            mesas = Mesa.query.all()
+            return jsonify([mesa.to_dict(fields=campos) for mesa in mesas]), 200, {'X-Watermark': watermark}
+        
+        mesas = Mesa.query.filter(Mesa.updated_at > since).all()
+        return jsonify({
+            'mesas': [mesa.to_dict(fields=campos) for mesa in mesas],
+            'watermark': watermark
+        }), 200, {'X-Watermark': watermark}
     except Exception as e:
+        registrar_erro(e)
         return jsonify({'error': str(e)}), 500
 
 @user_bp.route('/mesas/<int:mesa_id>', methods=['GET'])
@@ -22,6 +49,7 @@ def obter_mesa(mesa_id):
         mesa = Mesa.query.get_or_404(mesa_id)
         return jsonify(mesa.to_dict()), 200
     except Exception as e:
+        registrar_erro(e)
         return jsonify({'error': str(e)}), 500
 
 @user_bp.route('/mesas/<int:mesa_id>/iniciar', methods=['POST'])
@@ -53,12 +81,18 @@ def iniciar_mesa(mesa_id):
         db.session.add(pedido)
         db.session.commit()
         
+        mesa_dict = mesa.to_dict()
+        pedido_dict = pedido.to_dict()
+        broker_eventos.publicar('mesa', mesa_dict)
+        broker_eventos.publicar('pedido', pedido_dict)
+        
         return jsonify({
             'success': True,
-            'mesa': mesa.to_dict(),
-            'pedido': pedido.to_dict()
+            'mesa': mesa_dict,
+            'pedido': pedido_dict
         }), 200
     except Exception as e:
+        registrar_erro(e)
         return jsonify({
             'success': False,
             'error': str(e)
@@ -76,8 +110,12 @@ def abrir_mesa(mesa_id):
         mesa.cliente_nome = cliente_nome
         db.session.commit()
         
-        return jsonify(mesa.to_dict()), 200
+        mesa_dict = mesa.to_dict()
+        broker_eventos.publicar('mesa', mesa_dict)
+        
+        return jsonify(mesa_dict), 200
     except Exception as e:
+        registrar_erro(e)
         return jsonify({'error': str(e)}), 500
 
 @user_bp.route('/mesas/<int:mesa_id>/fechar', methods=['POST'])
@@ -89,8 +127,12 @@ def fechar_mesa(mesa_id):
         mesa.cliente_nome = None
         db.session.commit()
         
-        return jsonify(mesa.to_dict()), 200
+        mesa_dict = mesa.to_dict()
+        broker_eventos.publicar('mesa', mesa_dict)
+        
+        return jsonify(mesa_dict), 200
     except Exception as e:
+        registrar_erro(e)
         return jsonify({'error': str(e)}), 500
 
 @user_bp.route('/mesas/<int:mesa_id>/resetar', methods=['POST'])
@@ -103,19 +145,23 @@ def resetar_mesa(mesa_id):
         mesa.status = StatusMesa.LIVRE.value
         mesa.cliente_nome = None
         
-        # Deletar pedidos da mesa
-        pedidos = Pedido.query.filter_by(mesa_id=mesa_id).all()
-        for pedido in pedidos:
-            db.session.delete(pedido)
+        # Mover os pedidos da mesa para o histórico (em lote, sem carregá-los)
+        pedidos_removidos = [pedido_id for pedido_id, _ in arquivar_pedidos(Pedido.mesa_id == mesa_id)]
         
         db.session.commit()
         
+        mesa_dict = mesa.to_dict()
+        for pedido_id in pedidos_removidos:
+            broker_eventos.publicar('pedido_removido', {'id': pedido_id, 'mesa_id': mesa_id})
+        broker_eventos.publicar('mesa', mesa_dict)
+        
         return jsonify({
             'success': True,
             'message': f'Mesa {mesa_id} resetada com sucesso',
-            'mesa': mesa.to_dict()
+            'mesa': mesa_dict
         }), 200
     except Exception as e:
+        registrar_erro(e)
         db.session.rollback()
         return jsonify({
             'success': False,
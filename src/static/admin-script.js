@@ -17,7 +17,11 @@ class AdminPanel {
         this.apiBase = '/api';
         this.mesas = [];
         this.estatisticas = {};
+        this.itensCardapio = {};
         this.refreshInterval = null;
+        this.eventSource = null;
+        this.watermark = null;
+        this.estatisticasTimeout = null;
 
         this.init();
     }
@@ -29,7 +33,7 @@ class AdminPanel {
         // Carregar dados iniciais
         await this.carregarDados();
 
-        // Configurar atualização automática a cada 30 segundos
+        // Receber mudanças em tempo real (SSE), com polling como alternativa
         this.iniciarAtualizacaoAutomatica();
     }
 
@@ -66,7 +70,7 @@ class AdminPanel {
             // Carregar estatísticas e mesas em paralelo
             const [estatisticasResponse, mesasResponse] = await Promise.all([
                 fetch(`${this.apiBase}/admin/estatisticas`),
-                fetch(`${this.apiBase}/admin/mesas`)
+                fetch(`${this.apiBase}/admin/mesas?compacto=1`)
             ]);
 
             const estatisticasData = await estatisticasResponse.json();
@@ -82,6 +86,8 @@ class AdminPanel {
 
             this.estatisticas = estatisticasData.estatisticas;
             this.mesas = mesasData.mesas;
+            this.itensCardapio = mesasData.itens_cardapio || {};
+            this.watermark = mesasData.watermark;
 
             this.renderizarEstatisticas();
             this.renderizarMesas();
@@ -119,14 +125,32 @@ class AdminPanel {
         container.innerHTML = this.mesas.map(mesa => this.renderizarMesa(mesa)).join('');
 
         // Adicionar event listeners para as mesas
-        container.querySelectorAll('.mesa-card').forEach(card => {
-            card.addEventListener('click', (e) => {
-                const mesaNumero = parseInt(e.currentTarget.dataset.mesaNumero);
-                this.abrirDetalhesMesa(mesaNumero);
-            });
+        container.querySelectorAll('.mesa-card').forEach(card => this.vincularCardMesa(card));
+    }
+
+    vincularCardMesa(card) {
+        card.addEventListener('click', (e) => {
+            const mesaNumero = parseInt(e.currentTarget.dataset.mesaNumero);
+            this.abrirDetalhesMesa(mesaNumero);
         });
     }
 
+    atualizarCardMesa(mesa) {
+        const card = document.querySelector(`.mesa-card[data-mesa-numero="${mesa.numero}"]`);
+
+        // Mesa nova ou grade ainda vazia: renderizar tudo
+        if (!card) {
+            this.renderizarMesas();
+            return;
+        }
+
+        const template = document.createElement('template');
+        template.innerHTML = this.renderizarMesa(mesa).trim();
+        const novoCard = template.content.firstElementChild;
+        card.replaceWith(novoCard);
+        this.vincularCardMesa(novoCard);
+    }
+
     renderizarMesa(mesa) {
         const statusClass = mesa.status.replace('_', '');
         const statusText = this.formatarStatusMesa(mesa.status);
@@ -179,6 +203,12 @@ class AdminPanel {
         `;
     }
 
+    nomeItemCardapio(item) {
+        // Respostas compactas trazem só o id; os itens do cardápio vêm à parte
+        const itemCardapio = item.item_cardapio || this.itensCardapio[item.item_cardapio_id];
+        return itemCardapio ? itemCardapio.nome : `Item ${item.item_cardapio_id}`;
+    }
+
     formatarStatusMesa(status) {
         const statusMap = {
             'livre': 'Livre',
@@ -269,7 +299,7 @@ class AdminPanel {
                 detalhesHTML += `
                     <div class="item-pedido">
                         <div class="item-info">
-                            <div class="item-nome">${item.item_cardapio.nome}</div>
+                            <div class="item-nome">${this.nomeItemCardapio(item)}</div>
                             <div class="item-detalhes">
                                 ${item.quantidade}x R$ ${item.preco_unitario.toFixed(2).replace('.', ',')}
                                 ${item.observacoes ? ` - ${item.observacoes}` : ''}
@@ -353,10 +383,152 @@ class AdminPanel {
     }
 
     iniciarAtualizacaoAutomatica() {
-        // Atualizar a cada 30 segundos
+        // Sincronização incremental (?since=) a cada 30 segundos, com ou sem SSE:
+        // o broker de eventos é local a cada processo, então com vários workers
+        // as mudanças feitas pelos outros só chegam por aqui
         this.refreshInterval = setInterval(() => {
-            this.carregarDados();
+            this.sincronizarAlteracoes();
         }, 30000);
+
+        if (!window.EventSource) {
+            return;
+        }
+
+        this.eventSource = new EventSource(`${this.apiBase}/admin/eventos`);
+        let reconectando = false;
+
+        this.eventSource.addEventListener('open', () => {
+            // Eventos podem ter sido perdidos enquanto a conexão estava caída
+            if (reconectando) {
+                reconectando = false;
+                this.carregarDados();
+            }
+        });
+
+        this.eventSource.addEventListener('error', () => {
+            reconectando = true;
+        });
+
+        this.eventSource.addEventListener('mesa', (e) => {
+            this.aplicarMesa(JSON.parse(e.data));
+        });
+
+        this.eventSource.addEventListener('pedido', (e) => {
+            this.aplicarPedido(JSON.parse(e.data));
+        });
+
+        this.eventSource.addEventListener('pedido_removido', (e) => {
+            this.removerPedido(JSON.parse(e.data));
+        });
+    }
+
+    async sincronizarAlteracoes() {
+        if (!this.watermark) {
+            await this.carregarDados();
+            return;
+        }
+
+        try {
+            const since = encodeURIComponent(this.watermark);
+            const response = await fetch(`${this.apiBase}/admin/mesas?compacto=1&since=${since}`);
+
+            // Watermark recusado pelo servidor: recarregar tudo
+            if (response.status === 400) {
+                await this.carregarDados();
+                return;
+            }
+
+            const data = await response.json();
+            if (!data.success) {
+                throw new Error(data.error || 'Erro ao sincronizar mesas');
+            }
+
+            Object.assign(this.itensCardapio, data.itens_cardapio || {});
+            // Remoções antes das mesas: o pedido ativo da resposta sempre prevalece
+            data.pedidos_removidos.forEach(removido => this.removerPedido(removido));
+            data.mesas.forEach(dados => this.aplicarMesaCompleta(dados));
+            this.watermark = data.watermark;
+
+            if (data.mesas.length > 0) {
+                this.agendarAtualizacaoEstatisticas();
+            }
+        } catch (error) {
+            console.error('Erro ao sincronizar alterações:', error);
+        }
+    }
+
+    aplicarMesaCompleta(dados) {
+        // Mesa retornada por /admin/mesas, já com o pedido ativo
+        const mesa = this.mesas.find(m => m.id === dados.id);
+
+        if (mesa) {
+            Object.assign(mesa, dados);
+            this.atualizarCardMesa(mesa);
+        } else {
+            this.mesas.push(dados);
+            this.atualizarCardMesa(dados);
+        }
+    }
+
+    aplicarMesa(dados) {
+        let mesa = this.mesas.find(m => m.id === dados.id);
+
+        if (mesa) {
+            Object.assign(mesa, dados);
+        } else {
+            mesa = { ...dados, pedido_ativo: null };
+            this.mesas.push(mesa);
+        }
+
+        this.atualizarCardMesa(mesa);
+        this.agendarAtualizacaoEstatisticas();
+    }
+
+    aplicarPedido(pedido) {
+        const mesa = this.mesas.find(m => m.id === pedido.mesa_id);
+        if (!mesa) {
+            return;
+        }
+
+        const ativo = pedido.status === 'aberto' || pedido.status === 'fechado';
+
+        if (ativo) {
+            mesa.pedido_ativo = pedido;
+        } else if (mesa.pedido_ativo && mesa.pedido_ativo.id === pedido.id) {
+            mesa.pedido_ativo = null;
+        }
+
+        this.atualizarCardMesa(mesa);
+        this.agendarAtualizacaoEstatisticas();
+    }
+
+    removerPedido(dados) {
+        const mesa = this.mesas.find(m => m.id === dados.mesa_id);
+
+        if (mesa && mesa.pedido_ativo && mesa.pedido_ativo.id === dados.id) {
+            mesa.pedido_ativo = null;
+            this.atualizarCardMesa(mesa);
+        }
+
+        this.agendarAtualizacaoEstatisticas();
+    }
+
+    agendarAtualizacaoEstatisticas() {
+        // Agrupar rajadas de eventos em uma única requisição
+        clearTimeout(this.estatisticasTimeout);
+        this.estatisticasTimeout = setTimeout(async () => {
+            try {
+                const response = await fetch(`${this.apiBase}/admin/estatisticas`);
+                const data = await response.json();
+
+                if (data.success) {
+                    this.estatisticas = data.estatisticas;
+                    this.renderizarEstatisticas();
+                }
+            } catch (error) {
+                console.error('Erro ao atualizar estatísticas:', error);
+            }
+        }, 1000);
     }
 
     pararAtualizacaoAutomatica() {
@@ -364,6 +536,11 @@ class AdminPanel {
             clearInterval(this.refreshInterval);
             this.refreshInterval = null;
         }
+
+        if (this.eventSource) {
+            this.eventSource.close();
+            this.eventSource = null;
+        }
     }
 
     showLoading() {
@@ -357,25 +357,27 @@ class RestauranteApp {
         this.showLoading();
 
         try {
-            // Adicionar cada item do carrinho ao pedido
-            for (const item of this.carrinho) {
-                const response = await fetch(`${this.apiBase}/pedidos/${this.pedidoAtual.id}/adicionar-item`, {
-                    method: 'POST',
-                    headers: {
-                        'Content-Type': 'application/json',
-                    },
-                    body: JSON.stringify({
+            // Enviar o carrinho inteiro em uma única requisição
+            const response = await fetch(`${this.apiBase}/pedidos/${this.pedidoAtual.id}/itens`, {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json',
+                },
+                body: JSON.stringify({
+                    itens: this.carrinho.map(item => ({
                         item_cardapio_id: item.id,
                         quantidade: item.quantidade
-                    })
-                });
+                    }))
+                })
+            });
 
-                const data = await response.json();
-                if (!data.success) {
-                    throw new Error(data.error || 'Erro ao adicionar item');
-                }
+            const data = await response.json();
+            if (!data.success) {
+                throw new Error(data.error || 'Erro ao adicionar itens');
             }
 
+            this.pedidoAtual = data.pedido;
+
             // Limpar carrinho
             this.carrinho = [];
             this.atualizarCarrinhoUI();
@@ -0,0 +1,135 @@
+"""
+Arquivamento de pedidos encerrados
+
+Move pedidos (e seus itens) da tabela quente `pedidos` para as tabelas de
+histórico com comandos em lote (INSERT ... SELECT seguido de DELETE), sem
+carregar nenhum objeto na sessão. Cada pedido arquivado também gera um
+tombstone em `pedidos_removidos`, para que a sincronização incremental
+(?since=) propague a remoção.
+
+O arquivamento acontece:
+- ao resetar uma mesa (todos os pedidos da mesa)
+- na varredura periódica, para pedidos pagos há mais de um tempo mínimo
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, insert, literal, select
+
+from src.models.restaurante import (
+    db, Pedido, ItemPedido, PedidoRemovido, PedidoHistorico, ItemPedidoHistorico
+)
+
+# Pedidos pagos continuam visíveis no painel por este tempo antes de arquivar
+IDADE_MINIMA_PADRAO = timedelta(minutes=5)
+
+_COLUNAS_PEDIDO = ['mesa_id', 'cliente_nome', 'status', 'total', 'observacoes', 'created_at', 'updated_at']
+_COLUNAS_ITEM = ['item_cardapio_id', 'quantidade', 'preco_unitario', 'subtotal', 'observacoes']
+
+
+def arquivar_pedidos(*condicoes):
+    """
+    Arquiva os pedidos que atendem às condições, na transação da sessão atual
+
+    O commit fica a cargo de quem chama.
+
+    Args:
+        *condicoes: Expressões de filtro sobre Pedido (ex: Pedido.mesa_id == 3)
+
+    Returns:
+        list: Tuplas (pedido_id, mesa_id) dos pedidos arquivados
+    """
+    arquivados = db.session.execute(
+        select(Pedido.id, Pedido.mesa_id).where(*condicoes)
+    ).all()
+    if not arquivados:
+        return []
+
+    agora = datetime.utcnow()
+    ids = select(Pedido.id).where(*condicoes).scalar_subquery()
+
+    # Pedidos -> histórico (o id original vai para pedido_id)
+    db.session.execute(
+        insert(PedidoHistorico).from_select(
+            ['pedido_id'] + _COLUNAS_PEDIDO + ['arquivado_em'],
+            select(Pedido.id, *[getattr(Pedido, coluna) for coluna in _COLUNAS_PEDIDO], literal(agora))
+            .where(*condicoes)
+        )
+    )
+
+    # Itens -> histórico, ligados ao registro recém-criado do pedido
+    db.session.execute(
+        insert(ItemPedidoHistorico).from_select(
+            ['pedido_historico_id'] + _COLUNAS_ITEM,
+            select(PedidoHistorico.id, *[getattr(ItemPedido, coluna) for coluna in _COLUNAS_ITEM])
+            .join(PedidoHistorico, PedidoHistorico.pedido_id == ItemPedido.pedido_id)
+            .where(ItemPedido.pedido_id.in_(ids), PedidoHistorico.arquivado_em == agora)
+        )
+    )
+
+    # Tombstones para a sincronização incremental
+    db.session.execute(
+        insert(PedidoRemovido).from_select(
+            ['pedido_id', 'mesa_id', 'removido_em'],
+            select(Pedido.id, Pedido.mesa_id, literal(agora)).where(*condicoes)
+        )
+    )
+
+    db.session.execute(
+        delete(ItemPedido).where(ItemPedido.pedido_id.in_(ids)),
+        execution_options={'synchronize_session': False}
+    )
+    db.session.execute(
+        delete(Pedido).where(*condicoes),
+        execution_options={'synchronize_session': False}
+    )
+
+    return [tuple(linha) for linha in arquivados]
+
+
+def varrer_pedidos_pagos(idade_minima):
+    """
+    Arquiva os pedidos pagos há mais de idade_minima e confirma a transação
+
+    Args:
+        idade_minima (timedelta): Tempo mínimo desde a última alteração do
+            pedido, para que o painel ainda veja o pagamento por um tempo
+
+    Returns:
+        int: Quantidade de pedidos arquivados
+    """
+    limite = datetime.utcnow() - idade_minima
+    arquivados = arquivar_pedidos(Pedido.status == 'pago', Pedido.updated_at < limite)
+    db.session.commit()
+    return len(arquivados)
+
+
+def iniciar_varredura_periodica(app, intervalo, idade_minima):
+    """
+    Inicia uma thread daemon que arquiva pedidos pagos periodicamente
+
+    Args:
+        app (Flask): Aplicação (para o contexto do banco)
+        intervalo (int): Segundos entre varreduras
+        idade_minima (timedelta): Ver varrer_pedidos_pagos
+
+    Returns:
+        threading.Thread: Thread iniciada
+    """
+    def executar():
+        while True:
+            time.sleep(intervalo)
+            try:
+                with app.app_context():
+                    total = varrer_pedidos_pagos(idade_minima)
+                if total:
+                    print(f"Arquivamento: {total} pedido(s) pago(s) movido(s) para o histórico")
+            except Exception as e:
+                print(f"Erro na varredura de arquivamento: {e}")
+
+    thread = threading.Thread(target=executar, name='varredura-arquivamento', daemon=True)
+    thread.start()
+    return thread
+
@@ -0,0 +1,171 @@
+"""
+Pipeline dos arquivos estáticos do frontend (cliente e painel admin)
+
+Uma única vez por processo (em segundo plano logo após a criação da
+aplicação, ou no primeiro uso, o que vier antes), cada asset (JS/CSS) é
+lido e recebe:
+- um nome com fingerprint do conteúdo (ex: script.3f2a9c0d1e4b.js),
+  servido com cache imutável de 1 ano
+- variantes pré-comprimidas em gzip e em brotli (pacote `Brotli` do
+  requirements.txt; sem ele, apenas gzip, com um aviso ao construir)
+
+As páginas HTML são reescritas para apontar para os nomes com fingerprint
+e são servidas com revalidação por ETag (não podem ser imutáveis, pois
+são o ponto de entrada). Cada requisição escolhe a variante conforme o
+cabeçalho Accept-Encoding, sem nenhum acesso ao disco.
+"""
+
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+import threading
+
+from flask import Response, request
+
+try:
+    import brotli
+except ImportError:  # brotli é opcional; sem ele, apenas gzip
+    brotli = None
+
+ASSETS = ('script.js', 'styles.css', 'admin-script.js', 'admin-styles.css')
+PAGINAS = ('index.html', 'admin.html')
+
+TAMANHO_FINGERPRINT = 12
+CACHE_IMUTAVEL_SEGUNDOS = 365 * 24 * 60 * 60
+
+# Ordem de preferência das codificações quando o cliente aceita várias
+CODIFICACOES = ('br', 'gzip')
+
+
+class ArquivoEstatico:
+    """Conteúdo de um arquivo estático e suas variantes comprimidas"""
+
+    __slots__ = ('nome', 'mimetype', 'hash', 'variantes', 'imutavel')
+
+    def __init__(self, nome, conteudo, imutavel, variantes=None):
+        self.nome = nome
+        self.mimetype = mimetypes.guess_type(nome)[0] or 'application/octet-stream'
+        self.hash = hashlib.sha256(conteudo).hexdigest()
+        self.imutavel = imutavel
+        if variantes is not None:
+            self.variantes = variantes
+            return
+        self.variantes = {'identity': conteudo}
+
+        comprimidos = {'gzip': gzip.compress(conteudo, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            comprimidos['br'] = brotli.compress(conteudo, quality=11)
+        for codificacao, dados in comprimidos.items():
+            # Só vale a pena guardar a variante se ela for menor
+            if len(dados) < len(conteudo):
+                self.variantes[codificacao] = dados
+
+    def escolher_variante(self, aceitas):
+        """Retorna (codificação, bytes) conforme o Accept-Encoding do cliente"""
+        for codificacao in CODIFICACOES:
+            if codificacao in self.variantes and aceitas.quality(codificacao) > 0:
+                return codificacao, self.variantes[codificacao]
+        return 'identity', self.variantes['identity']
+
+
+def nome_com_fingerprint(nome, hash_conteudo):
+    base, extensao = os.path.splitext(nome)
+    return f"{base}.{hash_conteudo[:TAMANHO_FINGERPRINT]}{extensao}"
+
+
+class PipelineAssets:
+    def __init__(self, diretorio_static):
+        self.diretorio = diretorio_static
+        self._lock = threading.Lock()
+        self._arquivos = None
+        self.fingerprints = {}
+
+    def iniciar_em_segundo_plano(self):
+        """Constrói o pipeline em uma thread, sem atrasar a inicialização"""
+        thread = threading.Thread(target=self.garantir, name='pipeline-assets', daemon=True)
+        thread.start()
+        return thread
+
+    def garantir(self):
+        """Constrói o pipeline se ainda não foi construído"""
+        if self._arquivos is None:
+            with self._lock:
+                if self._arquivos is None:
+                    self.construir()
+        return self._arquivos
+
+    def construir(self):
+        """Lê os assets, gera os nomes com fingerprint, reescreve as páginas e comprime tudo"""
+        arquivos = {}
+        fingerprints = {}
+
+        for nome in ASSETS:
+            caminho = os.path.join(self.diretorio, nome)
+            if not os.path.isfile(caminho):
+                continue
+            with open(caminho, 'rb') as f:
+                conteudo = f.read()
+
+            nome_final = nome_com_fingerprint(nome, hashlib.sha256(conteudo).hexdigest())
+            arquivo = arquivos[nome_final] = ArquivoEstatico(nome_final, conteudo, imutavel=True)
+            fingerprints[nome] = nome_final
+            # O nome original continua disponível, com revalidação (mesmas variantes)
+            arquivos[nome] = ArquivoEstatico(nome, conteudo, imutavel=False, variantes=arquivo.variantes)
+
+        # href="styles.css" / src="script.js" -> nomes com fingerprint
+        if fingerprints:
+            referencias = re.compile(
+                r'((?:href|src)=")(' + '|'.join(re.escape(nome) for nome in fingerprints) + r')(")'
+            )
+        for nome in PAGINAS:
+            caminho = os.path.join(self.diretorio, nome)
+            if not os.path.isfile(caminho):
+                continue
+            with open(caminho, encoding='utf-8') as f:
+                html = f.read()
+            if fingerprints:
+                html = referencias.sub(lambda m: m.group(1) + fingerprints[m.group(2)] + m.group(3), html)
+            arquivos[nome] = ArquivoEstatico(nome, html.encode('utf-8'), imutavel=False)
+
+        if brotli is None:
+            print("Aviso: pacote brotli não instalado; assets servidos apenas com gzip "
+                  "(pip install -r requirements.txt)")
+
+        self.fingerprints = fingerprints
+        self._arquivos = arquivos
+
+    def servir(self, nome):
+        """
+        Monta a resposta para um arquivo do pipeline
+
+        Args:
+            nome (str): Nome do arquivo (original, com fingerprint ou página HTML)
+
+        Returns:
+            Response: Resposta com a variante escolhida, ou None se o arquivo
+                não faz parte do pipeline
+        """
+        arquivo = self.garantir().get(nome)
+        if arquivo is None:
+            return None
+
+        codificacao, dados = arquivo.escolher_variante(request.accept_encodings)
+
+        response = Response(dados, mimetype=arquivo.mimetype)
+        if codificacao != 'identity':
+            response.headers['Content-Encoding'] = codificacao
+        if len(arquivo.variantes) > 1:
+            response.vary.add('Accept-Encoding')
+
+        # ETag diferente por variante: os bytes enviados são diferentes
+        response.set_etag(f"{arquivo.hash[:32]}-{codificacao}")
+        if arquivo.imutavel:
+            response.cache_control.public = True
+            response.cache_control.max_age = CACHE_IMUTAVEL_SEGUNDOS
+            response.cache_control.immutable = True
+        else:
+            response.cache_control.no_cache = True
+
+        return response.make_conditional(request)
@@ -0,0 +1,103 @@
+"""
+Configuração do SQLite para uso com vários clientes simultâneos
+
+- Aplica os PRAGMAs (WAL, synchronous, busy_timeout, cache_size, mmap_size)
+  em cada conexão nova, por meio do evento "connect" do engine
+- Registra um segundo engine, somente leitura, no bind "leitura"
+- SessaoRoteada envia as consultas de requisições GET/HEAD para esse
+  engine, de modo que leituras do painel não disputam conexões com as
+  escritas dos clientes
+
+Todas as opções podem ser alteradas pela configuração da aplicação antes
+de chamar configurar_sqlite (ver CONFIGURACAO_PADRAO).
+"""
+
+from flask import has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+
+BIND_LEITURA = 'leitura'
+
+CONFIGURACAO_PADRAO = {
+    # PRAGMAs aplicados em todas as conexões (valores em páginas/bytes/ms)
+    'SQLITE_PRAGMAS': {
+        'synchronous': 'NORMAL',
+        'busy_timeout': 5000,
+        'cache_size': -16000,       # negativo = KiB (16 MB)
+        'mmap_size': 134217728,     # 128 MB
+    },
+    # journal_mode só pode ser alterado por conexões com permissão de escrita
+    'SQLITE_JOURNAL_MODE': 'WAL',
+    # Engine separado, somente leitura, para as requisições GET
+    'SQLITE_LEITURA_SEPARADA': True,
+}
+
+METODOS_LEITURA = ('GET', 'HEAD')
+
+
+class SessaoRoteada(Session):
+    """Sessão que usa o engine somente leitura durante requisições GET/HEAD"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and has_request_context() and request.method in METODOS_LEITURA:
+            engine = self._db.engines.get(BIND_LEITURA)
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def configurar_sqlite(app, caminho_db):
+    """
+    Define as URIs do banco SQLite (escrita e, opcionalmente, leitura)
+
+    Deve ser chamada antes de db.init_app(app).
+
+    Args:
+        app (Flask): Aplicação a configurar
+        caminho_db (str): Caminho do arquivo SQLite
+    """
+    for chave, valor in CONFIGURACAO_PADRAO.items():
+        app.config.setdefault(chave, valor)
+
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{caminho_db}"
+
+    if app.config['SQLITE_LEITURA_SEPARADA']:
+        binds = dict(app.config.get('SQLALCHEMY_BINDS') or {})
+        binds[BIND_LEITURA] = f"sqlite:///file:{caminho_db}?mode=ro&uri=true"
+        app.config['SQLALCHEMY_BINDS'] = binds
+
+
+def registrar_pragmas(app, db):
+    """
+    Registra a aplicação dos PRAGMAs em cada conexão nova dos engines SQLite
+
+    Deve ser chamada depois de db.init_app(app).
+
+    Args:
+        app (Flask): Aplicação já inicializada com db
+        db (SQLAlchemy): Extensão do Flask-SQLAlchemy
+    """
+    pragmas = dict(app.config['SQLITE_PRAGMAS'])
+    journal_mode = app.config['SQLITE_JOURNAL_MODE']
+
+    with app.app_context():
+        for chave, engine in db.engines.items():
+            if engine.dialect.name != 'sqlite':
+                continue
+
+            pragmas_engine = dict(pragmas)
+            if chave != BIND_LEITURA and journal_mode:
+                pragmas_engine = {'journal_mode': journal_mode, **pragmas_engine}
+
+            event.listen(engine, 'connect', _aplicador_pragmas(pragmas_engine))
+
+
+def _aplicador_pragmas(pragmas):
+    def aplicar(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for nome, valor in pragmas.items():
+                cursor.execute(f"PRAGMA {nome}={valor}")
+        finally:
+            cursor.close()
+    return aplicar
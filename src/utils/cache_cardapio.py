@@ -0,0 +1,151 @@
+"""
+Cache em memória do cardápio
+
+Mantém um snapshot do cardápio já serializado em JSON (bytes) junto com
+uma versão e um ETag. O snapshot é invalidado automaticamente sempre que
+um ItemCardapio é inserido, alterado ou removido e a transação é confirmada.
+
+O cache é local ao processo: cada worker mantém o seu próprio snapshot.
+Para que uma alteração feita em um worker chegue aos demais, a mesma
+transação incrementa a versão 'cardapio' em versoes_cache. Antes de servir
+o snapshot, essa versão é lida (uma consulta pela chave primária) no máximo
+uma vez a cada CARDAPIO_VERIFICACAO_SEGUNDOS, e o snapshot é reconstruído
+se ela mudou: alterações de outros processos aparecem em até esse
+intervalo, as do próprio processo imediatamente. O ETag é derivado do
+conteúdo, então é o mesmo em todos os processos.
+"""
+
+import hashlib
+import threading
+import time
+from itertools import chain
+
+from sqlalchemy import event, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+
+from src.models.restaurante import db, ItemCardapio, VersaoCache
+
+CHAVE_VERSAO = 'cardapio'
+INTERVALO_VERIFICACAO_PADRAO = 1.0
+
+
+class SnapshotCardapio:
+    """Cardápio serializado pronto para ser enviado ao cliente"""
+
+    __slots__ = ('versao', 'versao_banco', 'etag', 'conteudo')
+
+    def __init__(self, versao, conteudo, versao_banco=None):
+        self.versao = versao
+        self.versao_banco = versao_banco
+        self.conteudo = conteudo
+        self.etag = f"cardapio-{hashlib.sha1(conteudo).hexdigest()[:16]}"
+
+
+class CacheCardapio:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._versao = 0
+        self._snapshot = None
+        self._verificado_em = None
+        self.intervalo_verificacao = INTERVALO_VERIFICACAO_PADRAO
+
+    def configurar(self, intervalo_verificacao):
+        """Intervalo mínimo (s) entre leituras da versão do cardápio no banco"""
+        self.intervalo_verificacao = intervalo_verificacao
+
+    @property
+    def versao(self):
+        return self._versao
+
+    def obter_snapshot(self, construir, ler_versao_banco=None):
+        """
+        Retorna o snapshot atual, construindo-o se necessário
+
+        Args:
+            construir (callable): Função sem argumentos que retorna os bytes
+                JSON do cardápio. Só é chamada quando o cache está vazio ou
+                desatualizado.
+            ler_versao_banco (callable): Retorna a versão do cardápio no banco;
+                chamada no máximo uma vez por intervalo_verificacao (e sempre
+                que o snapshot precisa ser construído)
+
+        Returns:
+            SnapshotCardapio: Snapshot válido para a versão atual
+        """
+        snapshot = self._snapshot
+        if snapshot is not None and not self._verificacao_vencida(ler_versao_banco):
+            return snapshot
+
+        versao_banco = ler_versao_banco() if ler_versao_banco is not None else None
+        self._verificado_em = time.monotonic()
+        if snapshot is not None and snapshot.versao_banco == versao_banco:
+            return snapshot
+
+        with self._lock:
+            if self._snapshot is None or self._snapshot.versao_banco != versao_banco:
+                versao = self._versao
+                conteudo = construir()
+                # Se o cardápio mudou enquanto construíamos, não guardar
+                if versao == self._versao:
+                    self._snapshot = SnapshotCardapio(versao, conteudo, versao_banco)
+                else:
+                    return SnapshotCardapio(versao, conteudo, versao_banco)
+            return self._snapshot
+
+    def _verificacao_vencida(self, ler_versao_banco):
+        if ler_versao_banco is None:
+            return False
+        verificado_em = self._verificado_em
+        return verificado_em is None or time.monotonic() - verificado_em >= self.intervalo_verificacao
+
+    def invalidar(self):
+        """Descarta o snapshot atual e avança a versão"""
+        with self._lock:
+            self._versao += 1
+            self._snapshot = None
+
+
+cache_cardapio = CacheCardapio()
+
+
+def ler_versao_banco():
+    """Versão do cardápio registrada no banco (0 se nunca foi alterado)"""
+    versao = db.session.execute(
+        select(VersaoCache.versao).where(VersaoCache.nome == CHAVE_VERSAO)
+    ).scalar()
+    return versao or 0
+
+_CHAVE_ALTERADO = 'cardapio_alterado'
+
+
+@event.listens_for(Session, 'after_flush')
+def _detectar_alteracao_cardapio(session, flush_context):
+    """
+    Marca a sessão quando algum ItemCardapio foi inserido, alterado ou removido
+    e incrementa a versão do cardápio no banco, na mesma transação
+    """
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, ItemCardapio):
+            session.info[_CHAVE_ALTERADO] = True
+            session.connection().execute(
+                insert(VersaoCache)
+                .values(nome=CHAVE_VERSAO, versao=1)
+                .on_conflict_do_update(
+                    index_elements=[VersaoCache.nome], set_={'versao': VersaoCache.versao + 1}
+                )
+            )
+            return
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidar_apos_commit(session):
+    """Invalida o cache somente depois que a alteração foi confirmada"""
+    if session.info.pop(_CHAVE_ALTERADO, False):
+        cache_cardapio.invalidar()
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _descartar_marcacao(session, previous_transaction):
+    """Alterações desfeitas não invalidam o cache"""
+    session.info.pop(_CHAVE_ALTERADO, None)
@@ -0,0 +1,136 @@
+"""
+Cache LRU em memória dos QR codes gerados dinamicamente
+
+O QR code de uma mesa é totalmente determinado por (base_url, numero_mesa,
+qr_settings) e pelo formato (PNG ou SVG), então o arquivo gerado e o base64
+correspondente podem ser reaproveitados entre requisições. O cache é
+limitado pelo total de bytes armazenados (conteúdo + base64): ao passar do
+limite, as entradas usadas há mais tempo são descartadas.
+
+O cache é local ao processo. Os contadores de acertos e faltas ficam
+disponíveis em estatisticas().
+"""
+
+import base64
+import threading
+from collections import OrderedDict
+
+LIMITE_BYTES_PADRAO = 8 * 1024 * 1024  # 8 MB
+
+FORMATOS = {
+    'png': 'image/png',
+    'svg': 'image/svg+xml',
+}
+
+
+class QRCodeRenderizado:
+    """Arquivo de um QR code (PNG ou SVG) e sua versão base64"""
+
+    __slots__ = ('formato', 'conteudo', 'base64')
+
+    def __init__(self, formato, conteudo):
+        self.formato = formato
+        self.conteudo = conteudo
+        self.base64 = base64.b64encode(conteudo).decode()
+
+    @property
+    def mimetype(self):
+        return FORMATOS[self.formato]
+
+    @property
+    def tamanho(self):
+        return len(self.conteudo) + len(self.base64)
+
+
+class CacheQRCodes:
+    def __init__(self, limite_bytes=LIMITE_BYTES_PADRAO):
+        self._lock = threading.Lock()
+        self._entradas = OrderedDict()
+        self._bytes = 0
+        self.limite_bytes = limite_bytes
+        self.acertos = 0
+        self.faltas = 0
+
+    @staticmethod
+    def chave(generator, numero_mesa, formato='png'):
+        """Chave do cache: (base_url, numero_mesa, qr_settings, formato)"""
+        return generator.base_url, numero_mesa, tuple(sorted(generator.qr_settings.items())), formato
+
+    def obter(self, generator, numero_mesa, formato='png'):
+        """
+        Retorna o QR code da mesa, gerando-o apenas em caso de falta
+
+        Args:
+            generator (QRCodeGenerator): Gerador com a base_url e as configurações
+            numero_mesa (int): Número da mesa
+            formato (str): 'png' ou 'svg'
+
+        Returns:
+            QRCodeRenderizado: Conteúdo e base64 do QR code
+
+        Raises:
+            ValueError: Se o formato não for suportado
+        """
+        if formato not in FORMATOS:
+            raise ValueError(f"Formato de QR code não suportado: {formato}")
+
+        chave = self.chave(generator, numero_mesa, formato)
+
+        with self._lock:
+            qr = self._entradas.get(chave)
+            if qr is not None:
+                self._entradas.move_to_end(chave)
+                self.acertos += 1
+                return qr
+            self.faltas += 1
+
+        # Gerar fora do lock; duas requisições simultâneas podem gerar o mesmo QR
+        gerar = generator.gerar_svg_mesa if formato == 'svg' else generator.gerar_png_mesa
+        qr = QRCodeRenderizado(formato, gerar(numero_mesa))
+        self._guardar(chave, qr)
+        return qr
+
+    def _guardar(self, chave, qr):
+        with self._lock:
+            anterior = self._entradas.pop(chave, None)
+            if anterior is not None:
+                self._bytes -= anterior.tamanho
+
+            if qr.tamanho > self.limite_bytes:
+                return
+
+            self._entradas[chave] = qr
+            self._bytes += qr.tamanho
+            while self._bytes > self.limite_bytes:
+                _, removido = self._entradas.popitem(last=False)
+                self._bytes -= removido.tamanho
+
+    def configurar(self, limite_bytes):
+        """Altera o limite de memória, descartando entradas se necessário"""
+        with self._lock:
+            self.limite_bytes = limite_bytes
+            while self._entradas and self._bytes > self.limite_bytes:
+                _, removido = self._entradas.popitem(last=False)
+                self._bytes -= removido.tamanho
+
+    def limpar(self):
+        """Descarta todas as entradas (os contadores são mantidos)"""
+        with self._lock:
+            self._entradas.clear()
+            self._bytes = 0
+
+    def estatisticas(self):
+        """Retorna o uso do cache e os contadores de acertos e faltas"""
+        with self._lock:
+            total = self.acertos + self.faltas
+            return {
+                'entradas': len(self._entradas),
+                'bytes': self._bytes,
+                'limite_bytes': self.limite_bytes,
+                'acertos': self.acertos,
+                'faltas': self.faltas,
+                'taxa_acerto': round(self.acertos / total, 4) if total else 0.0
+            }
+
+
+cache_qr_codes = CacheQRCodes()
@@ -0,0 +1,166 @@
+"""
+Log de consultas lentas
+
+Os eventos before/after_cursor_execute dos engines medem cada comando SQL.
+Os que passam do limiar (config CONSULTAS_LENTAS_LIMIAR_MS) são guardados
+em um buffer circular de tamanho fixo (CONSULTAS_LENTAS_CAPACIDADE) com:
+- o SQL e os parâmetros
+- a rota que o executou (método, caminho e endpoint), se houver
+- o EXPLAIN QUERY PLAN do SQLite e as varreduras completas de tabela
+
+Consultas abaixo do limiar custam apenas duas leituras do relógio. O plano
+é obtido na mesma conexão, pelo driver, sem disparar os eventos de novo.
+O buffer é local ao processo.
+
+Exposição: GET /api/admin/slow-queries (DELETE limpa o buffer)
+"""
+
+import threading
+import time
+from collections import deque
+from datetime import date, datetime
+
+from flask import has_request_context, request
+from sqlalchemy import event
+
+from src.utils.plano_consultas import explicar_dbapi, varreduras_completas
+
+LIMIAR_MS_PADRAO = 50
+CAPACIDADE_PADRAO = 100
+
+# Comandos que o EXPLAIN QUERY PLAN aceita
+COMANDOS_EXPLICAVEIS = ('SELECT', 'INSERT', 'UPDATE', 'DELETE', 'WITH')
+
+
+def _parametro(valor):
+    """Converte um parâmetro em um valor serializável em JSON"""
+    if valor is None or isinstance(valor, (bool, int, float, str)):
+        return valor
+    if isinstance(valor, (datetime, date)):
+        return valor.isoformat()
+    return repr(valor)
+
+
+def conjuntos_parametros(parametros):
+    """
+    Lista dos conjuntos de parâmetros de um comando
+
+    executemany recebe uma lista de conjuntos; os INSERTs em lote
+    ("insertmanyvalues") chegam com executemany=True, mas com um único
+    conjunto já achatado, por isso o formato é verificado aqui.
+    """
+    if isinstance(parametros, list) and parametros and isinstance(parametros[0], (tuple, list, dict)):
+        return parametros
+    return [parametros]
+
+
+def parametros_json(parametros):
+    if isinstance(parametros, dict):
+        return {chave: _parametro(valor) for chave, valor in parametros.items()}
+    return [_parametro(valor) for valor in parametros or ()]
+
+
+class LogConsultasLentas:
+    def __init__(self, limiar_ms=LIMIAR_MS_PADRAO, capacidade=CAPACIDADE_PADRAO):
+        self._lock = threading.Lock()
+        self._consultas = deque(maxlen=capacidade)
+        self.limiar_segundos = limiar_ms / 1000
+        self.total = 0
+
+    def configurar(self, limiar_ms, capacidade):
+        """Altera o limiar e a capacidade do buffer (mantém as entradas mais recentes)"""
+        with self._lock:
+            self.limiar_segundos = limiar_ms / 1000
+            self._consultas = deque(self._consultas, maxlen=capacidade)
+
+    def registrar(self, conn, sql, parametros, duracao):
+        """Guarda uma consulta lenta com a rota e o plano de execução"""
+        conjuntos = conjuntos_parametros(parametros)
+        entrada = {
+            'momento': datetime.utcnow().isoformat(),
+            'duracao_ms': round(duracao * 1000, 3),
+            'sql': sql,
+            # Apenas o primeiro conjunto de parâmetros; o total fica em 'execucoes'
+            'parametros': parametros_json(conjuntos[0]),
+            'execucoes': len(conjuntos),
+            'rota': None,
+            'plano': [],
+            'varreduras_completas': [],
+        }
+        if has_request_context():
+            entrada['rota'] = {
+                'metodo': request.method,
+                'caminho': request.full_path.rstrip('?'),
+                'endpoint': request.endpoint,
+            }
+
+        if sql.lstrip()[:6].upper().startswith(COMANDOS_EXPLICAVEIS):
+            try:
+                plano = explicar_dbapi(conn.connection.dbapi_connection, sql, conjuntos[0] or ())
+                entrada['plano'] = plano
+                entrada['varreduras_completas'] = varreduras_completas(plano)
+            except Exception as e:
+                entrada['plano'] = [f"EXPLAIN QUERY PLAN falhou: {e}"]
+
+        with self._lock:
+            self._consultas.append(entrada)
+            self.total += 1
+
+    def consultas(self):
+        """Retorna as consultas lentas guardadas, da mais recente para a mais antiga"""
+        with self._lock:
+            return list(reversed(self._consultas))
+
+    def limpar(self):
+        with self._lock:
+            self._consultas.clear()
+            self.total = 0
+
+    def resumo(self):
+        with self._lock:
+            return {
+                'limiar_ms': self.limiar_segundos * 1000,
+                'capacidade': self._consultas.maxlen,
+                'total': self.total,
+                'guardadas': len(self._consultas),
+            }
+
+
+log_consultas_lentas = LogConsultasLentas()
+
+
+def registrar_consultas_lentas(app, db):
+    """
+    Registra a medição dos comandos SQL em todos os engines
+
+    Deve ser chamada depois de db.init_app(app).
+
+    Args:
+        app (Flask): Aplicação já inicializada com db
+        db (SQLAlchemy): Extensão do Flask-SQLAlchemy
+    """
+    log_consultas_lentas.configurar(
+        app.config['CONSULTAS_LENTAS_LIMIAR_MS'], app.config['CONSULTAS_LENTAS_CAPACIDADE']
+    )
+    with app.app_context():
+        for engine in db.engines.values():
+            event.listen(engine, 'before_cursor_execute', _antes_do_comando)
+            event.listen(engine, 'after_cursor_execute', _depois_do_comando)
+
+
+def _antes_do_comando(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._lenta_inicio = time.perf_counter()
+
+
+def _depois_do_comando(conn, cursor, statement, parameters, context, executemany):
+    inicio = getattr(context, '_lenta_inicio', None)
+    if inicio is None:
+        return
+    duracao = time.perf_counter() - inicio
+    if duracao >= log_consultas_lentas.limiar_segundos:
+        try:
+            log_consultas_lentas.registrar(conn, statement, parameters, duracao)
+        except Exception as e:
+            # O log nunca deve interromper o comando que está sendo medido
+            print(f"Não foi possível registrar a consulta lenta: {e}")
@@ -0,0 +1,151 @@
+"""
+Contadores em memória para as estatísticas do painel administrativo
+
+Quando habilitados (config ESTATISTICAS_EM_MEMORIA), os contadores são
+carregados do banco uma vez e depois mantidos incrementalmente a cada
+mudança de status de mesa e a cada pedido inserido ou removido, de modo
+que o painel lê as estatísticas em O(1), sem consultar o banco.
+
+Os contadores são locais ao processo. Só devem ser habilitados quando um
+único processo escreve no banco; com vários workers cada um enxergaria
+apenas as próprias alterações.
+"""
+
+import threading
+from collections import Counter
+from datetime import datetime, time, timedelta
+from itertools import chain
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from src.models.restaurante import db, Mesa, Pedido, PedidoHistorico, StatusMesa
+
+
+def consultar_contagens(hoje):
+    """
+    Consulta no banco as contagens usadas nas estatísticas
+
+    Args:
+        hoje (date): Dia considerado para os pedidos de hoje
+
+    Returns:
+        tuple: (Counter status da mesa -> quantidade, pedidos de hoje)
+    """
+    mesas_por_status = Counter(dict(
+        db.session.query(Mesa.status, db.func.count(Mesa.id))
+        .group_by(Mesa.status)
+        .all()
+    ))
+
+    # Intervalo [hoje, amanhã) para que o índice em created_at seja usado.
+    # Pedidos já arquivados hoje continuam contando.
+    inicio = datetime.combine(hoje, time.min)
+    fim = inicio + timedelta(days=1)
+    pedidos_hoje = sum(
+        modelo.query.filter(modelo.created_at >= inicio, modelo.created_at < fim).count()
+        for modelo in (Pedido, PedidoHistorico)
+    )
+
+    return mesas_por_status, pedidos_hoje
+
+
+def montar_estatisticas(mesas_por_status, pedidos_hoje):
+    """Monta o dicionário de estatísticas retornado pela API"""
+    return {
+        'total_mesas': sum(mesas_por_status.values()),
+        'mesas_livres': mesas_por_status[StatusMesa.LIVRE.value],
+        'mesas_ocupadas': mesas_por_status[StatusMesa.ABERTA.value],
+        'mesas_aguardando_pagamento': mesas_por_status[StatusMesa.AGUARDANDO_PAGAMENTO.value],
+        'pedidos_hoje': pedidos_hoje
+    }
+
+
+class ContadoresEstatisticas:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._dia = None
+        self._mesas_por_status = None
+        self._pedidos_hoje = 0
+
+    def obter(self):
+        """
+        Retorna as estatísticas atuais, carregando do banco no primeiro uso
+        e na virada do dia
+
+        Returns:
+            dict: Estatísticas no formato de montar_estatisticas
+        """
+        hoje = datetime.now().date()
+        with self._lock:
+            if self._mesas_por_status is None or self._dia != hoje:
+                self._mesas_por_status, self._pedidos_hoje = consultar_contagens(hoje)
+                self._dia = hoje
+            return montar_estatisticas(self._mesas_por_status, self._pedidos_hoje)
+
+    def aplicar(self, mesas_delta, pedidos_delta):
+        """Aplica variações já confirmadas no banco"""
+        with self._lock:
+            if self._mesas_por_status is None:
+                return
+            self._mesas_por_status.update(mesas_delta)
+            self._pedidos_hoje += pedidos_delta.get(self._dia, 0)
+
+
+contadores_estatisticas = ContadoresEstatisticas()
+
+_CHAVE_DELTAS = 'deltas_estatisticas'
+
+
+def _status_anterior(mesa):
+    historico = inspect(mesa).attrs.status.history
+    if historico.deleted:
+        return historico.deleted[0]
+    if historico.unchanged:
+        return historico.unchanged[0]
+    return None
+
+
+def _dia_pedido(pedido):
+    return pedido.created_at.date() if pedido.created_at else datetime.now().date()
+
+
+@event.listens_for(Session, 'after_flush')
+def _registrar_deltas(session, flush_context):
+    """Acumula na sessão as variações de mesas por status e pedidos por dia"""
+    mesas_delta = Counter()
+    pedidos_delta = Counter()
+
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, Mesa):
+            if obj in session.new:
+                mesas_delta[obj.status] += 1
+            elif obj in session.deleted:
+                mesas_delta[_status_anterior(obj)] -= 1
+            else:
+                historico = inspect(obj).attrs.status.history
+                if historico.added and historico.deleted:
+                    mesas_delta[historico.deleted[0]] -= 1
+                    mesas_delta[historico.added[0]] += 1
+        elif isinstance(obj, Pedido):
+            if obj in session.new:
+                pedidos_delta[_dia_pedido(obj)] += 1
+            elif obj in session.deleted:
+                pedidos_delta[_dia_pedido(obj)] -= 1
+
+    if mesas_delta or pedidos_delta:
+        acumulado = session.info.setdefault(_CHAVE_DELTAS, (Counter(), Counter()))
+        acumulado[0].update(mesas_delta)
+        acumulado[1].update(pedidos_delta)
+
+
+@event.listens_for(Session, 'after_commit')
+def _aplicar_deltas(session):
+    deltas = session.info.pop(_CHAVE_DELTAS, None)
+    if deltas:
+        contadores_estatisticas.aplicar(*deltas)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _descartar_deltas(session, previous_transaction):
+    session.info.pop(_CHAVE_DELTAS, None)
@@ -0,0 +1,100 @@
+"""
+Broker publish/subscribe em memória para o painel administrativo
+
+As rotas publicam aqui as mudanças de mesas e pedidos depois do commit, e
+cada conexão SSE em /api/admin/eventos recebe esses eventos por uma fila
+própria. O broker é local ao processo: com vários workers, cada painel
+recebe apenas os eventos do worker ao qual está conectado. Por isso o
+painel também sincroniza periodicamente por GET /api/admin/mesas?since=,
+que lê do banco e cobre as mudanças feitas pelos outros workers.
+"""
+
+import itertools
+import json
+import queue
+import threading
+
+
+class BrokerEventos:
+    def __init__(self, tamanho_fila=100):
+        self.tamanho_fila = tamanho_fila
+        self._lock = threading.Lock()
+        self._inscritos = set()
+        self._sequencia = itertools.count(1)
+
+    def inscrever(self):
+        """Cria e registra uma fila para um novo assinante"""
+        fila = queue.Queue(maxsize=self.tamanho_fila)
+        with self._lock:
+            self._inscritos.add(fila)
+        return fila
+
+    def cancelar(self, fila):
+        """Remove a fila de um assinante"""
+        with self._lock:
+            self._inscritos.discard(fila)
+
+    def publicar(self, tipo, dados):
+        """
+        Publica um evento para todos os assinantes
+
+        Args:
+            tipo (str): Tipo do evento (ex: "mesa", "pedido", "pedido_removido")
+            dados (dict): Conteúdo do evento, serializável em JSON
+        """
+        with self._lock:
+            if not self._inscritos:
+                return
+            inscritos = list(self._inscritos)
+
+        # Formatar uma única vez, compartilhado por todos os assinantes
+        mensagem = f"id: {next(self._sequencia)}\nevent: {tipo}\ndata: {json.dumps(dados)}\n\n"
+
+        for fila in inscritos:
+            try:
+                fila.put_nowait(mensagem)
+            except queue.Full:
+                # Assinante lento demais: desconectar para que recarregue tudo
+                self.cancelar(fila)
+                self._encerrar(fila)
+
+    @staticmethod
+    def _encerrar(fila):
+        """Abre espaço na fila cheia e sinaliza o fim da conexão"""
+        try:
+            fila.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            fila.put_nowait(None)
+        except queue.Full:
+            pass
+
+    def escutar(self, intervalo_keepalive=15):
+        """
+        Gerador de mensagens SSE para uma conexão
+
+        Args:
+            intervalo_keepalive (int): Segundos sem eventos antes de enviar
+                um comentário para manter a conexão aberta
+
+        Yields:
+            str: Mensagens no formato text/event-stream
+        """
+        fila = self.inscrever()
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                try:
+                    mensagem = fila.get(timeout=intervalo_keepalive)
+                except queue.Empty:
+                    yield ": keepalive\n\n"
+                    continue
+                if mensagem is None:
+                    break
+                yield mensagem
+        finally:
+            self.cancelar(fila)
+
+
+broker_eventos = BrokerEventos()
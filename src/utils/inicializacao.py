@@ -0,0 +1,210 @@
+"""
+Inicialização única do banco de dados e dos QR codes
+
+Cria as tabelas (e índices novos em tabelas existentes), popula os dados
+iniciais e gera os QR codes fixos das mesas. Deve rodar uma única vez por
+implantação, antes de iniciar os workers:
+
+    flask --app src.main init-db
+
+Nada disso acontece ao criar a aplicação (create_app), de modo que vários
+processos podem ser iniciados sem repetir o trabalho nem disputar o
+arquivo SQLite.
+"""
+
+import os
+import threading
+
+from sqlalchemy.schema import CreateTable
+
+from src.models.restaurante import db, Mesa, ItemCardapio, Pedido, ItemPedido, PedidoHistorico, PedidoRemovido, StatusMesa
+from src.utils.qr_generator import QRCodeGenerator
+from src.utils.manifesto_qr import obter_manifesto
+from src.utils.tempo_inicializacao import relatorio_inicializacao
+
+
+def _ids_maximos_usados(cursor):
+    """Maior id já atribuído a pedidos e itens, inclusive arquivados e removidos"""
+    maximo_pedidos = max(
+        cursor.execute(f"SELECT COALESCE(MAX({coluna}), 0) FROM {tabela}").fetchone()[0]
+        for tabela, coluna in (
+            (Pedido.__tablename__, 'id'),
+            (PedidoHistorico.__tablename__, 'pedido_id'),
+            (PedidoRemovido.__tablename__, 'pedido_id'),
+        )
+    )
+    maximo_itens = cursor.execute(f"SELECT COALESCE(MAX(id), 0) FROM {ItemPedido.__tablename__}").fetchone()[0]
+    return {Pedido.__tablename__: maximo_pedidos, ItemPedido.__tablename__: maximo_itens}
+
+def _migrar_autoincrement():
+    """
+    Recria pedidos e itens_pedido com AUTOINCREMENT em bancos antigos
+    
+    sqlite_autoincrement só vale para tabelas novas. Sem AUTOINCREMENT, o
+    SQLite reaproveita o id do pedido mais recente depois que ele é
+    arquivado, e o mesmo id passa a aparecer como pedido ativo e como
+    removido (?since=) e repetido no histórico. As tabelas são copiadas
+    para uma nova definição, trocadas em uma única transação e o
+    sqlite_sequence começa do maior id já usado (ativos, histórico e
+    removidos). Os índices são recriados em seguida por migrar_banco.
+    """
+    tabelas = [Pedido.__table__, ItemPedido.__table__]
+    
+    conexao = db.engine.raw_connection()
+    try:
+        dbapi = conexao.driver_connection
+        cursor = dbapi.cursor()
+        definicoes = dict(cursor.execute("SELECT name, sql FROM sqlite_master WHERE type = 'table'").fetchall())
+        antigas = [tabela for tabela in tabelas if 'AUTOINCREMENT' not in (definicoes.get(tabela.name) or '').upper()]
+        if not antigas:
+            return
+        
+        # Transação explícita: o sqlite3 não abre transações para DDL sozinho.
+        # Chaves estrangeiras desligadas para o DROP da tabela antiga (só fora da transação)
+        nivel_isolamento = dbapi.isolation_level
+        dbapi.isolation_level = None
+        chaves_estrangeiras = cursor.execute("PRAGMA foreign_keys").fetchone()[0]
+        cursor.execute("PRAGMA foreign_keys=OFF")
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                for tabela in antigas:
+                    nova = f"{tabela.name}_nova"
+                    ddl = str(CreateTable(tabela).compile(db.engine)).strip()
+                    cursor.execute(ddl.replace(f"CREATE TABLE {tabela.name} (", f"CREATE TABLE {nova} (", 1))
+                    
+                    existentes = {linha[1] for linha in cursor.execute(f"PRAGMA table_info({tabela.name})")}
+                    colunas = ', '.join(coluna.name for coluna in tabela.columns if coluna.name in existentes)
+                    cursor.execute(f"INSERT INTO {nova} ({colunas}) SELECT {colunas} FROM {tabela.name}")
+                    cursor.execute(f"DROP TABLE {tabela.name}")
+                    cursor.execute(f"ALTER TABLE {nova} RENAME TO {tabela.name}")
+                
+                for nome, maximo in _ids_maximos_usados(cursor).items():
+                    cursor.execute("DELETE FROM sqlite_sequence WHERE name = ?", (nome,))
+                    cursor.execute("INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?)", (nome, maximo))
+                cursor.execute("COMMIT")
+            except Exception:
+                cursor.execute("ROLLBACK")
+                raise
+        finally:
+            cursor.execute(f"PRAGMA foreign_keys={chaves_estrangeiras}")
+            dbapi.isolation_level = nivel_isolamento
+        print(f"Tabelas recriadas com AUTOINCREMENT: {', '.join(tabela.name for tabela in antigas)}")
+    finally:
+        conexao.close()
+
+def migrar_banco():
+    """Cria as tabelas que não existem e os índices novos das tabelas existentes"""
+    db.create_all()
+    
+    if db.engine.dialect.name == 'sqlite':
+        _migrar_autoincrement()
+    
+    # create_all não cria índices novos em tabelas já existentes
+    for tabela in db.metadata.sorted_tables:
+        for indice in tabela.indexes:
+            indice.create(db.engine, checkfirst=True)
+
+
+def popular_dados_iniciais():
+    """Cria as 10 mesas e o cardápio se o banco estiver vazio"""
+    # Criar mesas se não existirem
+    if Mesa.query.count() == 0:
+        for i in range(1, 11):  # Criar 10 mesas
+            mesa = Mesa(numero=i, status=StatusMesa.LIVRE.value)
+            db.session.add(mesa)
+        
+        # Criar itens do cardápio se não existirem
+        itens_cardapio = [
+            # Entradas
+            ItemCardapio(nome="Bruschetta", descricao="Pão italiano com tomate, manjericão e azeite", preco=15.90, categoria="entrada"),
+            ItemCardapio(nome="Bolinho de Bacalhau", descricao="Tradicional bolinho português (4 unidades)", preco=18.50, categoria="entrada"),
+            ItemCardapio(nome="Carpaccio de Salmão", descricao="Fatias finas de salmão com alcaparras", preco=22.90, categoria="entrada"),
+            
+            # Pratos Principais
+            ItemCardapio(nome="Risotto de Camarão", descricao="Risotto cremoso com camarões frescos", preco=45.90, categoria="prato_principal"),
+            ItemCardapio(nome="Filé Mignon Grelhado", descricao="Filé mignon com batatas rústicas e legumes", preco=52.90, categoria="prato_principal"),
+            ItemCardapio(nome="Salmão Grelhado", descricao="Salmão grelhado com quinoa e aspargos", preco=48.90, categoria="prato_principal"),
+            ItemCardapio(nome="Massa à Carbonara", descricao="Espaguete com bacon, ovos e queijo parmesão", preco=35.90, categoria="prato_principal"),
+            
+            # Bebidas
+            ItemCardapio(nome="Água Mineral", descricao="Água mineral sem gás 500ml", preco=4.50, categoria="bebida"),
+            ItemCardapio(nome="Refrigerante", descricao="Coca-Cola, Guaraná ou Fanta 350ml", preco=6.90, categoria="bebida"),
+            ItemCardapio(nome="Suco Natural", descricao="Laranja, limão ou maracujá", preco=8.90, categoria="bebida"),
+            ItemCardapio(nome="Vinho Tinto", descricao="Taça de vinho tinto da casa", preco=15.90, categoria="bebida"),
+            ItemCardapio(nome="Cerveja", descricao="Cerveja gelada long neck", preco=7.90, categoria="bebida"),
+            
+            # Sobremesas
+            ItemCardapio(nome="Tiramisu", descricao="Clássica sobremesa italiana", preco=16.90, categoria="sobremesa"),
+            ItemCardapio(nome="Petit Gateau", descricao="Bolinho de chocolate com sorvete", preco=18.90, categoria="sobremesa"),
+            ItemCardapio(nome="Cheesecake", descricao="Cheesecake de frutas vermelhas", preco=14.90, categoria="sobremesa"),
+        ]
+        
+        for item in itens_cardapio:
+            db.session.add(item)
+        
+        db.session.commit()
+        print("Dados iniciais criados: 10 mesas e cardápio completo")
+
+
+def gerar_qr_codes_fixos(base_url):
+    """Gera os QR codes das 10 mesas e a página de impressão, se ainda não existirem"""
+    try:
+        qr_dir = os.path.join(os.path.dirname(__file__), '..', 'static', 'qr_codes')
+        
+        # Verificar se já existem QR codes (para não regenerar sempre)
+        qr_files = [e for e in obter_manifesto(qr_dir).qr_codes() if e['arquivo'].endswith('.png')]
+        qr_files_exist = len(qr_files) >= 10  # Se tem pelo menos 10 QR codes
+        
+        if not qr_files_exist:
+            print("Gerando QR codes FIXOS para todas as mesas...")
+            print("IMPORTANTE: Estes QR codes ficarão FIXOS nas mesas!")
+            
+            generator = QRCodeGenerator(base_url=base_url)
+            
+            # Gerar QR codes para todas as 10 mesas
+            qr_codes = generator.gerar_qr_todas_mesas(quantidade_mesas=10)
+            
+            # Gerar arquivo HTML para impressão
+            html_file = generator.gerar_html_qr_codes(qr_codes)
+            
+            print(f"✅ QR codes FIXOS gerados com sucesso! Total: {len(qr_codes)}")
+            print(f"📄 Arquivo de impressão: {html_file}")
+            print(f"🖨️  Acesse para imprimir: {base_url}/api/qr-codes/impressao")
+            print(f"⚠️  IMPORTANTE: QR codes apontam para {base_url}")
+            print("🔒 Estes QR codes são PERMANENTES e não serão regenerados!")
+        else:
+            print("✅ QR codes já existem e são FIXOS nas mesas")
+            print(f"🖨️  Para imprimir: {base_url}/api/qr-codes/impressao")
+            
+    except Exception as e:
+        print(f"Erro ao gerar QR codes: {e}")
+        print(f"Você pode gerar os QR codes manualmente acessando: {base_url}/api/qr-codes/regenerar")
+
+
+def inicializar(app, qr_em_segundo_plano=False):
+    """
+    Executa toda a inicialização (requer o contexto da aplicação)
+    
+    Args:
+        app (Flask): Aplicação
+        qr_em_segundo_plano (bool): Verifica/gera os QR codes em uma thread,
+            sem bloquear o início do servidor (usado em desenvolvimento)
+    """
+    with relatorio_inicializacao.fase('init: migração'):
+        migrar_banco()
+    with relatorio_inicializacao.fase('init: dados iniciais'):
+        popular_dados_iniciais()
+    
+    if qr_em_segundo_plano:
+        threading.Thread(
+            target=_gerar_qr_codes_medido, args=(app.config['QR_BASE_URL'],),
+            name='qr-codes-fixos', daemon=True
+        ).start()
+    else:
+        _gerar_qr_codes_medido(app.config['QR_BASE_URL'])
+
+
+def _gerar_qr_codes_medido(base_url):
+    with relatorio_inicializacao.fase('init: QR codes fixos'):
+        gerar_qr_codes_fixos(base_url)
@@ -0,0 +1,203 @@
+"""
+Manifesto dos arquivos de QR code
+
+Índice dos arquivos do diretório de QR codes (nome, mesa, tamanho e hash
+SHA-256 do conteúdo), mantido em memória e salvo em manifesto.json no
+próprio diretório. Listar e servir QR codes consultam o manifesto em vez
+de varrer o diretório a cada requisição.
+
+O manifesto é reconstruído apenas quando:
+- o mtime do diretório muda (arquivos criados, removidos ou renomeados)
+- gerar_qr_todas_mesas grava novos arquivos (sobrescrever um arquivo
+  existente não altera o mtime do diretório)
+
+O manifesto também registra a URL base codificada nos QR codes pela
+última geração completa (gerar_qr_todas_mesas), usada pela página de
+impressão para que o cartão mostre a mesma URL que o QR code abre.
+
+O manifesto.json salvo é reaproveitado (ao iniciar ou quando outro
+processo o atualizou) se for mais recente que a última alteração do
+diretório.
+"""
+
+import hashlib
+import json
+import os
+import threading
+
+ARQUIVO_MANIFESTO = 'manifesto.json'
+
+# Caracteres do SHA-256 usados no nome com fingerprint (mesa_01.<hash>.png)
+TAMANHO_FINGERPRINT = 16
+
+
+def _numero_mesa(nome_arquivo):
+    """Número da mesa de um arquivo mesa_XX.png/.svg, ou None"""
+    base, extensao = os.path.splitext(nome_arquivo)
+    if not base.startswith('mesa_') or extensao not in ('.png', '.svg'):
+        return None
+    try:
+        return int(base.replace('mesa_', ''))
+    except ValueError:
+        return None
+
+
+def _hash_arquivo(caminho):
+    sha256 = hashlib.sha256()
+    with open(caminho, 'rb') as f:
+        for bloco in iter(lambda: f.read(65536), b''):
+            sha256.update(bloco)
+    return sha256.hexdigest()
+
+
+def nome_com_fingerprint(entrada):
+    """Nome do arquivo com o hash do conteúdo (ex: mesa_01.3f2a9c0d1e4b5a6f.png)"""
+    base, extensao = os.path.splitext(entrada['arquivo'])
+    return f"{base}.{entrada['sha256'][:TAMANHO_FINGERPRINT]}{extensao}"
+
+
+class ManifestoQR:
+    def __init__(self, diretorio):
+        self.diretorio = os.path.abspath(diretorio)
+        self.caminho = os.path.join(self.diretorio, ARQUIVO_MANIFESTO)
+        self._lock = threading.Lock()
+        self._arquivos = None
+        self._mtime_diretorio = None
+        self._forcar = False
+        self.base_url = None
+
+    def arquivos(self):
+        """
+        Retorna o índice atual, recarregando-o se o diretório mudou
+
+        Returns:
+            dict: {nome_arquivo: {'arquivo', 'mesa', 'tamanho', 'sha256'}}
+                (vazio se o diretório não existir)
+        """
+        try:
+            mtime = os.stat(self.diretorio).st_mtime_ns
+        except FileNotFoundError:
+            return {}
+
+        if self._arquivos is not None and mtime == self._mtime_diretorio:
+            return self._arquivos
+
+        with self._lock:
+            if self._arquivos is None or mtime != self._mtime_diretorio:
+                # Um manifesto salvo mais recente (ex: por outro processo) é reaproveitado
+                if self._forcar or not self._carregar_salvo(mtime):
+                    self._reconstruir()
+            return self._arquivos
+
+    def obter(self, nome_arquivo):
+        """Retorna a entrada de um arquivo, ou None se ele não existir"""
+        return self.arquivos().get(nome_arquivo)
+
+    def resolver(self, nome_arquivo):
+        """
+        Resolve um nome de arquivo, com ou sem fingerprint
+
+        Returns:
+            tuple: (entrada, com_fingerprint). A entrada é None se o arquivo
+                não existir ou se o fingerprint não corresponder ao conteúdo
+                atual (URL de uma versão anterior).
+        """
+        arquivos = self.arquivos()
+        entrada = arquivos.get(nome_arquivo)
+        if entrada is not None:
+            return entrada, False
+
+        base, extensao = os.path.splitext(nome_arquivo)
+        original, _, fingerprint = base.rpartition('.')
+        if original and len(fingerprint) == TAMANHO_FINGERPRINT:
+            entrada = arquivos.get(original + extensao)
+            if entrada is not None and entrada['sha256'].startswith(fingerprint):
+                return entrada, True
+        return None, False
+
+    def qr_codes(self):
+        """Entradas dos arquivos de QR code das mesas, ordenadas pelo número da mesa"""
+        entradas = [entrada for entrada in self.arquivos().values() if entrada['mesa'] is not None]
+        entradas.sort(key=lambda entrada: (entrada['mesa'], entrada['arquivo']))
+        return entradas
+
+    def reconstruir(self, base_url=None):
+        """
+        Relê o diretório e salva o manifesto (após gerar novos arquivos)
+
+        Args:
+            base_url (str): URL base codificada nos arquivos gerados (mantém a
+                anterior se None)
+        """
+        with self._lock:
+            if base_url is not None:
+                self.base_url = base_url
+            self._reconstruir()
+
+    def invalidar(self):
+        """Força a reconstrução no próximo acesso"""
+        with self._lock:
+            self._forcar = True
+            self._mtime_diretorio = None
+
+    def _carregar_salvo(self, mtime_diretorio):
+        """Usa o manifesto.json salvo se nada mudou no diretório depois dele"""
+        try:
+            if os.stat(self.caminho).st_mtime_ns < mtime_diretorio:
+                return False
+            with open(self.caminho, encoding='utf-8') as f:
+                salvo = json.load(f)
+            self._arquivos = salvo['arquivos']
+            self.base_url = salvo.get('base_url', self.base_url)
+        except (OSError, ValueError, KeyError):
+            return False
+
+        self._mtime_diretorio = mtime_diretorio
+        return True
+
+    def _reconstruir(self):
+        arquivos = {}
+        if os.path.isdir(self.diretorio):
+            for entrada in os.scandir(self.diretorio):
+                # Ignora o próprio manifesto (e temporários dele) e arquivos ocultos
+                if not entrada.is_file() or entrada.name.startswith((ARQUIVO_MANIFESTO, '.')):
+                    continue
+                arquivos[entrada.name] = {
+                    'arquivo': entrada.name,
+                    'mesa': _numero_mesa(entrada.name),
+                    'tamanho': entrada.stat().st_size,
+                    'sha256': _hash_arquivo(entrada.path)
+                }
+            self._salvar(arquivos)
+
+        self._arquivos = arquivos
+        self._forcar = False
+        try:
+            self._mtime_diretorio = os.stat(self.diretorio).st_mtime_ns
+        except FileNotFoundError:
+            self._mtime_diretorio = None
+
+    def _salvar(self, arquivos):
+        temporario = f"{self.caminho}.{os.getpid()}.tmp"
+        try:
+            with open(temporario, 'w', encoding='utf-8') as f:
+                json.dump({'arquivos': arquivos, 'base_url': self.base_url}, f, indent=2, sort_keys=True)
+            os.replace(temporario, self.caminho)
+            # Marcar o manifesto como mais recente que a própria troca do arquivo no diretório
+            os.utime(self.caminho)
+        except OSError as e:
+            print(f"Não foi possível salvar o manifesto de QR codes: {e}")
+
+
+_manifestos = {}
+_lock_manifestos = threading.Lock()
+
+
+def obter_manifesto(diretorio):
+    """Retorna o manifesto (único por processo) de um diretório de QR codes"""
+    diretorio = os.path.abspath(diretorio)
+    with _lock_manifestos:
+        manifesto = _manifestos.get(diretorio)
+        if manifesto is None:
+            manifesto = _manifestos[diretorio] = ManifestoQR(diretorio)
+        return manifesto
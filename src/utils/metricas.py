@@ -0,0 +1,265 @@
+"""
+Métricas das requisições no formato texto do Prometheus
+
+Para cada endpoint (ex: admin.obter_mesas_admin) e método HTTP, são
+registrados:
+- histograma da latência da requisição
+- requisições por código de status
+- comandos SQL executados e tempo gasto no banco (eventos
+  before/after_cursor_execute dos engines)
+- histograma de comandos SQL por requisição (revela consultas N+1)
+- erros por tipo de exceção (as rotas capturam as exceções e chamam
+  registrar_erro; exceções não tratadas são registradas pelo sinal
+  got_request_exception)
+
+No caminho quente, cada requisição só acumula contadores em um objeto
+próprio (guardado em uma ContextVar); o lock global é adquirido uma única
+vez, ao final da requisição. As métricas são locais ao processo: com
+vários workers, cada coleta reflete apenas o worker que a atendeu.
+
+Exposição: GET /api/admin/metrics
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextvars import ContextVar
+
+from flask import got_request_exception, request
+from sqlalchemy import event
+
+TIPO_CONTEUDO = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Limites (le) dos histogramas
+LIMITES_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LIMITES_CONSULTAS = (0, 1, 2, 5, 10, 25, 50, 100)
+
+# Requisições que não correspondem a nenhuma rota
+ENDPOINT_SEM_ROTA = 'sem_rota'
+
+
+class Histograma:
+    __slots__ = ('limites', 'contagens', 'soma', 'total')
+
+    def __init__(self, limites):
+        self.limites = limites
+        self.contagens = [0] * len(limites)
+        self.soma = 0.0
+        self.total = 0
+
+    def observar(self, valor):
+        indice = bisect_left(self.limites, valor)
+        if indice < len(self.contagens):
+            self.contagens[indice] += 1
+        self.soma += valor
+        self.total += 1
+
+    def acumulados(self):
+        """Retorna [(limite, contagem acumulada)], como o Prometheus espera"""
+        acumulado = 0
+        resultado = []
+        for limite, contagem in zip(self.limites, self.contagens):
+            acumulado += contagem
+            resultado.append((limite, acumulado))
+        return resultado
+
+
+class MetricasEndpoint:
+    """Métricas acumuladas de um endpoint e método"""
+
+    __slots__ = ('latencia', 'consultas', 'status', 'comandos_sql', 'segundos_sql', 'erros')
+
+    def __init__(self):
+        self.latencia = Histograma(LIMITES_LATENCIA)
+        self.consultas = Histograma(LIMITES_CONSULTAS)
+        self.status = Counter()
+        self.comandos_sql = 0
+        self.segundos_sql = 0.0
+        self.erros = Counter()
+
+
+class EstadoRequisicao:
+    """Contadores da requisição em andamento"""
+
+    __slots__ = ('inicio', 'comandos_sql', 'segundos_sql', 'erro')
+
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.comandos_sql = 0
+        self.segundos_sql = 0.0
+        self.erro = None
+
+
+_requisicao_atual = ContextVar('metricas_requisicao', default=None)
+
+
+def requisicao_atual():
+    """Retorna o EstadoRequisicao da requisição em andamento, ou None"""
+    return _requisicao_atual.get()
+
+
+def registrar_erro(erro):
+    """Registra o tipo da exceção tratada por uma rota na requisição atual"""
+    estado = _requisicao_atual.get()
+    if estado is not None:
+        estado.erro = type(erro).__name__
+
+
+class MetricasRequisicoes:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints = {}
+
+    def registrar(self, endpoint, metodo, status, estado, duracao):
+        """Acumula uma requisição concluída"""
+        with self._lock:
+            metricas = self._endpoints.get((endpoint, metodo))
+            if metricas is None:
+                metricas = self._endpoints[(endpoint, metodo)] = MetricasEndpoint()
+            metricas.latencia.observar(duracao)
+            metricas.consultas.observar(estado.comandos_sql)
+            metricas.status[status] += 1
+            metricas.comandos_sql += estado.comandos_sql
+            metricas.segundos_sql += estado.segundos_sql
+            if estado.erro is not None:
+                metricas.erros[estado.erro] += 1
+
+    def limpar(self):
+        with self._lock:
+            self._endpoints.clear()
+
+    def exportar(self):
+        """Retorna todas as métricas no formato texto do Prometheus"""
+        with self._lock:
+            endpoints = sorted(self._endpoints.items())
+            linhas = []
+
+            _cabecalho(linhas, 'restaurante_requisicao_duracao_segundos', 'histogram',
+                       'Latência das requisições por endpoint')
+            for (endpoint, metodo), metricas in endpoints:
+                _histograma(linhas, 'restaurante_requisicao_duracao_segundos',
+                            _rotulos(endpoint, metodo), metricas.latencia)
+
+            _cabecalho(linhas, 'restaurante_requisicoes_total', 'counter',
+                       'Requisições por endpoint e código de status')
+            for (endpoint, metodo), metricas in endpoints:
+                for status, quantidade in sorted(metricas.status.items()):
+                    rotulos = _rotulos(endpoint, metodo, status=status)
+                    linhas.append(f"restaurante_requisicoes_total{{{rotulos}}} {quantidade}")
+
+            _cabecalho(linhas, 'restaurante_sql_comandos_total', 'counter',
+                       'Comandos SQL executados por endpoint')
+            for (endpoint, metodo), metricas in endpoints:
+                linhas.append(
+                    f"restaurante_sql_comandos_total{{{_rotulos(endpoint, metodo)}}} {metricas.comandos_sql}"
+                )
+
+            _cabecalho(linhas, 'restaurante_sql_duracao_segundos_total', 'counter',
+                       'Tempo gasto no banco de dados por endpoint')
+            for (endpoint, metodo), metricas in endpoints:
+                linhas.append(
+                    f"restaurante_sql_duracao_segundos_total{{{_rotulos(endpoint, metodo)}}} "
+                    f"{_numero(metricas.segundos_sql)}"
+                )
+
+            _cabecalho(linhas, 'restaurante_sql_comandos_por_requisicao', 'histogram',
+                       'Comandos SQL por requisição')
+            for (endpoint, metodo), metricas in endpoints:
+                _histograma(linhas, 'restaurante_sql_comandos_por_requisicao',
+                            _rotulos(endpoint, metodo), metricas.consultas)
+
+            _cabecalho(linhas, 'restaurante_erros_total', 'counter',
+                       'Erros por endpoint e tipo de exceção')
+            for (endpoint, metodo), metricas in endpoints:
+                for tipo, quantidade in sorted(metricas.erros.items()):
+                    rotulos = _rotulos(endpoint, metodo, tipo=tipo)
+                    linhas.append(f"restaurante_erros_total{{{rotulos}}} {quantidade}")
+
+        return '\n'.join(linhas) + '\n'
+
+
+def _escapar(valor):
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _rotulos(endpoint, metodo, **extras):
+    blueprint = endpoint.rpartition('.')[0]
+    pares = [('blueprint', blueprint), ('endpoint', endpoint), ('metodo', metodo), *extras.items()]
+    return ','.join(f'{nome}="{_escapar(valor)}"' for nome, valor in pares)
+
+
+def _numero(valor):
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+def _cabecalho(linhas, nome, tipo, descricao):
+    linhas.append(f"# HELP {nome} {descricao}")
+    linhas.append(f"# TYPE {nome} {tipo}")
+
+
+def _histograma(linhas, nome, rotulos, histograma):
+    for limite, acumulado in histograma.acumulados():
+        linhas.append(f'{nome}_bucket{{{rotulos},le="{_numero(limite)}"}} {acumulado}')
+    linhas.append(f'{nome}_bucket{{{rotulos},le="+Inf"}} {histograma.total}')
+    linhas.append(f"{nome}_sum{{{rotulos}}} {_numero(histograma.soma)}")
+    linhas.append(f"{nome}_count{{{rotulos}}} {histograma.total}")
+
+
+metricas_requisicoes = MetricasRequisicoes()
+
+
+def registrar_metricas(app, db):
+    """
+    Registra os hooks de requisição e os eventos SQL dos engines
+
+    Deve ser chamada depois de db.init_app(app).
+
+    Args:
+        app (Flask): Aplicação já inicializada com db
+        db (SQLAlchemy): Extensão do Flask-SQLAlchemy
+    """
+    with app.app_context():
+        for engine in db.engines.values():
+            event.listen(engine, 'before_cursor_execute', _antes_do_comando)
+            event.listen(engine, 'after_cursor_execute', _depois_do_comando)
+
+    app.before_request(_iniciar_requisicao)
+    app.after_request(_concluir_requisicao)
+    app.teardown_request(_descartar_requisicao)
+    got_request_exception.connect(_excecao_nao_tratada, app)
+
+
+def _antes_do_comando(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and _requisicao_atual.get() is not None:
+        context._metricas_inicio = time.perf_counter()
+
+
+def _depois_do_comando(conn, cursor, statement, parameters, context, executemany):
+    estado = _requisicao_atual.get()
+    inicio = getattr(context, '_metricas_inicio', None)
+    if estado is not None and inicio is not None:
+        estado.comandos_sql += 1
+        estado.segundos_sql += time.perf_counter() - inicio
+
+
+def _iniciar_requisicao():
+    _requisicao_atual.set(EstadoRequisicao())
+
+
+def _concluir_requisicao(response):
+    estado = _requisicao_atual.get()
+    if estado is not None:
+        metricas_requisicoes.registrar(
+            request.endpoint or ENDPOINT_SEM_ROTA, request.method, response.status_code,
+            estado, time.perf_counter() - estado.inicio
+        )
+    return response
+
+
+def _descartar_requisicao(erro=None):
+    _requisicao_atual.set(None)
+
+
+def _excecao_nao_tratada(sender, exception, **extra):
+    registrar_erro(exception)
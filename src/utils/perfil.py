@@ -0,0 +1,301 @@
+"""
+Perfil (cProfile) de requisições individuais
+
+Uma requisição é executada sob o cProfile quando:
+- traz o token de administrador (config PERFIL_TOKEN) no cabeçalho
+  X-Perfil (sob demanda); sem PERFIL_TOKEN configurado, o modo sob
+  demanda fica desligado. O token não é aceito na query string, que vai
+  para logs (ex: consultas lentas)
+- é a N-ésima requisição de um dos endpoints escolhidos (amostragem,
+  configs PERFIL_AMOSTRAGEM_ENDPOINTS e PERFIL_AMOSTRAGEM_INTERVALO)
+
+Para cada requisição perfilada são guardados os comandos SQL executados
+(com parâmetros e duração), as N funções com maior tempo acumulado e o
+dump do pstats (mesmo formato de Stats.dump_stats, para abrir com
+`python -m pstats` ou snakeviz). Os K perfis mais recentes ficam em
+memória, no processo que atendeu a requisição. A resposta perfilada traz
+o cabeçalho X-Perfil-Id.
+
+Consulta: GET /api/admin/perfis, /api/admin/perfis/<id> e
+/api/admin/perfis/<id>.pstats. Essas rotas exigem o mesmo token, mas nunca
+são perfiladas, para não tirar perfis reais do buffer.
+
+Só o tempo até a view retornar a resposta é medido; o corpo de respostas
+em stream (SSE, ZIP) é gerado depois.
+
+Apenas uma requisição é perfilada por vez em cada processo: a partir do
+Python 3.12 o cProfile é global ao processo e um segundo profiler ativo
+levanta ValueError. Enquanto um perfil está em andamento, as demais
+requisições que seriam perfiladas rodam normalmente, sem perfil. Uma
+falha ao iniciar o profiler nunca interrompe a requisição.
+"""
+
+import cProfile
+import hmac
+import io
+import itertools
+import marshal
+import pstats
+import threading
+import time
+from collections import Counter, deque
+from contextvars import ContextVar
+from datetime import datetime
+
+from flask import request
+from sqlalchemy import event
+
+from src.utils.consultas_lentas import conjuntos_parametros, parametros_json
+
+CABECALHO_TOKEN = 'X-Perfil'
+CABECALHO_ID = 'X-Perfil-Id'
+
+# Rotas de consulta dos próprios perfis
+ENDPOINTS_IGNORADOS = frozenset({'admin.listar_perfis', 'admin.obter_perfil', 'admin.baixar_perfil'})
+
+PERFIS_GUARDADOS_PADRAO = 20
+TOP_N_PADRAO = 30
+INTERVALO_AMOSTRAGEM_PADRAO = 100
+# Comandos SQL guardados por perfil (os demais são apenas contados)
+SQL_MAXIMO = 500
+
+
+class PerfilEmAndamento:
+    """cProfile e comandos SQL da requisição sendo perfilada"""
+
+    __slots__ = ('motivo', 'inicio', 'profiler', 'sql', 'sql_total', 'sql_segundos')
+
+    def __init__(self, motivo):
+        self.motivo = motivo
+        self.sql = []
+        self.sql_total = 0
+        self.sql_segundos = 0.0
+        self.profiler = cProfile.Profile()
+        self.inicio = time.perf_counter()
+        # Pode levantar ValueError se outro profiler estiver ativo (Python 3.12+)
+        self.profiler.enable()
+
+
+def _nome_funcao(funcao):
+    arquivo, linha, nome = funcao
+    if arquivo == '~' and linha == 0:
+        # Funções embutidas (ex: <built-in method builtins.len>)
+        return nome
+    return f"{arquivo}:{linha}({nome})"
+
+
+def _top_funcoes(estatisticas, top_n):
+    estatisticas.sort_stats(pstats.SortKey.CUMULATIVE)
+    funcoes = []
+    for funcao in estatisticas.fcn_list[:top_n]:
+        primitivas, chamadas, proprio, acumulado, _ = estatisticas.stats[funcao]
+        funcoes.append({
+            'funcao': _nome_funcao(funcao),
+            'chamadas': chamadas,
+            'chamadas_primitivas': primitivas,
+            'tempo_proprio_ms': round(proprio * 1000, 3),
+            'tempo_acumulado_ms': round(acumulado * 1000, 3),
+        })
+    return funcoes
+
+
+class PerfisRequisicoes:
+    def __init__(self, capacidade=PERFIS_GUARDADOS_PADRAO):
+        self._lock = threading.Lock()
+        self._perfis = deque(maxlen=capacidade)
+        self._ids = itertools.count(1)
+        self._contagens = Counter()
+        # Um perfil ativo por processo (adquirido sem bloquear)
+        self._lock_ativo = threading.Lock()
+        self.token = None
+        self.top_n = TOP_N_PADRAO
+        self.endpoints_amostrados = frozenset()
+        self.intervalo_amostragem = INTERVALO_AMOSTRAGEM_PADRAO
+
+    def configurar(self, token, capacidade, top_n, endpoints_amostrados, intervalo_amostragem):
+        with self._lock:
+            self.token = token or None
+            self._perfis = deque(self._perfis, maxlen=capacidade)
+            self.top_n = top_n
+            self.endpoints_amostrados = frozenset(endpoints_amostrados)
+            self.intervalo_amostragem = max(intervalo_amostragem, 1)
+
+    @property
+    def habilitado(self):
+        return self.token is not None or bool(self.endpoints_amostrados)
+
+    def token_valido(self, token):
+        """Compara o token recebido com PERFIL_TOKEN em tempo constante"""
+        return self.token is not None and token is not None and hmac.compare_digest(token, self.token)
+
+    def motivo(self, endpoint, token):
+        """
+        Decide se a requisição deve ser perfilada
+
+        Returns:
+            str: 'sob_demanda', 'amostragem' ou None
+        """
+        if endpoint in ENDPOINTS_IGNORADOS:
+            return None
+        if token is not None and self.token_valido(token):
+            return 'sob_demanda'
+        if endpoint is None or not self.endpoints_amostrados:
+            return None
+        if endpoint in self.endpoints_amostrados or endpoint.rpartition('.')[2] in self.endpoints_amostrados:
+            with self._lock:
+                self._contagens[endpoint] += 1
+                if self._contagens[endpoint] % self.intervalo_amostragem == 0:
+                    return 'amostragem'
+        return None
+
+    def reservar(self):
+        """Tenta reservar o profiler do processo; False se outro perfil estiver em andamento"""
+        return self._lock_ativo.acquire(blocking=False)
+    
+    def liberar(self):
+        self._lock_ativo.release()
+
+    def concluir(self, perfil, status):
+        """Monta o relatório do perfil concluído, guarda e retorna o id"""
+        perfil.profiler.disable()
+        duracao = time.perf_counter() - perfil.inicio
+
+        estatisticas = pstats.Stats(perfil.profiler, stream=io.StringIO())
+        relatorio = {
+            'id': next(self._ids),
+            'momento': datetime.utcnow().isoformat(),
+            'motivo': perfil.motivo,
+            'metodo': request.method,
+            'caminho': request.path,
+            'endpoint': request.endpoint,
+            'status': status,
+            'duracao_ms': round(duracao * 1000, 3),
+            'funcoes_chamadas': estatisticas.total_calls,
+            'sql_total': perfil.sql_total,
+            'sql_duracao_ms': round(perfil.sql_segundos * 1000, 3),
+            'sql': perfil.sql,
+            'top_funcoes': _top_funcoes(estatisticas, self.top_n),
+        }
+        dump = marshal.dumps(estatisticas.stats)
+
+        with self._lock:
+            self._perfis.append((relatorio, dump))
+        return relatorio['id']
+
+    def listar(self):
+        """Resumo dos perfis guardados, do mais recente para o mais antigo"""
+        campos = ('id', 'momento', 'motivo', 'metodo', 'caminho', 'endpoint', 'status',
+                  'duracao_ms', 'sql_total', 'sql_duracao_ms')
+        with self._lock:
+            return [{campo: relatorio[campo] for campo in campos} for relatorio, _ in reversed(self._perfis)]
+
+    def obter(self, perfil_id):
+        """Retorna (relatório, dump do pstats) de um perfil, ou None"""
+        with self._lock:
+            for relatorio, dump in self._perfis:
+                if relatorio['id'] == perfil_id:
+                    return relatorio, dump
+        return None
+
+    def limpar(self):
+        with self._lock:
+            self._perfis.clear()
+            self._contagens.clear()
+
+
+perfis_requisicoes = PerfisRequisicoes()
+
+_perfil_atual = ContextVar('perfil_requisicao', default=None)
+
+
+def ler_endpoints(valor):
+    """Converte 'restaurante.criar_pedido, obter_mesas_admin' em um conjunto de nomes"""
+    return {nome.strip() for nome in (valor or '').split(',') if nome.strip()}
+
+
+def registrar_perfil(app, db):
+    """
+    Registra os hooks de perfil de requisições e os eventos SQL dos engines
+
+    Deve ser chamada depois de db.init_app(app). Sem PERFIL_TOKEN e sem
+    endpoints amostrados, nada é registrado (nenhum custo por requisição).
+
+    Args:
+        app (Flask): Aplicação já inicializada com db
+        db (SQLAlchemy): Extensão do Flask-SQLAlchemy
+    """
+    perfis_requisicoes.configurar(
+        token=app.config['PERFIL_TOKEN'],
+        capacidade=app.config['PERFIL_CAPACIDADE'],
+        top_n=app.config['PERFIL_TOP_N'],
+        endpoints_amostrados=ler_endpoints(app.config['PERFIL_AMOSTRAGEM_ENDPOINTS']),
+        intervalo_amostragem=app.config['PERFIL_AMOSTRAGEM_INTERVALO'],
+    )
+    if not perfis_requisicoes.habilitado:
+        return
+
+    with app.app_context():
+        for engine in db.engines.values():
+            event.listen(engine, 'before_cursor_execute', _antes_do_comando)
+            event.listen(engine, 'after_cursor_execute', _depois_do_comando)
+
+    app.before_request(_iniciar_perfil)
+    app.after_request(_concluir_perfil)
+    app.teardown_request(_descartar_perfil)
+
+
+def _iniciar_perfil():
+    motivo = perfis_requisicoes.motivo(request.endpoint, request.headers.get(CABECALHO_TOKEN))
+    if motivo is None or not perfis_requisicoes.reservar():
+        return
+    try:
+        _perfil_atual.set(PerfilEmAndamento(motivo))
+    except Exception as e:
+        # O perfil nunca deve interromper a requisição que está observando
+        perfis_requisicoes.liberar()
+        print(f"Não foi possível iniciar o perfil da requisição: {e}")
+
+
+def _concluir_perfil(response):
+    perfil = _perfil_atual.get()
+    if perfil is not None:
+        _perfil_atual.set(None)
+        try:
+            response.headers[CABECALHO_ID] = str(perfis_requisicoes.concluir(perfil, response.status_code))
+        except Exception as e:
+            perfil.profiler.disable()
+            print(f"Não foi possível concluir o perfil da requisição: {e}")
+        finally:
+            perfis_requisicoes.liberar()
+    return response
+
+
+def _descartar_perfil(erro=None):
+    perfil = _perfil_atual.get()
+    if perfil is not None:
+        perfil.profiler.disable()
+        _perfil_atual.set(None)
+        perfis_requisicoes.liberar()
+
+
+def _antes_do_comando(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and _perfil_atual.get() is not None:
+        context._perfil_inicio = time.perf_counter()
+
+
+def _depois_do_comando(conn, cursor, statement, parameters, context, executemany):
+    perfil = _perfil_atual.get()
+    inicio = getattr(context, '_perfil_inicio', None)
+    if perfil is None or inicio is None:
+        return
+    duracao = time.perf_counter() - inicio
+    perfil.sql_total += 1
+    perfil.sql_segundos += duracao
+    if len(perfil.sql) < SQL_MAXIMO:
+        conjuntos = conjuntos_parametros(parameters)
+        perfil.sql.append({
+            'sql': statement,
+            'parametros': parametros_json(conjuntos[0]),
+            'execucoes': len(conjuntos),
+            'duracao_ms': round(duracao * 1000, 3),
+        })
@@ -0,0 +1,45 @@
+"""
+Planos de execução (EXPLAIN QUERY PLAN) do SQLite
+
+Funções usadas pelo log de consultas lentas (src/utils/consultas_lentas.py)
+e pela verificação das consultas quentes (benchmarks/bench_plano_consultas.py).
+"""
+
+
+def explicar(conexao, sql, parametros=()):
+    """
+    Executa EXPLAIN QUERY PLAN para um comando SQL
+
+    Args:
+        conexao: Conexão SQLAlchemy (Connection)
+        sql (str): Comando SQL
+        parametros: Parâmetros posicionais ou nomeados do comando
+
+    Returns:
+        list: Linhas de detalhe do plano (ex: "SEARCH pedidos USING INDEX ...")
+    """
+    resultado = conexao.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}", parametros)
+    return [linha[-1] for linha in resultado]
+
+
+def explicar_dbapi(conexao_dbapi, sql, parametros=()):
+    """
+    Como explicar, mas direto na conexão do driver (sqlite3)
+
+    Não dispara os eventos do SQLAlchemy, então pode ser usada dentro dos
+    próprios eventos de execução (ex: log de consultas lentas).
+    """
+    cursor = conexao_dbapi.cursor()
+    try:
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}", parametros)
+        return [linha[-1] for linha in cursor.fetchall()]
+    finally:
+        cursor.close()
+
+
+def varreduras_completas(plano):
+    """Retorna as linhas do plano que varrem uma tabela inteira sem índice"""
+    return [
+        detalhe for detalhe in plano
+        if detalhe.startswith('SCAN') and 'USING' not in detalhe
+    ]
@@ -9,126 +9,24 @@ Para uso em produção, considere:
 - Logs de auditoria para geração de QR codes
 """
 
-import qrcode
+import argparse
 import os
 from io import BytesIO
+from html import escape
 import base64
+from src.utils.manifesto_qr import obter_manifesto
 
-class QRCodeGenerator:
-    def __init__(self, base_url="http://localhost:5000"):
-        self.base_url = base_url
-        self.qr_settings = {
-            'version': 1,
-            'error_correction': qrcode.constants.ERROR_CORRECT_L,
-            'box_size': 10,
-            'border': 4,
-        }
-    
-    def gerar_qr_mesa(self, numero_mesa, salvar_arquivo=True, diretorio_saida=None):
-        """
-        Gera QR code para uma mesa específica
-        
-        Args:
-            numero_mesa (int): Número da mesa
-            salvar_arquivo (bool): Se deve salvar como arquivo
-            diretorio_saida (str): Diretório onde salvar o arquivo
-            
-        Returns:
-            tuple: (caminho_arquivo, dados_base64) se salvar_arquivo=True
-            str: dados_base64 se salvar_arquivo=False
-        """
-        # URL que o QR code irá apontar
-        url_mesa = f"{self.base_url}/cardapio?mesa={numero_mesa}"
-        
-        # Criar QR code
-        qr = qrcode.QRCode(**self.qr_settings)
-        qr.add_data(url_mesa)
-        qr.make(fit=True)
-        
-        # Gerar imagem
-        img = qr.make_image(fill_color="black", back_color="white")
-        
-        # Converter para base64 para uso em web
-        buffer = BytesIO()
-        img.save(buffer, format='PNG')
-        img_base64 = base64.b64encode(buffer.getvalue()).decode()
-        
-        if not salvar_arquivo:
-            return img_base64
-        
-        # Salvar arquivo se solicitado
-        if diretorio_saida is None:
-            diretorio_saida = os.path.join(os.path.dirname(__file__), '..', 'static', 'qr_codes')
-        
-        # Criar diretório se não existir
-        os.makedirs(diretorio_saida, exist_ok=True)
-        
-        # Nome do arquivo
-        nome_arquivo = f"mesa_{numero_mesa:02d}.png"
-        caminho_arquivo = os.path.join(diretorio_saida, nome_arquivo)
-        
-        # Salvar imagem
-        img.save(caminho_arquivo)
-        
-        return caminho_arquivo, img_base64
-    
-    def gerar_qr_todas_mesas(self, quantidade_mesas=10, diretorio_saida=None):
-        """
-        Gera QR codes para todas as mesas
-        
-        Args:
-            quantidade_mesas (int): Quantidade de mesas para gerar QR codes
-            diretorio_saida (str): Diretório onde salvar os arquivos
-            
-        Returns:
-            dict: Dicionário com número da mesa como chave e dados do QR como valor
-        """
-        if diretorio_saida is None:
-            diretorio_saida = os.path.join(os.path.dirname(__file__), '..', 'static', 'qr_codes')
-        
-        # Criar diretório se não existir
-        os.makedirs(diretorio_saida, exist_ok=True)
-        
-        qr_codes = {}
-        
-        for numero_mesa in range(1, quantidade_mesas + 1):
-            try:
-                caminho, base64_data = self.gerar_qr_mesa(
-                    numero_mesa, 
-                    salvar_arquivo=True, 
-                    diretorio_saida=diretorio_saida
-                )
-                
-                qr_codes[numero_mesa] = {
-                    'arquivo': caminho,
-                    'base64': base64_data,
-                    'url': f"{self.base_url}/cardapio?mesa={numero_mesa}"
-                }
-                
-                print(f"QR Code gerado para Mesa {numero_mesa}: {caminho}")
-                
-            except Exception as e:
-                print(f"Erro ao gerar QR Code para Mesa {numero_mesa}: {e}")
-        
-        return qr_codes
-    
-    def gerar_html_qr_codes(self, qr_codes_data, arquivo_saida=None):
-        """
-        Gera um arquivo HTML com todos os QR codes para impressão
-        
-        Args:
-            qr_codes_data (dict): Dados dos QR codes gerados
-            arquivo_saida (str): Caminho do arquivo HTML de saída
-            
-        Returns:
-            str: Caminho do arquivo HTML gerado
-        """
-        if arquivo_saida is None:
-            arquivo_saida = os.path.join(
-                os.path.dirname(__file__), '..', 'static', 'qr_codes', 'qr_codes_impressao.html'
-            )
-        
-        html_content = """
+# qrcode (que importa o Pillow) e o pool de processos são importados apenas
+# nos métodos que os usam, para não pesar na inicialização da aplicação
+
+# Quantidade mínima de mesas para usar o pool de processos
+# (abaixo disso, o custo de iniciar os processos não compensa)
+LIMIAR_PARALELO = 50
+
+# Mesas por tarefa enviada ao pool
+TAMANHO_BLOCO = 25
+
+HTML_CABECALHO = """
 <!DOCTYPE html>
 <html lang="pt-BR">
 <head>
@@ -207,7 +105,20 @@ class QRCodeGenerator:
             padding-left: 20px;
         }
         
+        .paginacao {
+            text-align: center;
+            margin: 20px 0;
+        }
+        
+        .paginacao a {
+            margin: 0 10px;
+        }
+        
         @media print {
+            .paginacao {
+                display: none;
+            }
+            
             body {
                 margin: 0;
                 padding: 10px;
@@ -234,21 +145,28 @@ class QRCodeGenerator:
     
     <div class="qr-grid">
 """
-        
-        # Adicionar cada QR code
-        for numero_mesa in sorted(qr_codes_data.keys()):
-            qr_data = qr_codes_data[numero_mesa]
-            html_content += f"""
+
+HTML_CARTAO = """
         <div class="qr-card">
             <div class="mesa-numero">Mesa {numero_mesa:02d}</div>
             <div class="qr-image">
-                <img src="data:image/png;base64,{qr_data['base64']}" alt="QR Code Mesa {numero_mesa}">
+                <img src="{src}" alt="QR Code Mesa {numero_mesa}">
             </div>
-            <div class="mesa-url">{qr_data['url']}</div>
+            <div class="mesa-url">{url}</div>
         </div>
 """
-        
-        html_content += """
+
+HTML_PAGINACAO = """
+    </div>
+    
+    <div class="paginacao">
+        {links}
+    </div>
+    
+    <div class="qr-grid">
+"""
+
+HTML_RODAPE = """
     </div>
     
     <div class="instrucoes">
@@ -268,23 +186,315 @@ class QRCodeGenerator:
 </body>
 </html>
 """
+
+def iterar_html_qr_codes(cartoes, navegacao=None):
+    """
+    Gera a página HTML de impressão em partes, um cartão por vez
+    
+    Args:
+        cartoes: Iterável de tuplas (numero_mesa, src_imagem, url_mesa)
+        navegacao (str): Links de paginação (HTML) exibidos acima e abaixo dos cartões
+        
+    Yields:
+        str: Partes consecutivas da página
+    """
+    yield HTML_CABECALHO
+    if navegacao:
+        yield HTML_PAGINACAO.format(links=navegacao)
+    for numero_mesa, src, url in cartoes:
+        yield HTML_CARTAO.format(numero_mesa=numero_mesa, src=escape(src), url=escape(url))
+    if navegacao:
+        yield HTML_PAGINACAO.format(links=navegacao)
+    yield HTML_RODAPE
+
+class QRCodeGenerator:
+    def __init__(self, base_url="http://localhost:5000"):
+        import qrcode.constants
+        
+        self.base_url = base_url
+        self.qr_settings = {
+            'version': 1,
+            'error_correction': qrcode.constants.ERROR_CORRECT_L,
+            'box_size': 10,
+            'border': 4,
+        }
+    
+    def url_mesa(self, numero_mesa):
+        """URL do cardápio para a qual o QR code da mesa aponta"""
+        return f"{self.base_url}/cardapio?mesa={numero_mesa}"
+    
+    def _montar_qr(self, numero_mesa):
+        import qrcode
         
-        # Salvar arquivo
+        qr = qrcode.QRCode(**self.qr_settings)
+        qr.add_data(self.url_mesa(numero_mesa))
+        qr.make(fit=True)
+        return qr
+    
+    def gerar_svg_mesa(self, numero_mesa):
+        """
+        Gera o QR code de uma mesa em SVG (vetorial, sem passar pelo PIL)
+        
+        Cada sequência horizontal de módulos escuros vira um único traço do
+        path, o que mantém o arquivo pequeno. O SVG não tem tamanho fixo e
+        pode ser impresso em qualquer resolução.
+        
+        Args:
+            numero_mesa (int): Número da mesa
+            
+        Returns:
+            bytes: Conteúdo do arquivo SVG (UTF-8)
+        """
+        matriz = self._montar_qr(numero_mesa).get_matrix()  # já inclui a borda
+        tamanho = len(matriz)
+        
+        tracos = []
+        for y, linha in enumerate(matriz):
+            x = 0
+            while x < tamanho:
+                if not linha[x]:
+                    x += 1
+                    continue
+                inicio = x
+                while x < tamanho and linha[x]:
+                    x += 1
+                tracos.append(f"M{inicio} {y}.5h{x - inicio}")
+        
+        svg = (
+            f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {tamanho} {tamanho}" '
+            f'shape-rendering="crispEdges">'
+            f'<rect width="{tamanho}" height="{tamanho}" fill="#fff"/>'
+            f'<path stroke="#000" d="{"".join(tracos)}"/></svg>'
+        )
+        return svg.encode()
+    
+    def gerar_png_mesa(self, numero_mesa):
+        """
+        Gera a imagem PNG do QR code de uma mesa
+        
+        Args:
+            numero_mesa (int): Número da mesa
+            
+        Returns:
+            bytes: Conteúdo do arquivo PNG
+        """
+        # Criar QR code
+        qr = self._montar_qr(numero_mesa)
+        
+        # Gerar imagem
+        img = qr.make_image(fill_color="black", back_color="white")
+        
+        buffer = BytesIO()
+        img.save(buffer, format='PNG')
+        return buffer.getvalue()
+    
+    def gerar_qr_mesa(self, numero_mesa, salvar_arquivo=True, diretorio_saida=None, invalidar_manifesto=True):
+        """
+        Gera QR code para uma mesa específica
+        
+        Args:
+            numero_mesa (int): Número da mesa
+            salvar_arquivo (bool): Se deve salvar como arquivo
+            diretorio_saida (str): Diretório onde salvar o arquivo
+            invalidar_manifesto (bool): Invalida o manifesto do diretório após
+                gravar (False quando quem chama reconstrói o manifesto no final)
+            
+        Returns:
+            tuple: (caminho_arquivo, dados_base64) se salvar_arquivo=True
+            str: dados_base64 se salvar_arquivo=False
+        """
+        png = self.gerar_png_mesa(numero_mesa)
+        
+        # Converter para base64 para uso em web
+        img_base64 = base64.b64encode(png).decode()
+        
+        if not salvar_arquivo:
+            return img_base64
+        
+        # Salvar arquivo se solicitado
+        if diretorio_saida is None:
+            diretorio_saida = os.path.join(os.path.dirname(__file__), '..', 'static', 'qr_codes')
+        
+        # Criar diretório se não existir
+        os.makedirs(diretorio_saida, exist_ok=True)
+        
+        # Nome do arquivo
+        nome_arquivo = f"mesa_{numero_mesa:02d}.png"
+        caminho_arquivo = os.path.join(diretorio_saida, nome_arquivo)
+        
+        # Salvar imagem (os bytes já codificados, sem reprocessar o PNG)
+        with open(caminho_arquivo, 'wb') as f:
+            f.write(png)
+        
+        # Sobrescrever o arquivo não altera o mtime do diretório
+        if invalidar_manifesto:
+            obter_manifesto(diretorio_saida).invalidar()
+        
+        return caminho_arquivo, img_base64
+    
+    def gerar_qr_todas_mesas(self, quantidade_mesas=10, diretorio_saida=None, processos=None, progresso=None):
+        """
+        Gera QR codes para todas as mesas
+        
+        A partir de LIMIAR_PARALELO mesas, a geração (QR + codificação PNG) e a
+        gravação dos arquivos são distribuídas em blocos por um pool de processos.
+        Os processos são iniciados com 'spawn', e não com fork: esta função roda
+        dentro de requisições em servidores com threads, e um fork copiaria locks
+        (ex: dos manifestos) que outra thread estivesse segurando naquele momento.
+        
+        Args:
+            quantidade_mesas (int): Quantidade de mesas para gerar QR codes
+            diretorio_saida (str): Diretório onde salvar os arquivos
+            processos (int): Processos do pool (padrão: número de CPUs; 1 = sequencial)
+            progresso (callable): Chamada como progresso(concluidas, total) a cada bloco
+            
+        Returns:
+            dict: Dicionário com número da mesa como chave e dados do QR como valor
+        """
+        if diretorio_saida is None:
+            diretorio_saida = os.path.join(os.path.dirname(__file__), '..', 'static', 'qr_codes')
+        
+        # Criar diretório se não existir
+        os.makedirs(diretorio_saida, exist_ok=True)
+        
+        if processos is None:
+            processos = os.cpu_count() or 1
+        
+        numeros = list(range(1, quantidade_mesas + 1))
+        
+        if processos > 1 and quantidade_mesas >= LIMIAR_PARALELO:
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor, as_completed
+            
+            blocos = [numeros[i:i + TAMANHO_BLOCO] for i in range(0, len(numeros), TAMANHO_BLOCO)]
+            with ProcessPoolExecutor(
+                max_workers=min(processos, len(blocos)), mp_context=multiprocessing.get_context('spawn')
+            ) as executor:
+                futuros = [
+                    executor.submit(_gerar_bloco, self.base_url, self.qr_settings, bloco, diretorio_saida)
+                    for bloco in blocos
+                ]
+                resultados = self._coletar(
+                    (futuro.result() for futuro in as_completed(futuros)), quantidade_mesas, progresso
+                )
+        else:
+            blocos = (
+                _gerar_bloco(self.base_url, self.qr_settings, numeros[i:i + TAMANHO_BLOCO], diretorio_saida)
+                for i in range(0, len(numeros), TAMANHO_BLOCO)
+            )
+            resultados = self._coletar(blocos, quantidade_mesas, progresso)
+        
+        # Os arquivos foram gravados (possivelmente por outros processos): atualizar o manifesto
+        obter_manifesto(diretorio_saida).reconstruir(base_url=self.base_url)
+        
+        return {numero_mesa: resultados[numero_mesa] for numero_mesa in sorted(resultados)}
+    
+    def _coletar(self, blocos, total, progresso):
+        """Junta os resultados dos blocos, reportando o progresso"""
+        qr_codes = {}
+        concluidas = 0
+        
+        for bloco in blocos:
+            for numero_mesa, caminho, base64_data, erro in bloco:
+                concluidas += 1
+                if erro is not None:
+                    print(f"Erro ao gerar QR Code para Mesa {numero_mesa}: {erro}")
+                    continue
+                
+                qr_codes[numero_mesa] = {
+                    'arquivo': caminho,
+                    'base64': base64_data,
+                    'url': self.url_mesa(numero_mesa)
+                }
+                
+                print(f"QR Code gerado para Mesa {numero_mesa}: {caminho}")
+            
+            if progresso is not None:
+                progresso(concluidas, total)
+        
+        return qr_codes
+    
+    def gerar_html_qr_codes(self, qr_codes_data, arquivo_saida=None):
+        """
+        Gera um arquivo HTML com todos os QR codes para impressão
+        
+        Args:
+            qr_codes_data (dict): Dados dos QR codes gerados
+            arquivo_saida (str): Caminho do arquivo HTML de saída
+            
+        Returns:
+            str: Caminho do arquivo HTML gerado
+        """
+        if arquivo_saida is None:
+            arquivo_saida = os.path.join(
+                os.path.dirname(__file__), '..', 'static', 'qr_codes', 'qr_codes_impressao.html'
+            )
+        
+        # Imagens referenciadas pelo caminho relativo à página (em vez de
+        # embutidas em base64); base64 apenas para QR codes sem arquivo
+        diretorio_html = os.path.dirname(os.path.abspath(arquivo_saida))
+        cartoes = []
+        for numero_mesa in sorted(qr_codes_data.keys()):
+            qr_data = qr_codes_data[numero_mesa]
+            if qr_data.get('arquivo'):
+                src = os.path.relpath(os.path.abspath(qr_data['arquivo']), diretorio_html).replace(os.sep, '/')
+            else:
+                src = f"data:image/png;base64,{qr_data['base64']}"
+            cartoes.append((numero_mesa, src, qr_data['url']))
+        
+        # Salvar arquivo (escrito em partes, sem montar a página inteira em memória)
         with open(arquivo_saida, 'w', encoding='utf-8') as f:
-            f.write(html_content)
+            f.writelines(iterar_html_qr_codes(cartoes))
+        obter_manifesto(os.path.dirname(arquivo_saida)).invalidar()
         
         print(f"Arquivo HTML gerado: {arquivo_saida}")
         return arquivo_saida
 
+def _gerar_bloco(base_url, qr_settings, numeros_mesas, diretorio_saida):
+    """
+    Gera e salva os QR codes de um bloco de mesas (executado nos processos do pool)
+    
+    Não invalida o manifesto: gerar_qr_todas_mesas o reconstrói ao final.
+    
+    Returns:
+        list: Tuplas (numero_mesa, caminho, base64, erro)
+    """
+    generator = QRCodeGenerator(base_url=base_url)
+    generator.qr_settings = qr_settings
+    
+    resultados = []
+    for numero_mesa in numeros_mesas:
+        try:
+            caminho, base64_data = generator.gerar_qr_mesa(
+                numero_mesa,
+                salvar_arquivo=True,
+                diretorio_saida=diretorio_saida,
+                invalidar_manifesto=False
+            )
+            resultados.append((numero_mesa, caminho, base64_data, None))
+        except Exception as e:
+            resultados.append((numero_mesa, None, None, str(e)))
+    return resultados
+
 def main():
     """Função principal para gerar todos os QR codes"""
+    parser = argparse.ArgumentParser(description="Gera os QR codes das mesas")
+    parser.add_argument('--mesas', type=int, default=10, help='quantidade de mesas')
+    parser.add_argument('--processos', type=int, default=None, help='processos do pool (padrão: CPUs)')
+    args = parser.parse_args()
+    
     print("Gerando QR Codes das mesas...")
     
     # Criar gerador
     generator = QRCodeGenerator()
     
+    def progresso(concluidas, total):
+        print(f"Progresso: {concluidas}/{total} mesas ({concluidas * 100 // total}%)")
+    
     # Gerar QR codes para todas as mesas
-    qr_codes = generator.gerar_qr_todas_mesas(quantidade_mesas=10)
+    qr_codes = generator.gerar_qr_todas_mesas(
+        quantidade_mesas=args.mesas, processos=args.processos, progresso=progresso
+    )
     
     # Gerar arquivo HTML para impressão
     html_file = generator.gerar_html_qr_codes(qr_codes)
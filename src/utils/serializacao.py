@@ -0,0 +1,26 @@
+"""
+Opções de serialização das respostas da API
+
+As rotas que retornam mesas e pedidos aceitam:
+- ?fields=id,status,pedido_ativo.total  projeção de campos (com ponto
+  para campos aninhados), repassada aos métodos to_dict dos modelos
+- ?compacto=1  os itens dos pedidos referenciam o cardápio apenas por
+  item_cardapio_id e os itens do cardápio são enviados uma única vez
+  em 'itens_cardapio'
+"""
+
+from flask import request
+
+from src.models.restaurante import normalizar_campos
+
+
+def ler_opcoes_serializacao():
+    """
+    Lê as opções de serialização da requisição atual
+
+    Returns:
+        tuple: (projeção de campos normalizada ou None, compacto)
+    """
+    campos = normalizar_campos(request.args.get('fields'))
+    compacto = request.args.get('compacto', '').lower() in ('1', 'true')
+    return campos, compacto
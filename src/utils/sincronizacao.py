@@ -0,0 +1,80 @@
+"""
+Utilitários para sincronização incremental (?since=<watermark>)
+
+O watermark é um instante UTC em formato ISO 8601. O cliente envia o
+watermark recebido na resposta anterior e recebe apenas as linhas com
+updated_at posterior a ele, além dos pedidos removidos nesse intervalo.
+
+O novo watermark é calculado antes da consulta e recuado por uma margem,
+para não perder linhas gravadas por transações que ainda não tinham sido
+confirmadas no momento da leitura. O updated_at é definido em Python no
+flush, antes de o comando esperar pelo lock de escrita do SQLite, então
+uma linha pode ser confirmada até busy_timeout (SQLITE_PRAGMAS) depois do
+seu timestamp; a margem é esse tempo mais uma folga. Em troca, uma mesma
+linha pode ser reenviada; os clientes devem aplicar as mudanças de forma
+idempotente (substituindo pelo id).
+"""
+
+from datetime import datetime, timedelta
+
+from flask import current_app, has_app_context
+
+from src.models.restaurante import Pedido, PedidoRemovido
+
+# Folga somada ao busy_timeout, para o trabalho entre o flush e o commit
+FOLGA_WATERMARK = timedelta(seconds=2)
+
+
+def margem_watermark():
+    """Recuo do watermark: busy_timeout do SQLite (em ms) mais a folga"""
+    busy_timeout = 0
+    if has_app_context():
+        busy_timeout = current_app.config.get('SQLITE_PRAGMAS', {}).get('busy_timeout', 0)
+    return timedelta(milliseconds=int(busy_timeout)) + FOLGA_WATERMARK
+
+
+def ler_watermark(valor):
+    """
+    Converte o parâmetro since em datetime
+
+    Args:
+        valor (str): Valor recebido na query string (pode ser None)
+
+    Returns:
+        datetime: Instante informado, ou None se o parâmetro não foi enviado
+
+    Raises:
+        ValueError: Se o valor não estiver em formato ISO 8601
+    """
+    if not valor:
+        return None
+    return datetime.fromisoformat(valor)
+
+
+def novo_watermark():
+    """Retorna o watermark que o cliente deve enviar na próxima sincronização"""
+    return (datetime.utcnow() - margem_watermark()).isoformat()
+
+
+def pedidos_removidos_desde(since, mesa_id=None):
+    """
+    Lista os tombstones de pedidos removidos após o watermark
+    
+    Ids que voltaram a existir (reaproveitados pelo SQLite em bancos sem
+    AUTOINCREMENT) são omitidos, para que o cliente não remova um pedido
+    ativo enviado na mesma resposta.
+
+    Args:
+        since (datetime): Watermark informado pelo cliente
+        mesa_id (int): Restringe a uma mesa específica
+
+    Returns:
+        list: Tombstones no formato de PedidoRemovido.to_dict
+    """
+    query = PedidoRemovido.query.filter(
+        PedidoRemovido.removido_em > since,
+        PedidoRemovido.pedido_id.not_in(Pedido.query.with_entities(Pedido.id))
+    )
+    if mesa_id is not None:
+        query = query.filter(PedidoRemovido.mesa_id == mesa_id)
+    return [removido.to_dict() for removido in query.all()]
@@ -0,0 +1,166 @@
+"""
+Relatório de tempo de inicialização
+
+Durante a inicialização, as fases (configuração, banco, blueprints,
+migração, dados iniciais...) são medidas com relatorio_inicializacao.fase().
+Rodando este módulo, um processo novo é iniciado com `python -X importtime`
+e o relatório mostra:
+- tempo de import por pacote (sqlalchemy, flask, src, ...)
+- tempo de cada fase de create_app
+- tempo da primeira requisição a cada tipo de rota
+
+Uso:
+    python -m src.utils.tempo_inicializacao
+    python -m src.utils.tempo_inicializacao --json
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+
+class RelatorioInicializacao:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._fases = []
+
+    @contextmanager
+    def fase(self, nome):
+        """Mede o tempo do bloco como uma fase da inicialização"""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.registrar(nome, time.perf_counter() - inicio)
+
+    def registrar(self, nome, segundos):
+        with self._lock:
+            self._fases.append((nome, segundos))
+
+    def como_dict(self):
+        """Retorna {fase: milissegundos} na ordem em que as fases ocorreram"""
+        with self._lock:
+            return {nome: round(segundos * 1000, 2) for nome, segundos in self._fases}
+
+    def como_texto(self):
+        linhas = ["Inicialização:"]
+        for nome, ms in self.como_dict().items():
+            linhas.append(f"  {nome:<32} {ms:>9.1f} ms")
+        return "\n".join(linhas)
+
+
+relatorio_inicializacao = RelatorioInicializacao()
+
+
+# Código executado no processo medido: importa, cria a aplicação e faz as primeiras requisições
+_SCRIPT_MEDICAO = """
+import json, time
+inicio = time.perf_counter()
+import src.main
+importado = time.perf_counter()
+app = src.main.create_app()
+criado = time.perf_counter()
+cliente = app.test_client()
+requisicoes = {}
+for caminho in ('/api/mesas', '/api/cardapio', '/', '/api/qr-codes/gerar/1'):
+    antes = time.perf_counter()
+    status = cliente.get(caminho).status_code
+    requisicoes[caminho] = (round((time.perf_counter() - antes) * 1000, 2), status)
+from src.utils.tempo_inicializacao import relatorio_inicializacao
+print(json.dumps({
+    'import_ms': round((importado - inicio) * 1000, 2),
+    'create_app_ms': round((criado - importado) * 1000, 2),
+    'fases': relatorio_inicializacao.como_dict(),
+    'primeiras_requisicoes': requisicoes,
+}))
+"""
+
+_LINHA_IMPORTTIME = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+
+def agrupar_importtime(saida):
+    """
+    Soma o tempo próprio (self) de cada módulo por pacote raiz
+
+    Args:
+        saida (str): stderr de `python -X importtime`
+
+    Returns:
+        Counter: {pacote: microssegundos}
+    """
+    pacotes = Counter()
+    for linha in saida.splitlines():
+        encontrado = _LINHA_IMPORTTIME.match(linha)
+        if not encontrado:
+            continue
+        proprio, _, _, modulo = encontrado.groups()
+        raiz = modulo.split('.')[0]
+        # Os módulos da aplicação aparecem separados (src.models, src.routes, ...)
+        if raiz == 'src':
+            raiz = '.'.join(modulo.split('.')[:2])
+        pacotes[raiz] += int(proprio)
+    return pacotes
+
+
+def medir(raiz_projeto):
+    """Executa a medição em um processo novo e retorna os resultados"""
+    with tempfile.TemporaryDirectory() as diretorio:
+        env = dict(
+            os.environ,
+            CAMINHO_DB=os.path.join(diretorio, 'inicializacao.db'),
+            ARQUIVAMENTO_INTERVALO='0',
+        )
+        subprocess.run(
+            [sys.executable, '-m', 'flask', '--app', 'src.main', 'init-db'],
+            cwd=raiz_projeto, env=env, check=True, stdout=subprocess.DEVNULL
+        )
+        inicio = time.perf_counter()
+        processo = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', _SCRIPT_MEDICAO],
+            cwd=raiz_projeto, env=env, capture_output=True, text=True, check=True
+        )
+        total = time.perf_counter() - inicio
+
+    resultado = json.loads(processo.stdout.strip().splitlines()[-1])
+    resultado['processo_total_ms'] = round(total * 1000, 2)
+    resultado['imports_por_pacote_ms'] = {
+        pacote: round(micro / 1000, 2) for pacote, micro in agrupar_importtime(processo.stderr).most_common()
+    }
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Relatório de tempo de inicialização")
+    parser.add_argument('--json', action='store_true', help='imprime o resultado em JSON')
+    parser.add_argument('--pacotes', type=int, default=12, help='quantidade de pacotes listados')
+    args = parser.parse_args()
+
+    raiz_projeto = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    resultado = medir(raiz_projeto)
+
+    if args.json:
+        print(json.dumps(resultado, indent=2))
+        return
+
+    print(f"Processo completo (inclui o interpretador): {resultado['processo_total_ms']:.0f} ms")
+    print(f"Imports:    {resultado['import_ms']:>8.1f} ms   (com -X importtime, que adiciona algum custo)")
+    for pacote, ms in list(resultado['imports_por_pacote_ms'].items())[:args.pacotes]:
+        print(f"  {pacote:<32} {ms:>9.1f} ms")
+    print(f"create_app: {resultado['create_app_ms']:>8.1f} ms")
+    for fase, ms in resultado['fases'].items():
+        print(f"  {fase:<32} {ms:>9.1f} ms")
+    print("Primeiras requisições:")
+    for caminho, (ms, status) in resultado['primeiras_requisicoes'].items():
+        print(f"  {caminho:<32} {ms:>9.1f} ms  ({status})")
+
+
+if __name__ == '__main__':
+    main()
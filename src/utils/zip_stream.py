@@ -0,0 +1,57 @@
+"""
+Geração de arquivos ZIP em streaming
+
+Escreve o ZIP em um destino não pesquisável (sem seek), de modo que cada
+entrada pode ser gerada, comprimida e enviada ao cliente antes da próxima.
+O zipfile grava então os tamanhos em descritores de dados após cada entrada,
+e nada além da entrada atual fica em memória.
+"""
+
+import zipfile
+from datetime import datetime
+
+
+class _SaidaStream:
+    """Destino de escrita que apenas acumula os bytes até serem consumidos"""
+
+    def __init__(self):
+        self._partes = []
+
+    def write(self, dados):
+        self._partes.append(bytes(dados))
+        return len(dados)
+
+    def flush(self):
+        pass
+
+    def consumir(self):
+        dados = b''.join(self._partes)
+        self._partes.clear()
+        return dados
+
+
+def zip_em_stream(entradas):
+    """
+    Gera o conteúdo de um ZIP em pedaços, uma entrada por vez
+
+    Args:
+        entradas: Iterável de tuplas (nome, conteudo_bytes, comprimir). O
+            iterável é consumido sob demanda, então pode gerar o conteúdo
+            de cada entrada apenas quando ela for escrita.
+
+    Yields:
+        bytes: Pedaços consecutivos do arquivo ZIP
+    """
+    saida = _SaidaStream()
+    data_hora = datetime.now().timetuple()[:6]
+
+    with zipfile.ZipFile(saida, mode='w') as arquivo_zip:
+        for nome, conteudo, comprimir in entradas:
+            info = zipfile.ZipInfo(nome, date_time=data_hora)
+            # Arquivos já comprimidos (ex: PNG) são apenas armazenados
+            info.compress_type = zipfile.ZIP_DEFLATED if comprimir else zipfile.ZIP_STORED
+            arquivo_zip.writestr(info, conteudo)
+            yield saida.consumir()
+
+    # Diretório central, escrito ao fechar o arquivo
+    yield saida.consumir()
@@ -0,0 +1,36 @@
+"""
+Ponto de entrada WSGI para produção
+
+Antes da primeira execução (e após atualizar o código), inicialize o banco
+uma única vez:
+
+    flask --app src.main init-db
+
+Depois, sirva com um servidor WSGI com vários processos e threads, por
+exemplo:
+
+    gunicorn -w 4 --threads 8 -b 0.0.0.0:5001 src.wsgi:app     # Linux/Mac
+    waitress-serve --threads=16 --port=5001 src.wsgi:app         # Windows
+
+Com mais de um processo, mantenha ESTATISTICAS_EM_MEMORIA desligado (os
+contadores são locais a cada processo). Os eventos em tempo real do
+painel (SSE, /api/admin/eventos) também são locais: cada painel recebe na
+hora apenas as mudanças feitas pelo worker ao qual está conectado, e as
+dos demais chegam pela sincronização incremental (?since=) a cada 30
+segundos. O snapshot do cardápio (GET /api/cardapio) também é mantido
+por processo, mas cada worker confere a versão do cardápio no banco
+(tabela versoes_cache, criada pelo init-db) no máximo a cada
+CARDAPIO_VERIFICACAO_SEGUNDOS (padrão 1 s). A varredura de arquivamento roda
+em cada worker; ela é feita em lote dentro de uma transação, então
+varreduras simultâneas não duplicam pedidos. Para rodá-la fora dos
+workers, use ARQUIVAMENTO_INTERVALO=0 e agende `flask --app src.main
+arquivar-pedidos`.
+"""
+
+from src.main import create_app
+from src.utils.arquivamento import iniciar_varredura_periodica
+
+app = create_app()
+
+if app.config['ARQUIVAMENTO_INTERVALO'] > 0:
+    iniciar_varredura_periodica(app, app.config['ARQUIVAMENTO_INTERVALO'], app.config['ARQUIVAMENTO_IDADE_MINIMA'])